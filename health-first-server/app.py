@@ -1,16 +1,55 @@
 """Health First Provider Registration and Authentication API"""
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 import bcrypt
-from marshmallow import Schema, fields, validate, validates, ValidationError
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError, RAISE, EXCLUDE, missing
+from marshmallow.decorators import VALIDATES, VALIDATES_SCHEMA
 import jwt
 import os
 from dotenv import load_dotenv
 from flask_swagger_ui import get_swaggerui_blueprint
 from flasgger import Swagger, swag_from
-from functools import wraps
+from functools import wraps, lru_cache
+import statistics
+from abc import ABC, abstractmethod
+import atexit
+import click
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import time
+import hmac
+import hashlib
+import mmap
+import struct
+import zlib
+import importlib
+import math
+import numpy as np
+import csv
+import io
+import json
+import shutil
+import tempfile
+import heapq
+import itertools
+import base64
+from zoneinfo import ZoneInfo
+try:
+    import fcntl
+except ImportError:  # Windows: the revocation bus falls back to a process-local lock
+    fcntl = None
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+except ImportError:  # without cryptography tokens stay HS256-signed with SECRET_KEY
+    serialization = None
+from sqlalchemy import event, inspect as sa_inspect, text, bindparam, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
+from src.services.password import PasswordPoolSaturated, password_pool
 
 # Load environment variables
 load_dotenv()
@@ -21,7 +60,7 @@ app = Flask(__name__)
 # Configure SQLite database with absolute path
 import os
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'health_first.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'health_first.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 
@@ -30,10 +69,72 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES
 app.config['JWT_REFRESH_TOKEN_EXPIRES'] = int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES', 604800))  # 7 days
 app.config['JWT_REMEMBER_ME_EXPIRES'] = int(os.getenv('JWT_REMEMBER_ME_EXPIRES', 2592000))  # 30 days
 
+# Server-side key for refresh token digests (rotating it invalidates all refresh tokens)
+app.config['REFRESH_TOKEN_HASH_KEY'] = os.getenv('REFRESH_TOKEN_HASH_KEY', app.config['SECRET_KEY'])
+
 # Rate Limiting Settings
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION = timedelta(minutes=30)
 RATE_LIMIT_WINDOW = timedelta(minutes=15)
+PATIENT_FAILURE_WINDOW = timedelta(hours=24)
+
+# Failed-attempt counting backend: 'local' (shared memory file) or 'package.module:ClassName'
+app.config['LOCKOUT_STORE_BACKEND'] = os.getenv('LOCKOUT_STORE_BACKEND', 'local')
+app.config['LOCKOUT_STORE_PATH'] = os.getenv('LOCKOUT_STORE_PATH', os.path.join(app.instance_path, 'lockout.store'))
+app.config['LOCKOUT_STORE_SLOTS'] = int(os.getenv('LOCKOUT_STORE_SLOTS', 16384))
+
+# Password hashing cost (see `flask --app app calibrate-bcrypt`)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+app.config['BCRYPT_LOGIN_BUDGET_MS'] = int(os.getenv('BCRYPT_LOGIN_BUDGET_MS', 250))
+
+# bcrypt runs off the request thread on the process-wide pool in src.services.password,
+# sized by PASSWORD_POOL_WORKERS and PASSWORD_POOL_QUEUE_SIZE (see src/core/config.py)
+
+# Principal cache settings (auth-relevant account fields only)
+app.config['PRINCIPAL_CACHE_SIZE'] = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+app.config['PRINCIPAL_CACHE_TTL'] = int(os.getenv('PRINCIPAL_CACHE_TTL', 60))  # seconds
+app.config['TOKEN_CACHE_SIZE'] = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+
+# Token signing: EdDSA or RS256 keys from JWT_KEYS_DIR (published at /.well-known/jwks.json), or HS256 with SECRET_KEY
+app.config['JWT_ALGORITHM'] = os.getenv('JWT_ALGORITHM', 'EdDSA')
+app.config['JWT_KEYS_DIR'] = os.getenv('JWT_KEYS_DIR', os.path.join(app.instance_path, 'jwt_keys'))
+app.config['JWT_KEYS_RELOAD_INTERVAL'] = int(os.getenv('JWT_KEYS_RELOAD_INTERVAL', 30))  # seconds
+app.config['JWT_ACCEPT_HS256'] = os.getenv('JWT_ACCEPT_HS256', 'true').lower() == 'true'  # legacy tokens without a kid
+app.config['JWKS_MAX_AGE'] = int(os.getenv('JWKS_MAX_AGE', 300))  # seconds
+
+# Bulk import (/api/v1/admin/import/<kind> and `flask import-accounts`) and /api/v1/metrics; disabled without a key
+app.config['ADMIN_API_KEY'] = os.getenv('ADMIN_API_KEY', '')
+app.config['BULK_IMPORT_CHUNK_SIZE'] = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', 500))
+app.config['BULK_IMPORT_PROCESSES'] = int(os.getenv('BULK_IMPORT_PROCESSES', os.cpu_count() or 1))
+
+# Endpoints validated by compiled schemas instead of marshmallow: '*' (all), a comma list, or empty for none
+app.config['FAST_VALIDATION_ENDPOINTS'] = frozenset(
+    name.strip() for name in os.getenv('FAST_VALIDATION_ENDPOINTS', '*').split(',') if name.strip()
+)
+
+# Shared-memory revocation bus keeping principal caches coherent across worker processes
+app.config['REVOCATION_BUS_PATH'] = os.getenv('REVOCATION_BUS_PATH', os.path.join(app.instance_path, 'revocation.bus'))
+app.config['REVOCATION_BUS_BUCKETS'] = int(os.getenv('REVOCATION_BUS_BUCKETS', 4096))
+
+# Expired/revoked refresh token and patient session compaction
+app.config['SESSION_GC_INTERVAL'] = int(os.getenv('SESSION_GC_INTERVAL', 3600))  # seconds
+app.config['SESSION_GC_BATCH_SIZE'] = int(os.getenv('SESSION_GC_BATCH_SIZE', 500))
+app.config['SESSION_GC_BATCH_PAUSE'] = float(os.getenv('SESSION_GC_BATCH_PAUSE', 0.05))  # seconds between batches
+
+# Login telemetry (last_login, login_count, last_used_at) is buffered and flushed in batches
+app.config['LOGIN_TELEMETRY_BUFFERED'] = os.getenv('LOGIN_TELEMETRY_BUFFERED', 'true').lower() == 'true'
+app.config['LOGIN_TELEMETRY_FLUSH_INTERVAL'] = float(os.getenv('LOGIN_TELEMETRY_FLUSH_INTERVAL', 5))  # seconds
+
+# Appointment slot rows are stored SLOT_HORIZON_DAYS ahead; later slots stay computed until the horizon job reaches them
+app.config['SLOT_HORIZON_DAYS'] = int(os.getenv('SLOT_HORIZON_DAYS', 60))
+app.config['SLOT_HORIZON_INTERVAL'] = int(os.getenv('SLOT_HORIZON_INTERVAL', 86400))  # seconds
+app.config['SLOT_HORIZON_BATCH_SIZE'] = int(os.getenv('SLOT_HORIZON_BATCH_SIZE', 50))  # availabilities per transaction
+app.config['SLOT_HORIZON_BATCH_PAUSE'] = float(os.getenv('SLOT_HORIZON_BATCH_PAUSE', 0.05))  # seconds between batches
+app.config['BULK_AVAILABILITY_MAX_ITEMS'] = int(os.getenv('BULK_AVAILABILITY_MAX_ITEMS', 1000))  # after weekly repeats
+
+# Keyset pagination of slot and appointment lists
+app.config['PAGE_DEFAULT_LIMIT'] = int(os.getenv('PAGE_DEFAULT_LIMIT', 100))
+app.config['PAGE_MAX_LIMIT'] = int(os.getenv('PAGE_MAX_LIMIT', 500))
 
 # Configure Swagger
 app.config['SWAGGER'] = {
@@ -61,6 +162,24 @@ swagger = Swagger(app)
 # Initialize SQLAlchemy
 db = SQLAlchemy(app)
 
+def digest_refresh_token(token: str) -> str:
+    """Keyed, deterministic digest of a refresh token, so it can be looked up by index."""
+    return hmac.new(
+        app.config['REFRESH_TOKEN_HASH_KEY'].encode('utf-8'),
+        token.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+def service_busy_response():
+    """503 returned when password hashing capacity is exhausted."""
+    response = jsonify({
+        'success': False,
+        'message': 'Server is busy, please retry shortly',
+        'error_code': 'SERVICE_BUSY'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # Provider Model
 class Provider(db.Model):
     """Provider model for storing healthcare provider information."""
@@ -87,8 +206,14 @@ class Provider(db.Model):
     locked_until = db.Column(db.DateTime, nullable=True)
     login_count = db.Column(db.Integer, default=0)
 
+    # Bumped by logout-all; tokens carrying an older epoch are rejected
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Bumped by every change to the account's schedule; part of its schedule reads' ETags
+    schedule_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_pool.check(password, self.password_hash)
 
     def to_dict(self):
         return {
@@ -102,20 +227,26 @@ class Provider(db.Model):
         }
 
     def is_locked(self):
-        if self.locked_until and self.locked_until > datetime.utcnow():
+        locked_until = lockout_store.locked_until(('provider', self.id)) or self.locked_until
+        if locked_until and locked_until > datetime.utcnow():
             return True
         return False
 
     def increment_failed_attempts(self):
-        self.failed_login_attempts += 1
-        if self.failed_login_attempts >= MAX_FAILED_ATTEMPTS:
+        """Count a failure in the lockout store; only a resulting lock is written to the database."""
+        failures = lockout_store.record_failure(('provider', self.id), RATE_LIMIT_WINDOW.total_seconds())
+        if failures >= MAX_FAILED_ATTEMPTS:
+            self.failed_login_attempts = failures
             self.locked_until = datetime.utcnow() + LOCKOUT_DURATION
-        db.session.commit()
+            lockout_store.lock(('provider', self.id), self.locked_until)
+            db.session.commit()
 
-    def reset_failed_attempts(self):
+    def reset_failed_attempts(self, commit=True):
+        lockout_store.reset(('provider', self.id))
         self.failed_login_attempts = 0
         self.locked_until = None
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
 # Update the Patient model with additional fields
 class Patient(db.Model):
@@ -155,6 +286,12 @@ class Patient(db.Model):
     locked_until = db.Column(db.DateTime, nullable=True)
     last_failed_attempt = db.Column(db.DateTime, nullable=True)
     suspicious_activity_score = db.Column(db.Integer, default=0)
+
+    # Bumped by logout-all; tokens carrying an older epoch are rejected
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Bumped by every change to the account's schedule; part of its schedule reads' ETags
+    schedule_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -164,7 +301,7 @@ class Patient(db.Model):
     sessions = db.relationship('PatientSession', backref='patient', lazy=True)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_pool.check(password, self.password_hash)
 
     def to_dict(self):
         return {
@@ -181,37 +318,47 @@ class Patient(db.Model):
         }
 
     def is_locked(self):
-        if self.locked_until and self.locked_until > datetime.utcnow():
-            return True, self.locked_until
+        locked_until = lockout_store.locked_until(('patient', self.id)) or self.locked_until
+        if locked_until and locked_until > datetime.utcnow():
+            return True, locked_until
         return False, None
 
     def increment_failed_attempts(self):
+        """Count a failure in the lockout store; only a resulting lock is written to the database."""
         now = datetime.utcnow()
-        self.failed_login_attempts += 1
-        self.last_failed_attempt = now
+        failures = lockout_store.record_failure(('patient', self.id), PATIENT_FAILURE_WINDOW.total_seconds())
 
-        # Progressive lockout strategy
-        if self.failed_login_attempts >= 5 and (not self.last_failed_attempt or 
-            (now - self.last_failed_attempt).total_seconds() < 86400):  # 24 hours
+        # Progressive lockout strategy over the last 24 hours
+        if failures >= 5:
             self.locked_until = now + timedelta(hours=24)
-            self.suspicious_activity_score += 2
-        elif self.failed_login_attempts >= 3:
+            self.suspicious_activity_score = (self.suspicious_activity_score or 0) + 2
+        elif failures >= 3:
             self.locked_until = now + timedelta(hours=1)
-            self.suspicious_activity_score += 1
+            self.suspicious_activity_score = (self.suspicious_activity_score or 0) + 1
+        else:
+            return
 
+        self.failed_login_attempts = failures
+        self.last_failed_attempt = now
+        lockout_store.lock(('patient', self.id), self.locked_until)
         db.session.commit()
 
-    def reset_failed_attempts(self):
+    def reset_failed_attempts(self, commit=True):
+        lockout_store.reset(('patient', self.id))
         self.failed_login_attempts = 0
         self.locked_until = None
         self.last_failed_attempt = None
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
     def record_login(self, ip_address, user_agent):
-        self.last_login = datetime.utcnow()
-        self.login_count += 1
-        self.reset_failed_attempts()
+        """Clear failed attempts, commit the caller's transaction, then buffer the login telemetry.
+
+        Telemetry is only recorded once the commit succeeded, so a failed login is never counted.
+        """
+        self.reset_failed_attempts(commit=False)
         db.session.commit()
+        return login_telemetry.record_login(Patient, self.id)
 
 class PatientSession(db.Model):
     """Model for storing patient sessions and device information."""
@@ -223,18 +370,19 @@ class PatientSession(db.Model):
     device_info = db.Column(db.JSON, nullable=True)
     ip_address = db.Column(db.String(45), nullable=False)  # IPv6 compatible
     user_agent = db.Column(db.String(255), nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     is_revoked = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_used_at = db.Column(db.DateTime, nullable=True)
     location_info = db.Column(db.JSON, nullable=True)
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # patient epoch at issue
 
     @staticmethod
     def hash_token(token):
-        return bcrypt.hashpw(token.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return digest_refresh_token(token)
 
     def verify_token(self, token):
-        return bcrypt.checkpw(token.encode('utf-8'), self.refresh_token_hash.encode('utf-8'))
+        return hmac.compare_digest(self.refresh_token_hash, digest_refresh_token(token))
 
     def to_dict(self):
         return {
@@ -254,17 +402,506 @@ class RefreshToken(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     provider_id = db.Column(db.String(36), db.ForeignKey('provider.id'), nullable=False)
     token_hash = db.Column(db.String(255), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     is_revoked = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_used_at = db.Column(db.DateTime, nullable=True)
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # provider epoch at issue
 
     @staticmethod
     def hash_token(token):
-        return bcrypt.hashpw(token.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return digest_refresh_token(token)
 
     def verify_token(self, token):
-        return bcrypt.checkpw(token.encode('utf-8'), self.token_hash.encode('utf-8'))
+        return hmac.compare_digest(self.token_hash, digest_refresh_token(token))
+
+# Principal Cache
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class AuthPrincipal:
+    """Auth-relevant snapshot of a provider or patient account."""
+    __slots__ = ('id', 'is_active', 'locked_until', 'token_epoch', 'verification_status')
+
+    def __init__(self, id, is_active, locked_until, token_epoch, verification_status=None):
+        self.id = id
+        self.is_active = is_active
+        self.locked_until = locked_until
+        self.token_epoch = token_epoch
+        self.verification_status = verification_status
+
+    def is_locked(self):
+        return bool(self.locked_until and self.locked_until > datetime.utcnow())
+
+class RevocationBus:
+    """Memory-mapped counters shared by every worker process on the host.
+
+    Accounts hash into a fixed number of buckets. Bumping an account's bucket tells
+    every process that cached state for accounts in that bucket is stale, so checking
+    coherence costs one memory read per request and no database round trip.
+    """
+
+    def __init__(self, path: str, buckets: int):
+        self.path = path
+        self.buckets = buckets
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < buckets * 8:
+            os.ftruncate(self._fd, buckets * 8)
+        self._map = mmap.mmap(self._fd, buckets * 8)
+        self._local_lock = threading.Lock()
+
+    def _offset(self, key) -> int:
+        return (zlib.crc32(f'{key[0]}:{key[1]}'.encode('utf-8')) % self.buckets) * 8
+
+    def stamp(self, key) -> int:
+        return struct.unpack_from('<Q', self._map, self._offset(key))[0]
+
+    def bump(self, key) -> None:
+        offset = self._offset(key)
+        with self._local_lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                value = struct.unpack_from('<Q', self._map, offset)[0]
+                struct.pack_into('<Q', self._map, offset, value + 1)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+class LockoutStore(ABC):
+    """Interface for failed-login counting and lock state shared by all workers.
+
+    Keys are (account_kind, account_id) tuples. Implementations must be safe across
+    threads and processes; an external backend (e.g. Redis) can be plugged in with
+    LOCKOUT_STORE_BACKEND='package.module:ClassName', constructed with app.config.
+    """
+
+    @abstractmethod
+    def record_failure(self, key, window_seconds: float) -> int:
+        """Record a failed attempt and return the failures within the sliding window."""
+
+    @abstractmethod
+    def lock(self, key, until: datetime) -> None:
+        """Lock the key until the given naive UTC datetime."""
+
+    @abstractmethod
+    def locked_until(self, key):
+        """Return the lock expiry as a naive UTC datetime, or None."""
+
+    @abstractmethod
+    def reset(self, key) -> None:
+        """Clear the key's failures and lock."""
+
+class SharedMemoryLockoutStore(LockoutStore):
+    """Lockout store in a memory-mapped file shared by the worker processes on one host.
+
+    Each key owns a slot with its lock expiry and a ring of its most recent failure
+    timestamps, so window counts are exact up to RING_SIZE failures. When the probe
+    range is full the least recently active slot is reused; locks are also persisted
+    on the account row, so an evicted lock is still enforced.
+    """
+    RING_SIZE = 8
+    PROBES = 16
+    SLOT = struct.Struct('<Qd8d')  # key hash, locked_until, failure timestamps
+
+    def __init__(self, path: str, slots: int):
+        self.slots = slots
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._local_lock = threading.Lock()
+
+    @staticmethod
+    def _hash(key) -> int:
+        digest = hashlib.blake2b(f'{key[0]}:{key[1]}'.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+
+    def _locked(self, exclusive: bool):
+        store = self
+
+        class _Guard:
+            def __enter__(self):
+                store._local_lock.acquire()
+                if fcntl:
+                    fcntl.flock(store._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+            def __exit__(self, *exc):
+                if fcntl:
+                    fcntl.flock(store._fd, fcntl.LOCK_UN)
+                store._local_lock.release()
+
+        return _Guard()
+
+    def _find(self, key_hash: int, create: bool):
+        """Return (offset, locked_until, ring) for key_hash; offset is None if absent and not created."""
+        start = key_hash % self.slots
+        free = victim = None
+        victim_activity = float('inf')
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self.slots) * self.SLOT.size
+            slot_hash, locked_until, *ring = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, locked_until, ring
+            if not create:
+                continue
+            if slot_hash == 0:
+                if free is None:
+                    free = offset
+                continue
+            activity = max(locked_until, *ring)
+            if activity < victim_activity:
+                victim, victim_activity = offset, activity
+        if not create:
+            return None, 0.0, None
+        return (free if free is not None else victim), 0.0, [0.0] * self.RING_SIZE
+
+    def record_failure(self, key, window_seconds: float) -> int:
+        key_hash = self._hash(key)
+        now = time.time()
+        with self._locked(exclusive=True):
+            offset, locked_until, ring = self._find(key_hash, create=True)
+            ring[ring.index(min(ring))] = now
+            self.SLOT.pack_into(self._map, offset, key_hash, locked_until, *ring)
+        return sum(1 for failed_at in ring if failed_at > now - window_seconds)
+
+    def lock(self, key, until: datetime) -> None:
+        key_hash = self._hash(key)
+        with self._locked(exclusive=True):
+            offset, _, ring = self._find(key_hash, create=True)
+            self.SLOT.pack_into(self._map, offset, key_hash, (until - datetime(1970, 1, 1)).total_seconds(), *ring)
+
+    def locked_until(self, key):
+        with self._locked(exclusive=False):
+            offset, locked_until, _ = self._find(self._hash(key), create=False)
+        if offset is None or not locked_until:
+            return None
+        return datetime(1970, 1, 1) + timedelta(seconds=locked_until)
+
+    def reset(self, key) -> None:
+        key_hash = self._hash(key)
+        with self._locked(exclusive=True):
+            offset, _, _ = self._find(key_hash, create=False)
+            if offset is not None:
+                self.SLOT.pack_into(self._map, offset, 0, 0.0, *([0.0] * self.RING_SIZE))
+
+def create_lockout_store(backend: str) -> LockoutStore:
+    if backend == 'local':
+        return SharedMemoryLockoutStore(app.config['LOCKOUT_STORE_PATH'], app.config['LOCKOUT_STORE_SLOTS'])
+    module_name, _, class_name = backend.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)(app.config)
+
+lockout_store = create_lockout_store(app.config['LOCKOUT_STORE_BACKEND'])
+
+principal_cache = TTLCache(app.config['PRINCIPAL_CACHE_SIZE'], app.config['PRINCIPAL_CACHE_TTL'])
+# Verified access-token payloads keyed by token digest; entries live until the token's exp
+verified_token_cache = TTLCache(app.config['TOKEN_CACHE_SIZE'], app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+revocation_bus = RevocationBus(app.config['REVOCATION_BUS_PATH'], app.config['REVOCATION_BUS_BUCKETS'])
+
+# Runtime counters exposed by /api/v1/metrics, keyed by component name
+METRICS_SOURCES = {
+    'principal_cache': principal_cache.stats,
+    'verified_token_cache': verified_token_cache.stats,
+    'password_pool': password_pool.stats
+}
+
+# Columns whose changes must evict a cached principal
+PRINCIPAL_FIELDS = ('is_active', 'verification_status', 'locked_until', 'failed_login_attempts', 'token_epoch')
+
+def load_principal(model, principal_id):
+    """Return the AuthPrincipal for a Provider or Patient id, or None if it does not exist."""
+    key = (model.__tablename__, principal_id)
+    stamp = revocation_bus.stamp(key)
+    cached = principal_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    columns = [model.id, model.is_active, model.locked_until, model.token_epoch]
+    if model is Provider:
+        columns.append(Provider.verification_status)
+    row = db.session.execute(db.select(*columns).where(model.id == principal_id)).first()
+    if row is None:
+        return None
+
+    # Stamp is read before the row so a concurrent bump always forces a reload
+    principal = AuthPrincipal(*row)
+    principal_cache.put(key, (stamp, principal))
+    return principal
+
+def invalidate_principal(model, principal_id) -> None:
+    """Evict an account here and in every other worker process."""
+    key = (model.__tablename__, principal_id)
+    revocation_bus.bump(key)
+    principal_cache.invalidate(key)
+
+@event.listens_for(Provider, 'after_update')
+@event.listens_for(Patient, 'after_update')
+def queue_principal_invalidation(mapper, connection, target):
+    """Remember accounts whose auth fields changed so they are evicted once the commit lands."""
+    state = sa_inspect(target)
+    if any(name in state.attrs and state.attrs[name].history.has_changes() for name in PRINCIPAL_FIELDS):
+        pending = state.session.info.setdefault('principal_invalidations', set())
+        pending.add((target.__tablename__, target.id))
+
+@event.listens_for(db.session, 'after_commit')
+def apply_principal_invalidations(session):
+    for key in session.info.pop('principal_invalidations', ()):
+        revocation_bus.bump(key)
+        principal_cache.invalidate(key)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_principal_invalidations(session):
+    session.info.pop('principal_invalidations', None)
+
+class SigningKey:
+    """A private signing key and the JWK that publishes its public half."""
+    __slots__ = ('kid', 'algorithm', 'private_key', 'public_key', 'jwk')
+
+    def __init__(self, kid: str, private_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = 'EdDSA'
+            self.jwk = jwt.algorithms.OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(private_key, rsa.RSAPrivateKey):
+            self.algorithm = 'RS256'
+            self.jwk = jwt.algorithms.RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            raise ValueError(f'Unsupported signing key type for {kid}')
+        self.jwk.update({'kid': kid, 'alg': self.algorithm, 'use': 'sig'})
+
+class KeyRing:
+    """Asymmetric JWT signing keys shared by all workers through a key directory.
+
+    Every <kid>.pem in the directory is accepted for verification and published in
+    the JWKS; the kid named in the ACTIVE file signs new tokens (newest kid if
+    absent). Rotation: publish a new key, wait for JWKS caches to expire, activate
+    it, and retire the old key once the tokens it signed have expired. Workers pick
+    up changes within JWT_KEYS_RELOAD_INTERVAL seconds.
+    """
+
+    def __init__(self, directory: str, algorithm: str, secret: str, accept_hs256: bool, reload_interval: float):
+        self.directory = directory
+        self.algorithm = algorithm
+        self.secret = secret
+        self.accept_hs256 = accept_hs256
+        self.reload_interval = reload_interval
+        self.symmetric = algorithm == 'HS256' or serialization is None
+        self._keys = None
+        self._active = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    def _generate_private_key(self):
+        if self.algorithm == 'RS256':
+            return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        if self.algorithm == 'EdDSA':
+            return ed25519.Ed25519PrivateKey.generate()
+        raise ValueError(f'Unsupported JWT_ALGORITHM {self.algorithm}')
+
+    def _write(self, name: str, data: bytes):
+        path = os.path.join(self.directory, name)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as handle:
+            handle.write(data)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, path)
+
+    def _load(self):
+        keys = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.pem'):
+                with open(os.path.join(self.directory, name), 'rb') as handle:
+                    private_key = serialization.load_pem_private_key(handle.read(), password=None)
+                keys[name[:-4]] = SigningKey(name[:-4], private_key)
+        active = None
+        active_path = os.path.join(self.directory, 'ACTIVE')
+        if os.path.exists(active_path):
+            with open(active_path) as handle:
+                active = handle.read().strip()
+        if active not in keys:
+            active = next(reversed(keys), None)
+        self._keys, self._active = keys, active
+        self._mtime = os.stat(self.directory).st_mtime_ns
+        self._checked_at = time.monotonic()
+
+    def _ensure_loaded(self, force: bool = False):
+        with self._lock:
+            if self._keys is None:
+                self._ensure_key()
+            elif force or time.monotonic() - self._checked_at >= self.reload_interval:
+                self._checked_at = time.monotonic()
+                if force or os.stat(self.directory).st_mtime_ns != self._mtime:
+                    self._load()
+
+    def _ensure_key(self):
+        # Create the first signing key if the directory has none; the first worker wins
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._load()
+            if not self._keys:
+                kid = self._new_kid()
+                self._write(f'{kid}.pem', self._new_pem())
+                self._write('ACTIVE', kid.encode('ascii'))
+                self._load()
+
+    @staticmethod
+    def _new_kid() -> str:
+        return f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    def _new_pem(self) -> bytes:
+        return self._generate_private_key().private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+
+    def generate(self, activate: bool = False) -> str:
+        """Publish a new key; it only signs tokens once activated."""
+        with self._lock:
+            self._ensure_loaded()
+            kid = self._new_kid()
+            self._write(f'{kid}.pem', self._new_pem())
+            if activate:
+                self._write('ACTIVE', kid.encode('ascii'))
+            self._load()
+            return kid
+
+    def activate(self, kid: str):
+        with self._lock:
+            self._ensure_loaded(force=True)
+            if kid not in self._keys:
+                raise KeyError(kid)
+            self._write('ACTIVE', kid.encode('ascii'))
+            self._load()
+
+    def retire(self, kid: str):
+        with self._lock:
+            self._ensure_loaded(force=True)
+            if kid not in self._keys:
+                raise KeyError(kid)
+            if kid == self._active:
+                raise ValueError('Cannot retire the active signing key')
+            os.remove(os.path.join(self.directory, f'{kid}.pem'))
+            self._load()
+
+    def keys(self) -> list:
+        """Return (kid, algorithm, is_active) for every published key."""
+        self._ensure_loaded(force=True)
+        return [(kid, key.algorithm, kid == self._active) for kid, key in self._keys.items()]
+
+    def encode(self, payload: dict) -> str:
+        if self.symmetric:
+            return jwt.encode(payload, self.secret, algorithm='HS256')
+        self._ensure_loaded()
+        key = self._keys[self._active]
+        return jwt.encode(payload, key.private_key, algorithm=key.algorithm, headers={'kid': key.kid})
+
+    def decode(self, token: str) -> dict:
+        """Verify a token with the key named by its kid header (HS256 when it has none)."""
+        kid = jwt.get_unverified_header(token).get('kid')
+        if kid is None:
+            if not (self.symmetric or self.accept_hs256):
+                raise jwt.InvalidTokenError('Token has no key id')
+            return jwt.decode(token, self.secret, algorithms=['HS256'])
+        if self.symmetric:
+            raise jwt.InvalidTokenError('Asymmetric tokens are not accepted')
+        self._ensure_loaded()
+        key = self._keys.get(kid)
+        if key is None:
+            # Another worker may have published the key since the last reload
+            self._ensure_loaded(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError('Unknown signing key')
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+
+    def jwks(self) -> dict:
+        if self.symmetric:
+            return {'keys': []}
+        self._ensure_loaded()
+        return {'keys': [key.jwk for key in self._keys.values()]}
+
+key_ring = KeyRing(
+    app.config['JWT_KEYS_DIR'], app.config['JWT_ALGORITHM'], app.config['SECRET_KEY'],
+    app.config['JWT_ACCEPT_HS256'], app.config['JWT_KEYS_RELOAD_INTERVAL']
+)
+
+def decode_access_token(token: str) -> dict:
+    """Verify an access token once per worker; later calls reuse the payload until exp.
+
+    Raises the same jwt exceptions as KeyRing.decode. Returned payloads are shared, so
+    callers must treat them as read-only.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = verified_token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = key_ring.decode(token)
+    ttl = payload['exp'] - time.time() if 'exp' in payload else None
+    if ttl is None or ttl > 0:
+        verified_token_cache.put(key, payload, ttl)
+    return payload
 
 # Authentication Middleware
 def jwt_required(f):
@@ -284,8 +921,8 @@ def jwt_required(f):
             }), 401
 
         try:
-            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            provider = db.session.get(Provider, payload['provider_id'])
+            payload = decode_access_token(token)
+            provider = load_principal(Provider, payload['provider_id'])
 
             if not provider:
                 return jsonify({
@@ -315,7 +952,15 @@ def jwt_required(f):
                     'error_code': 'ACCOUNT_LOCKED'
                 }), 423
 
+            if payload.get('epoch', 0) != provider.token_epoch:
+                return jsonify({
+                    'success': False,
+                    'message': 'Token has been revoked',
+                    'error_code': 'TOKEN_REVOKED'
+                }), 401
+
             request.provider = provider
+            g.token_payload = payload
             return f(*args, **kwargs)
 
         except jwt.ExpiredSignatureError:
@@ -350,8 +995,8 @@ def patient_jwt_required(f):
             }), 401
 
         try:
-            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            patient = Patient.query.get(payload['patient_id'])
+            payload = decode_access_token(token)
+            patient = load_principal(Patient, payload['patient_id'])
 
             if not patient:
                 return jsonify({
@@ -367,15 +1012,22 @@ def patient_jwt_required(f):
                     'error_code': 'INACTIVE_ACCOUNT'
                 }), 403
 
-            is_locked, lock_until = patient.is_locked()
-            if is_locked:
+            if patient.is_locked():
                 return jsonify({
                     'success': False,
-                    'message': f'Account is locked. Try again after {lock_until}',
+                    'message': f'Account is locked. Try again after {patient.locked_until}',
                     'error_code': 'ACCOUNT_LOCKED'
                 }), 423
 
+            if payload.get('epoch', 0) != patient.token_epoch:
+                return jsonify({
+                    'success': False,
+                    'message': 'Token has been revoked',
+                    'error_code': 'TOKEN_REVOKED'
+                }), 401
+
             request.patient = patient
+            g.token_payload = payload
             return f(*args, **kwargs)
 
         except jwt.ExpiredSignatureError:
@@ -398,6 +1050,9 @@ def patient_jwt_required(f):
 class ProviderAvailability(db.Model):
     """Model for provider availability schedules."""
     __tablename__ = 'provider_availability'
+    __table_args__ = (
+        db.Index('ix_provider_availability_provider_date', 'provider_id', 'date'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     provider_id = db.Column(db.String(36), db.ForeignKey('provider.id'), nullable=False)
@@ -418,12 +1073,18 @@ class ProviderAvailability(db.Model):
     pricing = db.Column(db.JSON, nullable=True)
     notes = db.Column(db.String(500), nullable=True)
     special_requirements = db.Column(db.JSON, nullable=True)  # Array of strings
+    materialized_through = db.Column(db.Date, nullable=True)  # last day with stored slot rows
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     slots = db.relationship('AppointmentSlot', backref='availability', lazy=True)
 
+    @property
+    def last_date(self):
+        """Date of the last occurrence (the start date for one-off availability)."""
+        return self.recurrence_end_date if self.is_recurring and self.recurrence_end_date else self.date
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -444,14 +1105,33 @@ class ProviderAvailability(db.Model):
             'location': self.location,
             'pricing': self.pricing,
             'notes': self.notes,
-            'special_requirements': self.special_requirements
+            'special_requirements': self.special_requirements,
+            'materialized_through': self.materialized_through.isoformat() if self.materialized_through else None
         }
 
+OPEN_SLOT = "status = 'available'"  # predicate of the partial open-slot search indexes
+
 class AppointmentSlot(db.Model):
-    """Model for individual appointment slots."""
+    """Model for appointment slots that are booked, cancelled or blocked.
+
+    Open slots are computed from ProviderAvailability rules (see provider_slots())
+    and only get a row, keyed by slot_id_for(), once their state changes. Slot
+    times are naive UTC; the availability's timezone is used to render them.
+    specialization and location_type are copied from the provider and the
+    availability so that open rows can be searched across providers
+    (search_open_slots()) on partial indexes that booking keeps current.
+    """
     __tablename__ = 'appointment_slots'
+    __table_args__ = (
+        db.Index('ix_appointment_slots_provider_start_status', 'provider_id', 'slot_start_time', 'status'),
+        db.Index('ix_appointment_slots_patient_start', 'patient_id', 'slot_start_time'),
+        db.Index('ix_appointment_slots_open_search', 'specialization', 'appointment_type', 'location_type',
+                 'slot_start_time', 'id', sqlite_where=text(OPEN_SLOT), postgresql_where=text(OPEN_SLOT)),
+        db.Index('ix_appointment_slots_open_type', 'appointment_type', 'location_type', 'slot_start_time', 'id',
+                 sqlite_where=text(OPEN_SLOT), postgresql_where=text(OPEN_SLOT)),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.String(64), primary_key=True, default=lambda: str(uuid.uuid4()))
     availability_id = db.Column(db.String(36), db.ForeignKey('provider_availability.id'), nullable=False)
     provider_id = db.Column(db.String(36), db.ForeignKey('provider.id'), nullable=False)
     slot_start_time = db.Column(db.DateTime, nullable=False)
@@ -460,11 +1140,15 @@ class AppointmentSlot(db.Model):
     patient_id = db.Column(db.String(36), db.ForeignKey('patient.id'), nullable=True)
     appointment_type = db.Column(db.String(20), nullable=False)
     booking_reference = db.Column(db.String(50), unique=True, nullable=True)
+    stored_utc = db.Column(db.Boolean, default=True)  # NULL for rows written in local time before UTC storage
+    specialization = db.Column(db.String(100), nullable=True)  # provider's, as search_key()
+    location_type = db.Column(db.String(20), nullable=True)  # availability's location['type']
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        return {
+    def to_dict(self, zone_name: str = None):
+        """Slot fields with UTC times; zone_name adds the times in that zone."""
+        data = {
             'id': self.id,
             'availability_id': self.availability_id,
             'provider_id': self.provider_id,
@@ -475,14 +1159,47 @@ class AppointmentSlot(db.Model):
             'appointment_type': self.appointment_type,
             'booking_reference': self.booking_reference
         }
+        if zone_name:
+            zone = zone_transitions(zone_name)
+            data['timezone'] = zone_name
+            data['local_start_time'] = zone.isoformat(self.slot_start_time)
+            data['local_end_time'] = zone.isoformat(self.slot_end_time)
+        return data
 
 # Add after the existing schemas
 
+class ProviderDailyRollup(db.Model):
+    """Slot counts per provider and local day, behind the month view.
+
+    Recomputed from the rules and stored slots when availability changes
+    (refresh_daily_rollups()) and adjusted in place by booking, cancelling and
+    rescheduling (bump_daily_rollup()), in the same transaction as the slot.
+    """
+    __tablename__ = 'provider_daily_rollup'
+
+    provider_id = db.Column(db.String(36), db.ForeignKey('provider.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # local to each slot's availability
+    available_slots = db.Column(db.Integer, nullable=False, default=0)
+    booked_slots = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_slots = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'date': self.day.isoformat(),
+            'available_slots': self.available_slots,
+            'booked_slots': self.booked_slots,
+            'cancelled_slots': self.cancelled_slots
+        }
+
+ROLLUP_STATUSES = ('available', 'booked', 'cancelled')
+
+APPOINTMENT_TYPES = ['consultation', 'follow_up', 'emergency', 'telemedicine']
+LOCATION_TYPES = ['clinic', 'hospital', 'telemedicine', 'home_visit']
+
 class LocationSchema(Schema):
     """Schema for location validation."""
-    type = fields.Str(required=True, validate=validate.OneOf(
-        ['clinic', 'hospital', 'telemedicine', 'home_visit']
-    ))
+    type = fields.Str(required=True, validate=validate.OneOf(LOCATION_TYPES))
     address = fields.Str(required=True)
     room_number = fields.Str(required=False, allow_none=True)
 
@@ -503,9 +1220,7 @@ class AvailabilitySchema(Schema):
     is_recurring = fields.Bool(required=False, default=False)
     recurrence_pattern = fields.Str(required=False, validate=validate.OneOf(['daily', 'weekly', 'monthly']))
     recurrence_end_date = fields.Date(required=False)
-    appointment_type = fields.Str(required=False, default='consultation', validate=validate.OneOf(
-        ['consultation', 'follow_up', 'emergency', 'telemedicine']
-    ))
+    appointment_type = fields.Str(required=False, default='consultation', validate=validate.OneOf(APPOINTMENT_TYPES))
     location = fields.Nested(LocationSchema())
     pricing = fields.Nested(PricingSchema(), required=False)
     special_requirements = fields.List(fields.Str(), required=False)
@@ -518,14 +1233,35 @@ class AvailabilitySchema(Schema):
         return value
 
 
+    @validates('timezone')
+    def validate_timezone(self, value):
+        try:
+            load_zone_transitions(value)
+        except (KeyError, ValueError):
+            raise ValidationError('Unknown time zone; use an IANA name such as America/New_York')
+        return value
+
     @validates('slot_duration')
     def validate_slot_duration(self, value):
         if value < 15 or value > 240:
             raise ValidationError('Slot duration must be between 15 and 240 minutes')
         return value
 
+    @validates_schema
+    def validate_recurrence_end_date(self, data, **kwargs):
+        end = data.get('recurrence_end_date')
+        if end is not None and data.get('date') is not None and end < data['date']:
+            raise ValidationError('Recurrence end date cannot be before the start date', 'recurrence_end_date')
+
 availability_schema = AvailabilitySchema()
 
+class BulkAvailabilitySchema(Schema):
+    """Schema for creating many availability blocks, optionally repeated weekly."""
+    availabilities = fields.Nested(AvailabilitySchema, many=True, required=True, validate=validate.Length(min=1))
+    repeat_weeks = fields.Int(required=False, load_default=1, validate=validate.Range(min=1, max=52))
+
+bulk_availability_schema = BulkAvailabilitySchema()
+
 # Validation Schema
 class ClinicAddressSchema(Schema):
     street = fields.Str(required=True, validate=validate.Length(max=200))
@@ -595,7 +1331,7 @@ class PatientRegistrationSchema(Schema):
     gender = fields.Str(required=True, validate=validate.OneOf(
         ['male', 'female', 'other', 'prefer_not_to_say']
     ))
-    address = fields.Nested(AddressSchema())
+    address = fields.Nested(AddressSchema(), required=True)
     emergency_contact = fields.Nested(EmergencyContactSchema(), required=False, allow_none=True)
     medical_history = fields.List(fields.Str(), required=False, allow_none=True)
     insurance_info = fields.Nested(InsuranceInfoSchema(), required=False, allow_none=True)
@@ -632,20 +1368,221 @@ class PatientLoginSchema(Schema):
 
 patient_login_schema = PatientLoginSchema()
 
-def generate_tokens(provider_id: str, remember_me: bool = False) -> tuple:
-    """Generate access and refresh tokens."""
+# Compiled request validation
+
+class UnsupportedSchema(Exception):
+    """Raised when a schema uses features the compiled validator does not implement."""
+
+class _FastPathMiss(Exception):
+    """Input the compiled validator cannot decide on; marshmallow handles it instead."""
+
+_FAST_PATH_MISS = _FastPathMiss()
+
+def _compile_field(field):
+    """Return a function that deserializes and validates one field value, or raise UnsupportedSchema."""
+    validators = tuple(field.validators)
+    field_type = type(field)
+
+    if field_type in (fields.String, fields.Email):
+        def convert(value):
+            if type(value) is not str:
+                raise _FAST_PATH_MISS
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Integer:
+        def convert(value):
+            if type(value) is not int:
+                raise _FAST_PATH_MISS
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Float and not field.allow_nan:
+        def convert(value):
+            if type(value) not in (int, float) or not math.isfinite(value):
+                raise _FAST_PATH_MISS
+            value = float(value)
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Boolean:
+        def convert(value):
+            if type(value) is not bool:
+                raise _FAST_PATH_MISS
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Date:
+        parse = field.DESERIALIZATION_FUNCS.get(field.format or field.DEFAULT_FORMAT)
+        if parse is None:
+            raise UnsupportedSchema(f'Date format {field.format}')
+
+        def convert(value):
+            if type(value) is not str or not value:
+                raise _FAST_PATH_MISS
+            value = parse(value)
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Nested and not field.many:
+        load_nested = _compile_schema(field.schema)
+
+        def convert(value):
+            value = load_nested(value)
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.Nested:
+        load_nested = _compile_schema(field.schema)
+
+        def convert(value):
+            if type(value) is not list:
+                raise _FAST_PATH_MISS
+            value = [load_nested(item) for item in value]
+            for validator in validators:
+                validator(value)
+            return value
+    elif field_type is fields.List:
+        convert_item = _compile_field(field.inner)
+        item_allows_none = field.inner.allow_none
+
+        def convert(value):
+            if type(value) is not list:
+                raise _FAST_PATH_MISS
+            items = []
+            for item in value:
+                if item is None:
+                    if not item_allows_none:
+                        raise _FAST_PATH_MISS
+                    items.append(None)
+                else:
+                    items.append(convert_item(item))
+            for validator in validators:
+                validator(items)
+            return items
+    else:
+        raise UnsupportedSchema(f'{field_type.__name__} field')
+    return convert
+
+def _compile_schema(schema):
+    """Build a loader equivalent to schema.load() for valid input.
+
+    The loader raises instead of collecting errors: any ValidationError or
+    _FastPathMiss means the caller must re-run marshmallow for the exact messages.
+    """
+    if schema.only or schema.exclude or schema.partial or schema.unknown not in (RAISE, EXCLUDE):
+        raise UnsupportedSchema('only/exclude/partial/unknown options')
+    if set(schema._hooks) - {VALIDATES, (VALIDATES_SCHEMA, False)}:
+        raise UnsupportedSchema(f'hooks {sorted(map(str, schema._hooks))}')
+
+    specs = []
+    for name, field in schema.load_fields.items():
+        default = field.load_default
+        specs.append((
+            field.data_key or name,
+            field.attribute or name,
+            _compile_field(field),
+            field.required,
+            field.allow_none,
+            default
+        ))
+    known_keys = frozenset(spec[0] for spec in specs)
+    reject_unknown = schema.unknown == RAISE
+
+    field_hooks = []
+    for attr_name in schema._hooks.get(VALIDATES, ()):
+        field_name = getattr(schema, attr_name).__marshmallow_hook__[VALIDATES]['field_name']
+        field = schema.fields[field_name]
+        field_hooks.append((field.attribute or field_name, getattr(schema, attr_name)))
+    schema_hooks = []
+    for attr_name in schema._hooks.get((VALIDATES_SCHEMA, False), ()):
+        hook = getattr(schema, attr_name)
+        if hook.__marshmallow_hook__[(VALIDATES_SCHEMA, False)]['pass_original']:
+            raise UnsupportedSchema('validates_schema with pass_original')
+        schema_hooks.append(hook)
+
+    def load(data):
+        if type(data) is not dict or (reject_unknown and not known_keys.issuperset(data)):
+            raise _FAST_PATH_MISS
+        result = {}
+        for data_key, attribute, convert, required, allow_none, default in specs:
+            if data_key in data:
+                value = data[data_key]
+                if value is None:
+                    if not allow_none:
+                        raise _FAST_PATH_MISS
+                    result[attribute] = None
+                else:
+                    result[attribute] = convert(value)
+            elif required:
+                raise _FAST_PATH_MISS
+            elif default is not missing:
+                result[attribute] = default() if callable(default) else default
+        for attribute, hook in field_hooks:
+            if attribute in result:
+                hook(result[attribute])
+        for hook in schema_hooks:
+            hook(result, partial=schema.partial, many=False)
+        return result
+
+    return load
+
+class CompiledSchema:
+    """A marshmallow schema precompiled into specialised validator functions.
+
+    Valid input is deserialized by the compiled functions; anything else (errors,
+    unexpected types, unknown keys) is re-run through schema.load(), so results and
+    error messages are identical to marshmallow's.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._load = _compile_schema(schema)
+
+    def load(self, data):
+        try:
+            return self._load(data)
+        except Exception:
+            return self.schema.load(data)
+
+_compiled_schemas = {}
+
+def compiled_schema(schema):
+    """Return the cached CompiledSchema for schema (the schema itself if it cannot be compiled)."""
+    compiled = _compiled_schemas.get(id(schema))
+    if compiled is None:
+        try:
+            compiled = CompiledSchema(schema)
+        except UnsupportedSchema as e:
+            app.logger.info(f'{type(schema).__name__} uses marshmallow validation: {e}')
+            compiled = schema
+        _compiled_schemas[id(schema)] = compiled
+    return compiled
+
+def load_payload(schema, data, endpoint: str = None):
+    """Validate request data, on the compiled path if enabled for the endpoint."""
+    endpoint = endpoint or request.endpoint
+    enabled = app.config['FAST_VALIDATION_ENDPOINTS']
+    if '*' in enabled or endpoint in enabled:
+        return compiled_schema(schema).load(data)
+    return schema.load(data)
+
+def generate_tokens(provider_id: str, remember_me: bool = False, token_epoch: int = 0) -> tuple:
+    """Generate access and refresh tokens bound to the provider's current token epoch.
+
+    The refresh token row is added to the session; the caller commits.
+    """
     # Access token
     access_expires = app.config['JWT_ACCESS_TOKEN_EXPIRES']
     if remember_me:
         access_expires = app.config['JWT_REMEMBER_ME_EXPIRES']
 
-    access_token = jwt.encode(
+    access_token = key_ring.encode(
         {
             'provider_id': provider_id,
+            'epoch': token_epoch,
             'exp': datetime.utcnow() + timedelta(seconds=access_expires)
-        },
-        app.config['SECRET_KEY'],
-        algorithm='HS256'
+        }
     )
 
     # Refresh token
@@ -657,23 +1594,108 @@ def generate_tokens(provider_id: str, remember_me: bool = False) -> tuple:
     refresh_token = RefreshToken(
         provider_id=provider_id,
         token_hash=RefreshToken.hash_token(refresh_token_value),
-        expires_at=datetime.utcnow() + timedelta(seconds=refresh_expires)
+        expires_at=datetime.utcnow() + timedelta(seconds=refresh_expires),
+        token_epoch=token_epoch
     )
     db.session.add(refresh_token)
-    db.session.commit()
 
     return access_token, refresh_token_value, access_expires
 
 # Helper functions
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return password_pool.hash(password, app.config['BCRYPT_LOG_ROUNDS'])
+
+def bcrypt_cost(password_hash: str):
+    """Return the cost factor encoded in a bcrypt hash ($2b$<cost>$...), or None."""
+    parts = password_hash.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(password_hash: str) -> bool:
+    return bcrypt_cost(password_hash) != app.config['BCRYPT_LOG_ROUNDS']
+
+def rehash_if_needed(account, password: str) -> None:
+    """Re-hash a just-verified password at the configured cost; the caller commits."""
+    if not needs_rehash(account.password_hash):
+        return
+    try:
+        account.password_hash = hash_password(password)
+    except PasswordPoolSaturated:
+        pass  # Best effort: retried on the next successful login
+
+def calibrate_bcrypt_cost(budget_ms: float, samples: int = 5, min_rounds: int = 10, max_rounds: int = 16) -> tuple:
+    """Pick the highest bcrypt cost whose median hash time on this host fits the budget.
+
+    Returns (rounds, {rounds: median_ms}). Never goes below min_rounds, even if it is over budget.
+    """
+    timings = {}
+    chosen = min_rounds
+    password = b'calibration-Password1!'
+    for rounds in range(min_rounds, max_rounds + 1):
+        durations = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+            durations.append((time.perf_counter() - started) * 1000)
+        timings[rounds] = statistics.median(durations)
+        if timings[rounds] > budget_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+def provider_fields(data: dict, password_hash: str) -> dict:
+    """Map validated ProviderSchema data to Provider column values."""
+    return {
+        'first_name': data['first_name'],
+        'last_name': data['last_name'],
+        'email': data['email'].lower(),
+        'phone_number': data['phone_number'],
+        'password_hash': password_hash,
+        'specialization': data['specialization'],
+        'license_number': data['license_number'],
+        'years_of_experience': data['years_of_experience'],
+        'clinic_address': data['clinic_address']
+    }
+
+def patient_fields(data: dict, password_hash: str) -> dict:
+    """Map validated PatientRegistrationSchema data to Patient column values."""
+    values = {
+        'first_name': data['first_name'].strip(),
+        'last_name': data['last_name'].strip(),
+        'email': data['email'].lower().strip(),
+        'phone_number': data['phone_number'].strip(),
+        'password_hash': password_hash,
+        'date_of_birth': data['date_of_birth'],
+        'gender': data['gender'],
+        'address': {
+            'street': data['address']['street'].strip(),
+            'city': data['address']['city'].strip(),
+            'state': data['address']['state'].strip(),
+            'zip': data['address']['zip'].strip()
+        }
+    }
+
+    # Optional fields
+    if data.get('emergency_contact') is not None:
+        values['emergency_contact'] = {
+            'name': data['emergency_contact']['name'].strip(),
+            'phone': data['emergency_contact']['phone'].strip(),
+            'relationship': data['emergency_contact']['relationship'].strip()
+        }
+
+    if data.get('medical_history') is not None:
+        values['medical_history'] = [item.strip() for item in data['medical_history']]
+
+    if data.get('insurance_info') is not None:
+        values['insurance_info'] = {
+            'provider': data['insurance_info']['provider'].strip(),
+            'policy_number': data['insurance_info']['policy_number'].strip()
+        }
+    return values
 
 def generate_verification_token(provider_id):
-    return jwt.encode(
-        {'provider_id': provider_id},
-        app.config['SECRET_KEY'],
-        algorithm='HS256'
-    )
+    return key_ring.encode({'provider_id': provider_id})
 
 # Add before the routes
 
@@ -707,42 +1729,987 @@ def get_next_date(current_date: datetime, pattern: str) -> datetime:
         return datetime(year, month, day)
     return current_date
 
-def create_appointment_slots(availability: ProviderAvailability) -> list:
-    """Create individual appointment slots from availability."""
-    slots = []
-    current_date = availability.date
-    end_date = availability.recurrence_end_date if availability.is_recurring else current_date
-
-    while current_date <= end_date:
-        # Generate time slots for the day
-        day_slots = generate_time_slots(
-            availability.start_time,
-            availability.end_time,
-            availability.slot_duration,
-            availability.break_duration
+# Time zones: slot times are stored as naive UTC and rendered in the availability's zone
+
+ZONE_TABLE_START = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ZONE_TABLE_END = datetime(2100, 1, 1, tzinfo=timezone.utc)
+MAX_UTC_OFFSET = timedelta(hours=14)  # widest offset in use; pads UTC range scans over local days
+
+class ZoneTransitions:
+    """UTC offset transition table of one time zone for vectorised conversions.
+
+    The table is built once per zone by sampling zoneinfo daily between 1970 and
+    2100 and bisecting each change to the minute. A conversion is then a single
+    searchsorted over the transition instants instead of a zoneinfo call per
+    datetime. Local times in a DST gap or fold resolve like zoneinfo's fold=0:
+    with the offset in effect before the transition.
+    """
+
+    def __init__(self, name: str):
+        zone = ZoneInfo(name)
+        self.name = name
+
+        def offset_at(instant):
+            return int(instant.astimezone(zone).utcoffset().total_seconds() // 60)
+
+        instants, offsets = [], [offset_at(ZONE_TABLE_START)]
+        day = ZONE_TABLE_START
+        while day < ZONE_TABLE_END:
+            next_day = day + timedelta(days=1)
+            if offset_at(next_day) != offsets[-1]:
+                low, high = 0, 1440  # first minute after `day` with the new offset
+                while low + 1 < high:
+                    middle = (low + high) // 2
+                    if offset_at(day + timedelta(minutes=middle)) == offsets[-1]:
+                        low = middle
+                    else:
+                        high = middle
+                instants.append(day.replace(tzinfo=None) + timedelta(minutes=high))
+                offsets.append(offset_at(next_day))
+            day = next_day
+
+        self.transitions = np.array(instants, dtype='datetime64[m]')
+        self.offsets = np.array(offsets, dtype=np.int64).astype('timedelta64[m]')
+        # Last local wall time that still resolves to the offset before each transition
+        self.local_bounds = self.transitions + np.maximum(self.offsets[:-1], self.offsets[1:])
+
+    def utc_offsets(self, utc):
+        return self.offsets[np.searchsorted(self.transitions, utc, side='right')]
+
+    def to_utc(self, local):
+        """Naive local datetime64 values to naive UTC."""
+        local = np.asarray(local, dtype='datetime64[m]')
+        return local - self.offsets[np.searchsorted(self.local_bounds, local, side='right')]
+
+    def to_local(self, utc):
+        """Naive UTC datetime64 values to naive local time."""
+        utc = np.asarray(utc, dtype='datetime64[m]')
+        return utc + self.utc_offsets(utc)
+
+    def local_isoformats(self, utc) -> list:
+        """ISO 8601 local times with their UTC offsets for naive UTC datetime64 values."""
+        utc = np.asarray(utc, dtype='datetime64[m]')
+        offsets = self.utc_offsets(utc)
+        zones = {}
+        formatted = []
+        for local, minutes in zip((utc + offsets).astype('datetime64[us]').tolist(), offsets.astype(np.int64).tolist()):
+            tzinfo = zones.get(minutes)
+            if tzinfo is None:
+                tzinfo = zones[minutes] = timezone(timedelta(minutes=minutes))
+            formatted.append(local.replace(tzinfo=tzinfo).isoformat())
+        return formatted
+
+    def isoformat(self, utc: datetime) -> str:
+        """ISO 8601 local time with its UTC offset for a naive UTC datetime."""
+        return self.local_isoformats([np.datetime64(utc, 'm')])[0]
+
+@lru_cache(maxsize=None)
+def load_zone_transitions(name: str) -> ZoneTransitions:
+    """Cached ZoneTransitions for a zone name; raises KeyError/ValueError for unknown zones."""
+    return ZoneTransitions(name)
+
+@lru_cache(maxsize=1024)
+def zone_transitions(name: str) -> ZoneTransitions:
+    """ZoneTransitions for a stored zone name, falling back to UTC for names that never validated."""
+    try:
+        return load_zone_transitions(name)
+    except (KeyError, ValueError):
+        app.logger.warning(f'Unknown time zone {name!r}; treating slot times as UTC')
+        return load_zone_transitions('UTC')
+
+def local_date(zone_name: str, utc: datetime):
+    """Calendar date in zone_name of a naive UTC datetime."""
+    return zone_transitions(zone_name).to_local(np.datetime64(utc, 'm')).item().date()
+
+def minutes_of_day(hhmm: str) -> int:
+    """Convert an HH:MM string to minutes after midnight."""
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def slot_start_offsets(start_time: str, end_time: str, duration: int, break_duration: int = 0):
+    """Start minutes of each slot in a day; the same slots as generate_time_slots()."""
+    step = duration + break_duration
+    if duration <= 0 or step <= 0:
+        raise ValueError('Slot duration and slot plus break must be positive')
+    return np.arange(minutes_of_day(start_time), minutes_of_day(end_time) - duration + 1, step, dtype=np.int64)
+
+def recurrence_dates(start_date, end_date, pattern: str):
+    """Occurrence dates from start_date through end_date as a datetime64[D] array.
+
+    Monthly recurrence follows get_next_date(): each step keeps the previous
+    occurrence's day, clamped to the length of the next month.
+    """
+    if pattern == 'daily':
+        return np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1, 1)
+    if pattern == 'weekly':
+        return np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1, 7)
+    if pattern == 'monthly':
+        dates = []
+        current = start_date
+        while current <= end_date:
+            dates.append(current)
+            current = get_next_date(current, pattern).date()
+        return np.array(dates, dtype='datetime64[D]')
+    return np.array([start_date], dtype='datetime64[D]')
+
+def availability_days(availability: ProviderAvailability, start_date=None, end_date=None):
+    """Occurrence dates of an availability, optionally limited to start_date..end_date."""
+    if availability.is_recurring:
+        if availability.recurrence_end_date is None:
+            raise ValueError('recurrence_end_date is required for recurring availability')
+        days = recurrence_dates(availability.date, availability.recurrence_end_date, availability.recurrence_pattern)
+    else:
+        days = np.array([availability.date], dtype='datetime64[D]')
+    if start_date is not None:
+        days = days[days >= np.datetime64(start_date, 'D')]
+    if end_date is not None:
+        days = days[days <= np.datetime64(end_date, 'D')]
+    return days
+
+def availability_slot_times(availability: ProviderAvailability, start_date=None, end_date=None) -> tuple:
+    """UTC slot start and end times of an availability as datetime64[m] arrays.
+
+    Slot times are computed for the whole date x time-of-day grid at once on
+    integer minute offsets in the availability's local time, then converted to
+    UTC; start_date/end_date restrict the result to slots starting on those
+    local days. Starts that fall in a spring-forward gap never occur on the wall
+    clock and are dropped, and a repeated fall-back hour is offered once, so the
+    UTC starts are strictly increasing.
+    """
+    return occurrence_slot_times(availability, availability_days(availability, start_date, end_date))
+
+def occurrence_slot_times(availability: ProviderAvailability, days) -> tuple:
+    """availability_slot_times() for the occurrences on `days`, a sorted datetime64[D] array."""
+    offsets = slot_start_offsets(
+        availability.start_time,
+        availability.end_time,
+        availability.slot_duration,
+        availability.break_duration
+    )
+    local_starts = (days.astype('datetime64[m]')[:, None] + offsets[None, :].astype('timedelta64[m]')).ravel()
+    zone = zone_transitions(availability.timezone)
+    starts = zone.to_utc(local_starts)
+    starts = starts[zone.to_local(starts) == local_starts]
+    return starts, starts + np.timedelta64(availability.slot_duration, 'm')
+
+def availability_blocks(availability: ProviderAvailability, start_date=None, end_date=None) -> tuple:
+    """UTC start and end of each occurrence's start_time..end_time block as datetime64[m] arrays."""
+    days = availability_days(availability, start_date, end_date).astype('datetime64[m]')
+    zone = zone_transitions(availability.timezone)
+    return (zone.to_utc(days + np.timedelta64(minutes_of_day(availability.start_time), 'm')),
+            zone.to_utc(days + np.timedelta64(minutes_of_day(availability.end_time), 'm')))
+
+def availability_from_data(provider_id: str, data: dict, week_offset: int = 0) -> ProviderAvailability:
+    """Build an availability from AvailabilitySchema data, optionally shifted by whole weeks."""
+    shift = timedelta(weeks=week_offset)
+    return ProviderAvailability(
+        id=str(uuid.uuid4()),
+        provider_id=provider_id,
+        date=data['date'] + shift,
+        start_time=data['start_time'],
+        end_time=data['end_time'],
+        timezone=data['timezone'],
+        slot_duration=data.get('slot_duration', 30),
+        break_duration=data.get('break_duration', 0),
+        is_recurring=data.get('is_recurring', False),
+        recurrence_pattern=data.get('recurrence_pattern'),
+        recurrence_end_date=data['recurrence_end_date'] + shift if data.get('recurrence_end_date') else None,
+        status='available',
+        max_appointments_per_slot=1,
+        current_appointments=0,
+        appointment_type=data.get('appointment_type', 'consultation'),
+        location=data['location'],
+        pricing=data.get('pricing'),
+        special_requirements=data.get('special_requirements', []),
+        notes=data.get('notes')
+    )
+
+MAX_REPORTED_CONFLICTS = 50
+
+class AvailabilityIntervalIndex:
+    """Sorted interval index over a provider's availability blocks in a date window.
+
+    Blocks are loaded with a range query on (provider_id, date) and expanded one
+    interval per occurrence, so the index holds n occurrence blocks rather than
+    every slot. Blocks are sorted by start with a running maximum of their ends:
+    an interval [a, b) overlaps an indexed block exactly when the largest end
+    among blocks starting before b is after a, which is one binary search per
+    interval, O(k log n) for a series of k occurrences.
+    """
+
+    def __init__(self, provider_id: str, start_date, end_date, exclude_id: str = None):
+        # Blocks are compared in UTC; a day either side covers rules in other time zones
+        start_date, end_date = start_date - timedelta(days=1), end_date + timedelta(days=1)
+        query = ProviderAvailability.query.filter(
+            ProviderAvailability.provider_id == provider_id,
+            ProviderAvailability.status.is_distinct_from('cancelled'),
+            ProviderAvailability.date <= end_date,
+            db.or_(
+                ProviderAvailability.date >= start_date,
+                db.and_(ProviderAvailability.is_recurring.is_(True),
+                        ProviderAvailability.recurrence_end_date >= start_date)
+            )
+        )
+        if exclude_id is not None:
+            query = query.filter(ProviderAvailability.id != exclude_id)
+
+        self.availability_ids = []
+        starts, ends, owners = [], [], []
+        for availability in query:
+            block_starts, block_ends = availability_blocks(availability, start_date, end_date)
+            starts.append(block_starts)
+            ends.append(block_ends)
+            owners.append(np.full(len(block_starts), len(self.availability_ids), dtype=np.int64))
+            self.availability_ids.append(availability.id)
+
+        self._build(
+            np.concatenate(starts) if starts else np.array([], dtype='datetime64[m]'),
+            np.concatenate(ends) if ends else np.array([], dtype='datetime64[m]'),
+            np.concatenate(owners) if owners else np.array([], dtype=np.int64)
         )
 
-        # Create appointment slots
-        for slot in day_slots:
-            start_time = datetime.strptime(f"{current_date} {slot['start']}", '%Y-%m-%d %H:%M')
-            end_time = datetime.strptime(f"{current_date} {slot['end']}", '%Y-%m-%d %H:%M')
-            
-            appointment_slot = AppointmentSlot(
-                availability_id=availability.id,
-                provider_id=availability.provider_id,
-                slot_start_time=start_time,
-                slot_end_time=end_time,
-                status='available',
-                appointment_type=availability.appointment_type
+    def _build(self, starts, ends, owners):
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.owners = owners[order]
+        # Running maximum of block ends, and the position of a block reaching it
+        self.max_ends = np.maximum.accumulate(self.ends) if len(order) else self.ends
+        self.max_holders = np.maximum.accumulate(
+            np.where(self.ends == self.max_ends, np.arange(len(order)), 0)
+        ) if len(order) else order
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, availability_id: str, starts, ends) -> None:
+        """Index the blocks of an availability accepted after the index was loaded."""
+        owners = np.full(len(starts), len(self.availability_ids), dtype=np.int64)
+        self.availability_ids.append(availability_id)
+        self._build(np.concatenate([self.starts, starts]), np.concatenate([self.ends, ends]),
+                    np.concatenate([self.owners, owners]))
+
+    def overlaps(self, starts, ends) -> np.ndarray:
+        """Position of an indexed block overlapping each [start, end) interval, or -1."""
+        result = np.full(len(starts), -1, dtype=np.int64)
+        if not len(self.starts):
+            return result
+        before = np.searchsorted(self.starts, ends, side='left')
+        hit = before > 0
+        hit[hit] = self.max_ends[before[hit] - 1] > starts[hit]
+        result[hit] = self.max_holders[before[hit] - 1]
+        return result
+
+    def conflicts(self, starts, ends, limit: int = None) -> tuple:
+        """(conflicting intervals, total) for a series of [start, end) intervals, in order."""
+        positions = self.overlaps(starts, ends)
+        conflicting = np.flatnonzero(positions >= 0)
+        found = []
+        for i in conflicting[:limit]:
+            j = positions[i]
+            found.append({
+                'start': starts[i].item().isoformat(),
+                'end': ends[i].item().isoformat(),
+                'conflicts_with': {
+                    'availability_id': self.availability_ids[self.owners[j]],
+                    'start': self.starts[j].item().isoformat(),
+                    'end': self.ends[j].item().isoformat()
+                }
+            })
+        return found, len(conflicting)
+
+def find_availability_conflicts(availability: ProviderAvailability, limit: int = None) -> tuple:
+    """Occurrences of availability overlapping the provider's other availability; see AvailabilityIntervalIndex."""
+    index = AvailabilityIntervalIndex(
+        availability.provider_id, availability.date, availability.last_date, exclude_id=availability.id
+    )
+    starts, ends = availability_blocks(availability)
+    return index.conflicts(starts, ends, limit)
+
+def slot_id_for(availability_id: str, start: datetime) -> str:
+    """Deterministic id of the slot of an availability starting at start (UTC)."""
+    return f"{availability_id}.{start:%Y%m%d%H%M}"
+
+def parse_slot_id(slot_id: str):
+    """Split a deterministic slot id into (availability_id, start), or None for other ids."""
+    availability_id, _, stamp = slot_id.rpartition('.')
+    if not availability_id or len(stamp) != 12 or not stamp.isdigit():
+        return None
+    try:
+        return availability_id, datetime.strptime(stamp, '%Y%m%d%H%M')
+    except ValueError:
+        return None
+
+def search_key(specialization: str):
+    """Normalised specialization stored on slot rows and matched by search_open_slots()."""
+    return specialization.strip().lower() if specialization else None
+
+def slot_search_fields(availability: ProviderAvailability) -> dict:
+    """The denormalised search columns of an availability's slot rows."""
+    provider = db.session.get(Provider, availability.provider_id)
+    return {
+        'specialization': search_key(provider.specialization) if provider else None,
+        'location_type': (availability.location or {}).get('type')
+    }
+
+def build_appointment_slot_rows(availability: ProviderAvailability, start_date=None, end_date=None) -> list:
+    """Expand an availability into appointment_slots rows for a Core bulk insert."""
+    starts, ends = availability_slot_times(availability, start_date, end_date)
+    now = datetime.utcnow()
+    search_fields = slot_search_fields(availability)
+    return [
+        {
+            'id': slot_id_for(availability.id, start),
+            'availability_id': availability.id,
+            'provider_id': availability.provider_id,
+            'slot_start_time': start,
+            'slot_end_time': end,
+            'status': 'available',
+            'appointment_type': availability.appointment_type,
+            'stored_utc': True,
+            'created_at': now,
+            'updated_at': now,
+            **search_fields
+        }
+        for start, end in zip(starts.astype('datetime64[us]').tolist(), ends.astype('datetime64[us]').tolist())
+    ]
+
+def insert_appointment_slots(rows: list):
+    """Insert slot rows with one executemany; the caller commits."""
+    if rows:
+        db.session.execute(AppointmentSlot.__table__.insert(), rows)
+
+def encode_cursor(start: datetime, slot_id: str) -> str:
+    """Opaque page cursor pointing after the slot (start, slot_id)."""
+    return base64.urlsafe_b64encode(f'{start.isoformat()}|{slot_id}'.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    """(start, slot_id) from encode_cursor(); raises ValueError for anything else."""
+    try:
+        start, slot_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|', 1)
+        return datetime.fromisoformat(start), slot_id
+    except ValueError:
+        raise ValueError('Invalid cursor')
+
+def page_args() -> tuple:
+    """(limit, after) from the limit/cursor query parameters; raises ValueError when malformed."""
+    try:
+        limit = int(request.args.get('limit', app.config['PAGE_DEFAULT_LIMIT']))
+    except ValueError:
+        limit = None  # type=int would silently fall back to the default
+    if limit is None or not 1 <= limit <= app.config['PAGE_MAX_LIMIT']:
+        raise ValueError(f"limit must be between 1 and {app.config['PAGE_MAX_LIMIT']}")
+    cursor = request.args.get('cursor')
+    return limit, decode_cursor(cursor) if cursor else None
+
+def padded_utc_window(start_date, end_date) -> tuple:
+    """UTC range covering the local days start_date..end_date in every time zone."""
+    return (datetime.combine(start_date, datetime.min.time()) - MAX_UTC_OFFSET,
+            datetime.combine(end_date + timedelta(days=1), datetime.min.time()) + MAX_UTC_OFFSET)
+
+def window_availabilities(provider_id: str, start_date, end_date, appointment_type: str = None):
+    """Query of a provider's active availabilities with occurrences between start_date and end_date."""
+    availabilities = ProviderAvailability.query.filter(
+        ProviderAvailability.provider_id == provider_id,
+        ProviderAvailability.status.is_distinct_from('cancelled'),
+        ProviderAvailability.date <= end_date,
+        db.or_(
+            ProviderAvailability.date >= start_date,
+            db.and_(ProviderAvailability.is_recurring.is_(True),
+                    ProviderAvailability.recurrence_end_date >= start_date)
+        )
+    )
+    if appointment_type:
+        availabilities = availabilities.filter(ProviderAvailability.appointment_type == appointment_type)
+    return availabilities
+
+def window_rules(provider_id: str, start_date, end_date, appointment_type: str = None) -> dict:
+    """{availability_id: (availability, UTC starts, UTC ends)} for a provider's active rules in the window."""
+    return {
+        availability.id: (availability, *availability_slot_times(availability, start_date, end_date))
+        for availability in window_availabilities(provider_id, start_date, end_date, appointment_type)
+    }
+
+def rule_zones(rules: dict, stored_rows) -> dict:
+    """{availability_id: timezone} for the rules and every stored row's availability."""
+    zones = {availability_id: rule[0].timezone for availability_id, rule in rules.items()}
+    unknown = {row.availability_id for row in stored_rows} - zones.keys()
+    if unknown:
+        zones.update(db.session.query(ProviderAvailability.id, ProviderAvailability.timezone).filter(
+            ProviderAvailability.id.in_(unknown)
+        ).all())
+    return zones
+
+def rule_produces(rules: dict, row) -> bool:
+    """Whether a stored row is one of the computed slots in rules (binary search in its rule's starts)."""
+    rule = rules.get(row.availability_id)
+    if rule is None:
+        return False
+    start = np.datetime64(row.slot_start_time, 'm')
+    position = np.searchsorted(rule[1], start)
+    return position < len(rule[1]) and rule[1][position] == start
+
+def provider_slot_counts(provider_id: str, start_date, end_date, appointment_type: str = None) -> dict:
+    """Slot counts by status for provider_slots()' window, without building any slot."""
+    window_start, window_end = padded_utc_window(start_date, end_date)
+    table = AppointmentSlot.__table__
+    stored_query = db.select(table.c.availability_id, table.c.slot_start_time, table.c.status).where(
+        table.c.provider_id == provider_id,
+        table.c.slot_start_time >= window_start,
+        table.c.slot_start_time < window_end
+    )
+    if appointment_type:
+        stored_query = stored_query.where(table.c.appointment_type == appointment_type)
+    stored_rows = db.session.execute(stored_query).all()
+    rules = window_rules(provider_id, start_date, end_date, appointment_type)
+    zones = rule_zones(rules, stored_rows)
+
+    counts = {'available': sum(len(rule[1]) for rule in rules.values())}
+    for row in stored_rows:
+        if rule_produces(rules, row):
+            counts['available'] -= 1
+        elif not start_date <= local_date(zones.get(row.availability_id) or 'UTC', row.slot_start_time) <= end_date:
+            continue
+        counts[row.status] = counts.get(row.status, 0) + 1
+    return counts
+
+def provider_day_counts(provider_id: str, start_date, end_date) -> dict:
+    """{local day: {status: count}} for a provider's slots between start_date and end_date.
+
+    The per-day counterpart of provider_slot_counts(): each rule's slots are
+    bucketed by local day in one array pass and stored rows move their slot to
+    their own status.
+    """
+    window_start, window_end = padded_utc_window(start_date, end_date)
+    table = AppointmentSlot.__table__
+    stored_rows = db.session.execute(
+        db.select(table.c.availability_id, table.c.slot_start_time, table.c.status).where(
+            table.c.provider_id == provider_id,
+            table.c.slot_start_time >= window_start,
+            table.c.slot_start_time < window_end
+        )
+    ).all()
+    rules = window_rules(provider_id, start_date, end_date)
+    zones = rule_zones(rules, stored_rows)
+
+    counts = {}
+    for availability, starts, _ in rules.values():
+        days, day_counts = np.unique(zone_transitions(availability.timezone).to_local(starts).astype('datetime64[D]'),
+                                     return_counts=True)
+        for day, count in zip(days.tolist(), day_counts.tolist()):
+            day_status = counts.setdefault(day, {})
+            day_status['available'] = day_status.get('available', 0) + count
+    for row in stored_rows:
+        day = local_date(zones.get(row.availability_id) or 'UTC', row.slot_start_time)
+        if rule_produces(rules, row):
+            counts[day]['available'] -= 1
+        elif not start_date <= day <= end_date:
+            continue
+        day_status = counts.setdefault(day, {})
+        day_status[row.status] = day_status.get(row.status, 0) + 1
+    return counts
+
+def provider_slots(provider_id: str, start_date, end_date, status: str = None, appointment_type: str = None,
+                   after: tuple = None, limit: int = None):
+    """Iterate a provider's slots starting between start_date and end_date, in (start, id) order.
+
+    Dates are local to each availability. Open slots are computed from the
+    availability rules; a stored AppointmentSlot row (booked, cancelled, blocked,
+    ...) replaces the computed slot it matches. `after` is a (start, id) keyset
+    position from decode_cursor(); only later slots are returned. Stored rows are
+    read after it in keyset batches of `limit` + 1 and each rule is expanded a
+    few days at a time, so a page costs about the same however wide the window.
+    """
+    batch_size = (limit or app.config['PAGE_DEFAULT_LIMIT']) + 1
+    # UTC range scans on (provider_id, slot_start_time, status)
+    window_start, window_end = padded_utc_window(start_date, end_date)
+    stored_query = AppointmentSlot.query.filter(
+        AppointmentSlot.provider_id == provider_id,
+        AppointmentSlot.slot_start_time >= window_start,
+        AppointmentSlot.slot_start_time < window_end
+    )
+    if appointment_type:
+        stored_query = stored_query.filter(AppointmentSlot.appointment_type == appointment_type)
+    # Computed slots are always open, so other statuses only need the stored rows
+    computed = status in (None, 'available')
+    if not computed:
+        stored_query = stored_query.filter(AppointmentSlot.status == status)
+
+    # One page (plus one) per batch; later batches are only read when rows of the
+    # padded UTC range fall outside the local dates or only replace a filtered slot
+    def stored_rows():
+        position = after
+        while True:
+            query = stored_query
+            if position is not None:
+                query = query.filter(db.or_(
+                    AppointmentSlot.slot_start_time > position[0],
+                    db.and_(AppointmentSlot.slot_start_time == position[0], AppointmentSlot.id > position[1])
+                ))
+            batch = query.order_by(AppointmentSlot.slot_start_time, AppointmentSlot.id).limit(batch_size).all()
+            yield from ((row.slot_start_time, row.id, 0, row) for row in batch)
+            if len(batch) < batch_size:
+                return
+            position = (batch[-1].slot_start_time, batch[-1].id)
+
+    availabilities = list(window_availabilities(provider_id, start_date, end_date, appointment_type)) if computed else []
+    zones = {availability.id: availability.timezone for availability in availabilities}
+
+    def zone_name(availability_id):
+        if availability_id not in zones:
+            zones[availability_id] = db.session.query(ProviderAvailability.timezone).filter(
+                ProviderAvailability.id == availability_id
+            ).scalar()
+        return zones[availability_id] or 'UTC'
+
+    # Rows at the cursor's own start that sort before it still replace their computed slot
+    replaced_at_cursor = set()
+    if computed and after is not None:
+        replaced_at_cursor = set(db.session.scalars(db.select(AppointmentSlot.availability_id).where(
+            AppointmentSlot.provider_id == provider_id,
+            AppointmentSlot.slot_start_time == after[0],
+            AppointmentSlot.id <= after[1]
+        )))
+
+    def rule_slots(availability, render_size=256):
+        zone = zone_transitions(availability.timezone)
+        days = availability_days(availability, start_date, end_date)
+        if after is not None:
+            # A day early covers zones whose clocks fall back across midnight
+            first_day = local_date(availability.timezone, after[0]) - timedelta(days=1)
+            days = days[days >= np.datetime64(first_day, 'D')]
+        span = 1
+        while len(days):
+            starts, ends = occurrence_slot_times(availability, days[:span])
+            days = days[span:]
+            span = min(span * 2, 64)
+            if after is not None:
+                first = int(np.searchsorted(starts, np.datetime64(after[0], 'm')))
+                starts, ends = starts[first:], ends[first:]
+            # Local renderings are computed a few hundred at a time, as the page consumes slots
+            for offset in range(0, len(starts), render_size):
+                chunk_starts, chunk_ends = starts[offset:offset + render_size], ends[offset:offset + render_size]
+                for start, end, local_start, local_end in zip(
+                    chunk_starts.astype('datetime64[us]').tolist(), chunk_ends.astype('datetime64[us]').tolist(),
+                    zone.local_isoformats(chunk_starts), zone.local_isoformats(chunk_ends)
+                ):
+                    yield start, slot_id_for(availability.id, start), 1, (availability, end, local_start, local_end)
+
+    def computed_slot(availability, start, slot_id, end, local_start, local_end):
+        return {
+            'id': slot_id,
+            'availability_id': availability.id,
+            'provider_id': provider_id,
+            'slot_start_time': start.isoformat(),
+            'slot_end_time': end.isoformat(),
+            'status': 'available',
+            'patient_id': None,
+            'appointment_type': availability.appointment_type,
+            'booking_reference': None,
+            'timezone': availability.timezone,
+            'local_start_time': local_start,
+            'local_end_time': local_end
+        }
+
+    streams = [rule_slots(availability) for availability in availabilities]
+    streams.append(stored_rows())
+    # Every rule and the stored rows come out ordered, so they are merged lazily; a
+    # stored row replaces the computed slot of its availability at the same start
+    for start, group in itertools.groupby(heapq.merge(*streams, key=lambda item: item[:3]), key=lambda item: item[0]):
+        group = list(group)
+        rule_ids = {item[3][0].id for item in group if item[2] == 1}
+        replaced = {item[3].availability_id for item in group if item[2] == 0}
+        if after is not None and start == after[0]:
+            replaced |= replaced_at_cursor
+        for _, slot_id, kind, value in group:
+            if kind == 1:
+                availability = value[0]
+                if availability.id in replaced or (after is not None and (start, slot_id) <= after):
+                    continue
+                yield computed_slot(availability, start, slot_id, *value[1:])
+                continue
+            zone = zone_name(value.availability_id)
+            if status is not None and value.status != status:
+                continue
+            if value.availability_id not in rule_ids and not start_date <= local_date(zone, start) <= end_date:
+                continue
+            yield value.to_dict(zone)
+
+def search_open_slots(window_start: datetime, window_end: datetime, specialization: str = None,
+                      appointment_type: str = None, location_type: str = None, limit: int = 100,
+                      after: tuple = None) -> list:
+    """The earliest stored open slots of any provider starting in [window_start, window_end), in (start, id) order.
+
+    Each (appointment_type, location_type) combination is one ordered seek on a
+    partial open-slot index, with omitted filters expanded to every allowed value
+    so no seek has to sort; the seeks' first `limit` rows are merged. Only slots
+    up to the slot horizon have rows, so later ones are not found.
+    """
+    table = AppointmentSlot.__table__
+    # The literal predicate lets SQLite pick the partial index; a bound 'available' would not
+    query = db.select(
+        table.c.id, table.c.availability_id, table.c.provider_id, table.c.slot_start_time,
+        table.c.slot_end_time, table.c.appointment_type, table.c.location_type
+    ).where(
+        text(OPEN_SLOT),
+        table.c.appointment_type == bindparam('slot_type'),
+        table.c.location_type == bindparam('slot_location'),
+        table.c.slot_start_time >= window_start,
+        table.c.slot_start_time < window_end
+    )
+    if specialization:
+        query = query.where(table.c.specialization == search_key(specialization))
+    if after is not None:
+        query = query.where(db.or_(
+            table.c.slot_start_time > after[0],
+            db.and_(table.c.slot_start_time == after[0], table.c.id > after[1])
+        ))
+    query = query.order_by(table.c.slot_start_time, table.c.id).limit(limit)
+
+    # One statement, executed once per combination
+    streams = [
+        db.session.execute(query, {'slot_type': slot_type, 'slot_location': slot_location}).all()
+        for slot_type, slot_location in itertools.product(
+            [appointment_type] if appointment_type else APPOINTMENT_TYPES,
+            [location_type] if location_type else LOCATION_TYPES
+        )
+    ]
+    return list(itertools.islice(heapq.merge(*streams, key=lambda row: (row.slot_start_time, row.id)), limit))
+
+def get_or_materialize_slot(slot_id: str):
+    """Load a slot row, writing it from its availability if it is still virtual.
+
+    Returns None when the id does not name a slot. A new row is only added to the
+    session; concurrent bookings of the same virtual slot collide on its primary
+    key when the caller commits.
+    """
+    slot = db.session.get(AppointmentSlot, slot_id)
+    if slot is not None:
+        return slot
+    parsed = parse_slot_id(slot_id)
+    if parsed is None:
+        return None
+    availability_id, start = parsed
+    availability = db.session.get(ProviderAvailability, availability_id)
+    if availability is None or availability.status == 'cancelled':
+        return None
+
+    # Rows stored under a random id before slot ids were deterministic
+    slot = AppointmentSlot.query.filter_by(availability_id=availability_id, slot_start_time=start).first()
+    if slot is not None:
+        return slot
+
+    day = local_date(availability.timezone, start)
+    starts, _ = availability_slot_times(availability, day, day)
+    if np.datetime64(start, 'm') not in starts:
+        return None
+    slot = AppointmentSlot(
+        id=slot_id,
+        availability_id=availability.id,
+        provider_id=availability.provider_id,
+        slot_start_time=start,
+        slot_end_time=start + timedelta(minutes=availability.slot_duration),
+        status='available',
+        appointment_type=availability.appointment_type,
+        **slot_search_fields(availability)
+    )
+    db.session.add(slot)
+    return slot
+
+def materialize_availability(availability: ProviderAvailability, through) -> int:
+    """Store the slot rows of an availability up to `through`; returns the rows inserted.
+
+    Continues from materialized_through, skipping slots that already have a row
+    (booked ahead of the horizon, or stored under a random id by older code). The
+    rows are added to the session; the caller commits.
+    """
+    through = min(through, availability.last_date)
+    start = availability.date
+    if availability.materialized_through is not None:
+        start = max(start, availability.materialized_through + timedelta(days=1))
+    if start > through:
+        # Nothing left to store; record that so extend_slot_horizon stops selecting it
+        availability.materialized_through = max(through, availability.materialized_through or through)
+        return 0
+
+    rows = build_appointment_slot_rows(availability, start, through)
+    if rows:
+        existing = {
+            slot_start for (slot_start,) in db.session.query(AppointmentSlot.slot_start_time).filter(
+                AppointmentSlot.availability_id == availability.id,
+                AppointmentSlot.slot_start_time >= rows[0]['slot_start_time'],
+                AppointmentSlot.slot_start_time <= rows[-1]['slot_start_time']
             )
-            slots.append(appointment_slot)
+        }
+        rows = [row for row in rows if row['slot_start_time'] not in existing]
+        insert_appointment_slots(rows)
+    availability.materialized_through = through
+    return len(rows)
+
+def slot_horizon_end():
+    """Last day whose slots should be stored as rows."""
+    return datetime.utcnow().date() + timedelta(days=app.config['SLOT_HORIZON_DAYS'])
+
+def materialization_progress(availability: ProviderAvailability) -> dict:
+    total_slots = len(availability_slot_times(availability)[0])
+    slots_materialized = AppointmentSlot.query.filter_by(availability_id=availability.id).count()
+    return {
+        'materialized_through': availability.materialized_through.isoformat() if availability.materialized_through else None,
+        'horizon_end': slot_horizon_end().isoformat(),
+        'slots_materialized': slots_materialized,
+        'total_slots': total_slots,
+        'complete': availability.materialized_through is not None and availability.materialized_through >= availability.last_date
+    }
 
-        if availability.is_recurring:
-            current_date = get_next_date(current_date, availability.recurrence_pattern).date()
-        else:
+def extend_slot_horizon(batch_size: int = None, pause: float = None, max_retries: int = 3) -> dict:
+    """Store slot rows up to the horizon for every availability that is behind it.
+
+    Each batch of availabilities is its own transaction, so the SQLite write lock
+    is only held briefly. A batch that collides with a concurrent booking is
+    rolled back and picked up again with the booked row skipped, up to
+    max_retries times in a row before the IntegrityError is raised.
+    """
+    batch_size = batch_size or app.config['SLOT_HORIZON_BATCH_SIZE']
+    pause = app.config['SLOT_HORIZON_BATCH_PAUSE'] if pause is None else pause
+    started = time.perf_counter()
+    horizon = slot_horizon_end()
+    report = {'availabilities': 0, 'slots': 0, 'batches': 0, 'horizon_end': horizon.isoformat()}
+
+    behind = db.and_(
+        ProviderAvailability.date <= horizon,
+        ProviderAvailability.status.is_distinct_from('cancelled'),
+        db.or_(
+            ProviderAvailability.materialized_through.is_(None),
+            db.and_(ProviderAvailability.is_recurring.is_(True),
+                    ProviderAvailability.materialized_through < horizon,
+                    ProviderAvailability.materialized_through < ProviderAvailability.recurrence_end_date)
+        )
+    )
+    retries = 0
+    while True:
+        batch = ProviderAvailability.query.filter(behind).order_by(ProviderAvailability.id).limit(batch_size).all()
+        if not batch:
+            break
+        try:
+            slots = sum(materialize_availability(availability, horizon) for availability in batch)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            retries += 1
+            if retries > max_retries:
+                raise
+            continue
+        retries = 0
+        report['availabilities'] += len(batch)
+        report['slots'] += slots
+        report['batches'] += 1
+        if len(batch) < batch_size:
             break
+        time.sleep(pause)
+
+    report['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    report['finished_at'] = datetime.utcnow().isoformat()
+    return report
+
+def sync_availability_slots(availability: ProviderAvailability, through=None) -> dict:
+    """Bring the stored slot rows of an availability in line with its current rules.
+
+    Only the difference is written: unbooked rows whose time no longer matches an
+    occurrence are deleted, missing occurrences up to `through` are inserted, and
+    matching rows are left alone. Stored rows past `through` (booked ahead of the
+    horizon) are matched against the rules too. Booked rows are never touched;
+    those the rules no longer produce are returned as orphaned bookings. With
+    through=None every unbooked row is removed. The caller commits.
+    """
+    table = AppointmentSlot.__table__
+    stored = db.session.execute(
+        db.select(table.c.id, table.c.slot_start_time, table.c.slot_end_time, table.c.status)
+        .where(table.c.availability_id == availability.id)
+    ).all()
+
+    wanted = {}
+    if through is not None and availability.date <= through:
+        # Cover every stored row; a UTC start is at most a day from its local date
+        latest = max((row.slot_start_time for row in stored), default=None)
+        match_through = through
+        if latest is not None:
+            match_through = min(availability.last_date, max(through, latest.date() + timedelta(days=1)))
+        starts, ends = availability_slot_times(availability, availability.date, match_through)
+        wanted = dict(zip(starts.astype('datetime64[us]').tolist(), ends.astype('datetime64[us]').tolist()))
+
+    delete_ids, orphaned_ids, kept_starts = [], [], set()
+    for row in stored:
+        if wanted.get(row.slot_start_time) == row.slot_end_time:
+            kept_starts.add(row.slot_start_time)
+        elif row.status == 'booked':
+            orphaned_ids.append(row.id)
+            kept_starts.add(row.slot_start_time)  # its id is taken; the slot stays booked
+        else:
+            delete_ids.append(row.id)
+
+    if delete_ids:
+        db.session.execute(table.delete().where(table.c.id == bindparam('_id')),
+                           [{'_id': slot_id} for slot_id in delete_ids])
+    inserts = [row for row in build_appointment_slot_rows(availability, availability.date, through)
+               if row['slot_start_time'] not in kept_starts] if wanted else []
+    insert_appointment_slots(inserts)
+    if wanted:
+        location_type = slot_search_fields(availability)['location_type']
+        db.session.execute(
+            table.update()
+            .where(table.c.availability_id == availability.id, table.c.status != 'booked',
+                   db.or_(table.c.appointment_type != availability.appointment_type,
+                          table.c.location_type.is_distinct_from(location_type)))
+            .values(appointment_type=availability.appointment_type, location_type=location_type)
+        )
+    availability.materialized_through = through if wanted else None
+
+    orphaned = AppointmentSlot.query.filter(AppointmentSlot.id.in_(orphaned_ids)).order_by(
+        AppointmentSlot.slot_start_time
+    ).all() if orphaned_ids else []
+    return {
+        'slots_inserted': len(inserts),
+        'slots_deleted': len(delete_ids),
+        'slots_unchanged': len(stored) - len(delete_ids) - len(orphaned_ids),
+        'orphaned_booking_count': len(orphaned),
+        'orphaned_bookings': [slot.to_dict() for slot in orphaned[:MAX_REPORTED_CONFLICTS]]
+    }
 
-    return slots
+def refresh_daily_rollups(provider_id: str, start_date, end_date) -> int:
+    """Recompute a provider's daily rollups for start_date..end_date; returns the days stored.
+
+    Used when availability is created, edited or deleted, which can change any
+    day in its range. Pending session changes are flushed first; the caller commits.
+    """
+    db.session.flush()
+    table = ProviderDailyRollup.__table__
+    counts = provider_day_counts(provider_id, start_date, end_date)
+    db.session.execute(table.delete().where(
+        table.c.provider_id == provider_id, table.c.day >= start_date, table.c.day <= end_date
+    ))
+    now = datetime.utcnow()
+    rows = [
+        {
+            'provider_id': provider_id,
+            'day': day,
+            **{f'{status}_slots': day_status.get(status, 0) for status in ROLLUP_STATUSES},
+            'updated_at': now
+        }
+        for day, day_status in sorted(counts.items())
+        if start_date <= day <= end_date and any(day_status.get(status) for status in ROLLUP_STATUSES)
+    ]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    return len(rows)
+
+def bump_daily_rollup(slot: AppointmentSlot, **deltas) -> None:
+    """Move a slot's day counters by deltas (e.g. available=-1, booked=1) with one atomic UPDATE.
+
+    Also keeps the slot's availability current_appointments in step with its
+    booked count. A day without a rollup row yet is recomputed instead, after
+    the slot change is flushed. The caller commits.
+    """
+    availability = db.session.get(ProviderAvailability, slot.availability_id)
+    if availability is not None and deltas.get('booked'):
+        db.session.execute(ProviderAvailability.__table__.update().where(
+            ProviderAvailability.__table__.c.id == availability.id
+        ).values(current_appointments=db.func.coalesce(ProviderAvailability.__table__.c.current_appointments, 0)
+                 + deltas['booked']))
+    day = local_date(availability.timezone if availability else 'UTC', slot.slot_start_time)
+    table = ProviderDailyRollup.__table__
+    result = db.session.execute(table.update().where(
+        table.c.provider_id == slot.provider_id, table.c.day == day
+    ).values(updated_at=datetime.utcnow(), **{
+        f'{status}_slots': table.c[f'{status}_slots'] + delta for status, delta in deltas.items()
+    }))
+    if result.rowcount == 0:
+        refresh_daily_rollups(slot.provider_id, day, day)
+
+def rebuild_daily_rollups() -> dict:
+    """Recompute every provider's daily rollups and availability booking counts from scratch."""
+    report = {'providers': 0, 'days': 0}
+    spans = db.session.query(
+        ProviderAvailability.provider_id, func.min(ProviderAvailability.date),
+        func.max(func.coalesce(ProviderAvailability.recurrence_end_date, ProviderAvailability.date))
+    ).group_by(ProviderAvailability.provider_id).all()
+    for provider_id, first_day, last_day in spans:
+        report['days'] += refresh_daily_rollups(provider_id, first_day, last_day)
+        report['providers'] += 1
+        db.session.commit()
+
+    slots = AppointmentSlot.__table__
+    booked = db.select(func.count()).where(
+        slots.c.availability_id == ProviderAvailability.__table__.c.id, slots.c.status == 'booked'
+    ).scalar_subquery()
+    db.session.execute(ProviderAvailability.__table__.update().values(current_appointments=booked))
+    db.session.execute(Provider.__table__.update().values(schedule_version=Provider.__table__.c.schedule_version + 1))
+    db.session.commit()
+    return report
+
+SCHEDULE_ETAG_FORMAT = 1  # change when schedule read responses change shape, so cached copies are not revalidated
+
+def bump_schedule_version(model, *account_ids) -> None:
+    """Invalidate the cached schedule reads of Provider or Patient accounts; the caller commits."""
+    account_ids = {account_id for account_id in account_ids if account_id}
+    if account_ids:
+        table = model.__table__
+        db.session.execute(table.update().where(table.c.id.in_(account_ids)).values(
+            schedule_version=table.c.schedule_version + 1
+        ))
+
+def bump_availability_patients(availability_id: str) -> None:
+    """Invalidate the appointment lists of patients booked on an availability whose rules changed."""
+    bump_schedule_version(Patient, *(patient_id for (patient_id,) in db.session.query(AppointmentSlot.patient_id).filter(
+        AppointmentSlot.availability_id == availability_id, AppointmentSlot.patient_id.isnot(None)
+    ).distinct()))
+
+def provider_schedule_validator(provider_id: str, **_) -> str:
+    """Validator of a provider's schedule reads: the provider's schedule version."""
+    return str(db.session.query(Provider.schedule_version).filter_by(id=provider_id).scalar())
+
+def patient_schedule_validator(**_) -> str:
+    """Validator of the current patient's appointment reads.
+
+    Besides the schedule version, the lists depend on the clock: is_past and
+    is_upcoming flip as appointments start (counted on the patient index), and
+    is_today at local midnight, which always falls on a UTC quarter hour.
+    """
+    patient_id = request.patient.id
+    now = datetime.utcnow()
+    version = db.session.query(Patient.schedule_version).filter_by(id=patient_id).scalar()
+    started = db.session.query(func.count()).filter(
+        AppointmentSlot.patient_id == patient_id, AppointmentSlot.slot_start_time < now
+    ).scalar()
+    return f'{version}.{started}.{now:%Y%m%d%H}.{now.minute // 15}'
+
+def schedule_cached(validator, private: bool = False):
+    """Serve a schedule read with a strong ETag built from validator(**view_args) and the URL.
+
+    A matching If-None-Match is answered with 304 before the view runs, so none
+    of its slot queries execute. Responses must be revalidated before reuse.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag = hashlib.sha256(
+                f'{SCHEDULE_ETAG_FORMAT}|{validator(**kwargs)}|{request.full_path}'.encode()
+            ).hexdigest()[:32]
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                response = app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            if private:
+                response.cache_control.private = True
+            else:
+                response.cache_control.public = True
+            return response
+
+        return decorated
+    return decorator
 \
 \
 
@@ -827,7 +2794,7 @@ def create_appointment_slots(availability: ProviderAvailability) -> list:
 def register_provider():
     try:
         # Validate request data
-        data = provider_schema.load(request.json)
+        data = load_payload(provider_schema, request.json)
         
         # Check for existing provider
         if Provider.query.filter_by(email=data['email'].lower()).first():
@@ -838,17 +2805,7 @@ def register_provider():
             return jsonify({'success': False, 'message': 'License number already registered'}), 409
 
         # Create new provider
-        provider = Provider(
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            email=data['email'].lower(),
-            phone_number=data['phone_number'],
-            password_hash=hash_password(data['password']),
-            specialization=data['specialization'],
-            license_number=data['license_number'],
-            years_of_experience=data['years_of_experience'],
-            clinic_address=data['clinic_address']
-        )
+        provider = Provider(**provider_fields(data, hash_password(data['password'])))
         
         db.session.add(provider)
         db.session.commit()
@@ -874,6 +2831,9 @@ def register_provider():
             'errors': e.messages
         }), 422
     
+    except PasswordPoolSaturated:
+        return service_busy_response()
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -929,7 +2889,7 @@ def register_provider():
 def verify_email(token):
     try:
         # Decode token
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+        payload = key_ring.decode(token)
         provider_id = payload['provider_id']
 
         # Update provider status
@@ -1035,7 +2995,7 @@ def verify_email(token):
 def login():
     try:
         # Validate request data
-        data = login_schema.load(request.json)
+        data = load_payload(login_schema, request.json)
         identifier = data['identifier']
         password = data['password']
         remember_me = data.get('remember_me', False)
@@ -1085,14 +3045,16 @@ def login():
                 'error_code': 'INACTIVE_ACCOUNT'
             }), 403
 
+        # Converge stored hashes on the configured cost
+        rehash_if_needed(provider, password)
+
         # Generate tokens
-        access_token, refresh_token, expires_in = generate_tokens(provider.id, remember_me)
+        access_token, refresh_token, expires_in = generate_tokens(provider.id, remember_me, provider.token_epoch)
 
-        # Update provider login info
-        provider.last_login = datetime.utcnow()
-        provider.login_count += 1
-        provider.reset_failed_attempts()
+        # Security-critical state in one transaction; login telemetry is buffered
+        provider.reset_failed_attempts(commit=False)
         db.session.commit()
+        login_telemetry.record_login(Provider, provider.id)
 
         return jsonify({
             'success': True,
@@ -1112,6 +3074,8 @@ def login():
             'message': 'Validation error',
             'errors': e.messages
         }), 422
+    except PasswordPoolSaturated:
+        return service_busy_response()
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1192,19 +3156,26 @@ def refresh_token():
                 'error_code': 'TOKEN_EXPIRED'
             }), 401
 
+        # Tokens issued before the last logout-all are revoked
+        provider = load_principal(Provider, stored_token.provider_id)
+        if not provider or stored_token.token_epoch != provider.token_epoch:
+            return jsonify({
+                'success': False,
+                'message': 'Refresh token has been revoked',
+                'error_code': 'TOKEN_REVOKED'
+            }), 401
+
         # Generate new access token
-        access_token = jwt.encode(
+        access_token = key_ring.encode(
             {
                 'provider_id': stored_token.provider_id,
+                'epoch': provider.token_epoch,
                 'exp': datetime.utcnow() + timedelta(seconds=app.config['JWT_ACCESS_TOKEN_EXPIRES'])
-            },
-            app.config['SECRET_KEY'],
-            algorithm='HS256'
+            }
         )
 
         # Update last used timestamp
-        stored_token.last_used_at = datetime.utcnow()
-        db.session.commit()
+        login_telemetry.record_token_use(RefreshToken, stored_token.id)
 
         return jsonify({
             'success': True,
@@ -1287,7 +3258,7 @@ def logout():
 @swag_from({
     'tags': ['Provider Authentication'],
     'summary': 'Logout from all devices',
-    'description': 'Revoke all refresh tokens for the provider',
+    'description': 'Revoke all access and refresh tokens issued to the provider',
     'security': [{'Bearer': []}],
     'responses': {
         '200': {
@@ -1304,12 +3275,12 @@ def logout():
 })
 def logout_all():
     try:
-        # Revoke all refresh tokens for the provider
-        RefreshToken.query.filter_by(
-            provider_id=request.provider.id,
-            is_revoked=False
-        ).update({'is_revoked': True})
+        # One epoch bump revokes every access and refresh token issued so far
+        Provider.query.filter_by(id=request.provider.id).update(
+            {'token_epoch': Provider.token_epoch + 1}, synchronize_session=False
+        )
         db.session.commit()
+        invalidate_principal(Provider, request.provider.id)
 
         return jsonify({
             'success': True,
@@ -1412,7 +3383,7 @@ def logout_all():
 def register_patient():
     try:
         # Validate request data
-        data = patient_schema.load(request.json)
+        data = load_payload(patient_schema, request.json)
         
         # Check for existing patient
         if Patient.query.filter_by(email=data['email'].lower()).first():
@@ -1432,44 +3403,10 @@ def register_patient():
             }), 409
 
         # Hash password
-        password_hash = bcrypt.hashpw(
-            data['password'].encode('utf-8'),
-            bcrypt.gensalt(rounds=12)
-        ).decode('utf-8')
+        password_hash = hash_password(data['password'])
 
         # Create patient
-        patient = Patient(
-            first_name=data['first_name'].strip(),
-            last_name=data['last_name'].strip(),
-            email=data['email'].lower().strip(),
-            phone_number=data['phone_number'].strip(),
-            password_hash=password_hash,
-            date_of_birth=data['date_of_birth'],
-            gender=data['gender'],
-            address={
-                'street': data['address']['street'].strip(),
-                'city': data['address']['city'].strip(),
-                'state': data['address']['state'].strip(),
-                'zip': data['address']['zip'].strip()
-            }
-        )
-
-        # Add optional fields
-        if 'emergency_contact' in data:
-            patient.emergency_contact = {
-                'name': data['emergency_contact']['name'].strip(),
-                'phone': data['emergency_contact']['phone'].strip(),
-                'relationship': data['emergency_contact']['relationship'].strip()
-            }
-
-        if 'medical_history' in data:
-            patient.medical_history = [item.strip() for item in data['medical_history']]
-
-        if 'insurance_info' in data:
-            patient.insurance_info = {
-                'provider': data['insurance_info']['provider'].strip(),
-                'policy_number': data['insurance_info']['policy_number'].strip()
-            }
+        patient = Patient(**patient_fields(data, password_hash))
 
         db.session.add(patient)
         db.session.commit()
@@ -1499,6 +3436,9 @@ def register_patient():
             'errors': e.messages
         }), 422
     
+    except PasswordPoolSaturated:
+        return service_busy_response()
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -1593,7 +3533,7 @@ def register_patient():
 def patient_login():
     try:
         # Validate request data
-        data = patient_login_schema.load(request.json)
+        data = load_payload(patient_login_schema, request.json)
         identifier = data['identifier']
         password = data['password']
         remember_me = data.get('remember_me', False)
@@ -1638,15 +3578,17 @@ def patient_login():
                 'error_code': 'INACTIVE_ACCOUNT'
             }), 403
 
+        # Converge stored hashes on the configured cost
+        rehash_if_needed(patient, password)
+
         # Generate tokens
-        access_token = jwt.encode(
+        access_token = key_ring.encode(
             {
                 'patient_id': patient.id,
                 'email': patient.email,
+                'epoch': patient.token_epoch,
                 'exp': datetime.utcnow() + timedelta(minutes=30)
-            },
-            app.config['SECRET_KEY'],
-            algorithm='HS256'
+            }
         )
 
         refresh_token = str(uuid.uuid4())
@@ -1658,14 +3600,16 @@ def patient_login():
             device_info=device_info,
             ip_address=request.remote_addr,
             user_agent=request.user_agent.string,
-            expires_at=datetime.utcnow() + timedelta(days=7)
+            expires_at=datetime.utcnow() + timedelta(days=7),
+            token_epoch=patient.token_epoch
         )
         
         db.session.add(session)
 
-        # Record login
-        patient.record_login(request.remote_addr, request.user_agent.string)
-        db.session.commit()
+        # Session, lock reset and rehash commit together; telemetry is buffered after the commit
+        logged_in_at = patient.record_login(request.remote_addr, request.user_agent.string)
+        patient_data = patient.to_dict()
+        patient_data['last_login'] = logged_in_at.isoformat()
 
         return jsonify({
             'success': True,
@@ -1675,7 +3619,7 @@ def patient_login():
                 'refresh_token': refresh_token,
                 'expires_in': 1800,  # 30 minutes
                 'token_type': 'Bearer',
-                'patient': patient.to_dict()
+                'patient': patient_data
             }
         }), 200
 
@@ -1685,6 +3629,8 @@ def patient_login():
             'message': 'Validation error',
             'errors': e.messages
         }), 422
+    except PasswordPoolSaturated:
+        return service_busy_response()
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1799,19 +3745,26 @@ def patient_refresh_token():
                 'error_code': 'TOKEN_EXPIRED'
             }), 401
 
+        # Tokens issued before the last logout-all are revoked
+        patient = load_principal(Patient, stored_token.patient_id)
+        if not patient or stored_token.token_epoch != patient.token_epoch:
+            return jsonify({
+                'success': False,
+                'message': 'Refresh token has been revoked',
+                'error_code': 'TOKEN_REVOKED'
+            }), 401
+
         # Generate new access token
-        access_token = jwt.encode(
+        access_token = key_ring.encode(
             {
                 'patient_id': stored_token.patient_id,
+                'epoch': patient.token_epoch,
                 'exp': datetime.utcnow() + timedelta(seconds=app.config['JWT_ACCESS_TOKEN_EXPIRES'])
-            },
-            app.config['SECRET_KEY'],
-            algorithm='HS256'
+            }
         )
 
         # Update last used timestamp
-        stored_token.last_used_at = datetime.utcnow()
-        db.session.commit()
+        login_telemetry.record_token_use(PatientSession, stored_token.id)
 
         return jsonify({
             'success': True,
@@ -1912,7 +3865,7 @@ def patient_logout():
 @swag_from({
     'tags': ['Patient Authentication'],
     'summary': 'Logout from all devices',
-    'description': 'Revoke all refresh tokens for the patient',
+    'description': 'Revoke all access and refresh tokens issued to the patient',
     'security': [{'Bearer': []}],
     'parameters': [
         {
@@ -1949,12 +3902,12 @@ def patient_logout():
 })
 def patient_logout_all():
     try:
-        # Revoke all refresh tokens for the patient
-        PatientSession.query.filter_by(
-            patient_id=request.patient.id,
-            is_revoked=False
-        ).update({'is_revoked': True})
+        # One epoch bump revokes every access token and session issued so far
+        Patient.query.filter_by(id=request.patient.id).update(
+            {'token_epoch': Patient.token_epoch + 1}, synchronize_session=False
+        )
         db.session.commit()
+        invalidate_principal(Patient, request.patient.id)
 
         return jsonify({
             'success': True,
@@ -2017,38 +3970,29 @@ def patient_logout_all():
 def create_availability():
     try:
         # Validate request data
-        data = availability_schema.load(request.json)
+        data = load_payload(availability_schema, request.json)
         
         # Create availability record
-        availability = ProviderAvailability(
-            provider_id=request.provider.id,
-            date=data['date'],
-            start_time=data['start_time'],
-            end_time=data['end_time'],
-            timezone=data['timezone'],
-            slot_duration=data.get('slot_duration', 30),
-            break_duration=data.get('break_duration', 0),
-            is_recurring=data.get('is_recurring', False),
-            recurrence_pattern=data.get('recurrence_pattern'),
-            recurrence_end_date=data.get('recurrence_end_date'),
-            appointment_type=data.get('appointment_type', 'consultation'),
-            location=data['location'],
-            pricing=data.get('pricing'),
-            special_requirements=data.get('special_requirements', []),
-            notes=data.get('notes')
-        )
+        availability = availability_from_data(request.provider.id, data)
         
-        # Check for conflicts
-        start_time = datetime.combine(data['date'], datetime.strptime(data['start_time'], '%H:%M').time())
-        end_time = datetime.combine(data['date'], datetime.strptime(data['end_time'], '%H:%M').time())
+        # Check for conflicts with the provider's other availability
+        conflicts, conflict_count = find_availability_conflicts(availability, MAX_REPORTED_CONFLICTS)
+        if conflict_count:
+            return jsonify({
+                'success': False,
+                'message': f'Availability overlaps existing availability on {conflict_count} occurrence(s)',
+                'conflict_count': conflict_count,
+                'conflicts': conflicts
+            }), 409
 
-        # Save availability
+        # Save availability with slot rows up to the horizon; slot_horizon_job stores the rest over time
         db.session.add(availability)
-        db.session.commit()
+        db.session.flush()
 
-        # Create appointment slots
-        slots = create_appointment_slots(availability)
-        db.session.bulk_save_objects(slots)
+        slots_created = materialize_availability(availability, slot_horizon_end())
+        slot_count = len(availability_slot_times(availability)[0])
+        refresh_daily_rollups(availability.provider_id, availability.date, availability.last_date)
+        bump_schedule_version(Provider, availability.provider_id)
         db.session.commit()
 
         return jsonify({
@@ -2056,12 +4000,13 @@ def create_availability():
             'message': 'Availability slots created successfully',
             'data': {
                 'availability_id': availability.id,
-                'slots_created': len(slots),
+                'slots_created': slots_created,
                 'date_range': {
                     'start': data['date'].isoformat(),
                     'end': data['recurrence_end_date'].isoformat() if data.get('recurrence_end_date') else data['date'].isoformat()
                 },
-                'total_appointments_available': len(slots)
+                'total_appointments_available': slot_count,
+                'materialization': materialization_progress(availability)
             }
         }), 201
 
@@ -2078,92 +4023,415 @@ def create_availability():
             'message': str(e)
         }), 500
 
-@app.route('/api/v1/provider/<provider_id>/availability', methods=['GET'])
+@app.route('/api/v1/provider/availability/bulk', methods=['POST'])
+@jwt_required
 @swag_from({
     'tags': ['Provider Availability'],
-    'summary': 'Get provider availability',
-    'description': 'Get availability slots for a provider',
+    'summary': 'Create many availability blocks',
+    'description': 'Create several availability definitions in one transaction; repeat_weeks clones them as a week template',
     'parameters': [
         {
-            'name': 'start_date',
-            'in': 'query',
-            'type': 'string',
-            'format': 'date',
-            'required': True
-        },
-        {
-            'name': 'end_date',
-            'in': 'query',
-            'type': 'string',
-            'format': 'date',
-            'required': True
-        },
-        {
-            'name': 'status',
-            'in': 'query',
-            'type': 'string',
-            'enum': ['available', 'booked', 'cancelled', 'blocked'],
-            'required': False
-        },
-        {
-            'name': 'appointment_type',
-            'in': 'query',
-            'type': 'string',
-            'required': False
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'availabilities': {
+                        'type': 'array',
+                        'items': {'type': 'object', 'description': 'Same fields as POST /api/v1/provider/availability'}
+                    },
+                    'repeat_weeks': {'type': 'integer', 'minimum': 1, 'maximum': 52}
+                }
+            }
         }
-    ]
+    ],
+    'responses': {
+        '201': {'description': 'All availability blocks created'},
+        '409': {'description': 'Some blocks overlap existing availability or each other; nothing was created'},
+        '422': {'description': 'Validation error'}
+    }
 })
-def get_provider_availability(provider_id):
+def create_availability_bulk():
     try:
-        # Validate dates
-        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
-        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
-        status = request.args.get('status')
-        appointment_type = request.args.get('appointment_type')
-
-        # Build query
-        query = AppointmentSlot.query.filter(AppointmentSlot.provider_id == provider_id)
-
-        if status:
-            query = query.filter(AppointmentSlot.status == status)
-        if appointment_type:
-            query = query.filter(AppointmentSlot.appointment_type == appointment_type)
-
-        slots = query.all()
-
-        # Group slots by date
-        slots_by_date = {}
-        for slot in slots:
-            date_str = slot.slot_start_time.date().isoformat()
-            if date_str not in slots_by_date:
-                slots_by_date[date_str] = []
-            slots_by_date[date_str].append(slot.to_dict())
+        data = load_payload(bulk_availability_schema, request.json)
+        provider_id = request.provider.id
+
+        # Expand the week template: every definition once per repeated week
+        items = [
+            (index, week, availability_from_data(provider_id, item, week))
+            for week in range(data['repeat_weeks'])
+            for index, item in enumerate(data['availabilities'])
+        ]
+        if len(items) > app.config['BULK_AVAILABILITY_MAX_ITEMS']:
+            return jsonify({
+                'success': False,
+                'message': f"At most {app.config['BULK_AVAILABILITY_MAX_ITEMS']} availability blocks per request "
+                           f"(got {len(items)} after repeating)"
+            }), 422
+
+        # Check every block against existing availability and the blocks accepted before it
+        index = AvailabilityIntervalIndex(
+            provider_id,
+            min(availability.date for _, _, availability in items),
+            max(availability.last_date for _, _, availability in items)
+        )
+        results = []
+        for position, week, availability in items:
+            starts, ends = availability_blocks(availability)
+            conflicts, conflict_count = index.conflicts(starts, ends, MAX_REPORTED_CONFLICTS)
+            result = {'index': position, 'week': week, 'date': availability.date.isoformat()}
+            if conflict_count:
+                result.update(status='conflict', conflict_count=conflict_count, conflicts=conflicts)
+            else:
+                index.add(availability.id, starts, ends)
+                result.update(status='created', availability_id=availability.id, total_slots=len(
+                    availability_slot_times(availability)[0]
+                ))
+            results.append(result)
+
+        if any(result['status'] == 'conflict' for result in results):
+            return jsonify({
+                'success': False,
+                'message': 'Some availability blocks overlap; nothing was created',
+                'results': results
+            }), 409
 
-        # Get availability summary
-        total_slots = len(slots)
-        available_slots = sum(1 for slot in slots if slot.status == 'available')
-        booked_slots = sum(1 for slot in slots if slot.status == 'booked')
-        cancelled_slots = sum(1 for slot in slots if slot.status == 'cancelled')
+        # One transaction: availability rows, then their slots up to the horizon, each as one executemany
+        now = datetime.utcnow()
+        horizon = slot_horizon_end()
+        availability_rows, slot_rows = [], []
+        for (_, _, availability), result in zip(items, results):
+            through = min(horizon, availability.last_date)
+            rows = build_appointment_slot_rows(availability, availability.date, through) if availability.date <= through else []
+            if rows:
+                availability.materialized_through = through
+            availability.created_at = availability.updated_at = now
+            availability_rows.append({
+                column.name: getattr(availability, column.name) for column in ProviderAvailability.__table__.columns
+            })
+            slot_rows.extend(rows)
+            result['slots_created'] = len(rows)
+        db.session.execute(ProviderAvailability.__table__.insert(), availability_rows)
+        insert_appointment_slots(slot_rows)
+        refresh_daily_rollups(request.provider.id, min(availability.date for _, _, availability in items),
+                              max(availability.last_date for _, _, availability in items))
+        bump_schedule_version(Provider, request.provider.id)
+        db.session.commit()
 
         return jsonify({
             'success': True,
+            'message': f'Created {len(items)} availability block(s)',
             'data': {
-                'provider_id': provider_id,
-                'availability_summary': {
-                    'total_slots': total_slots,
-                    'available_slots': available_slots,
-                    'booked_slots': booked_slots,
-                    'cancelled_slots': cancelled_slots
-                },
-                'availability': [
-                    {
-                        'date': date,
-                        'slots': slots
-                    }
-                    for date, slots in slots_by_date.items()
-                ]
+                'availability_count': len(items),
+                'slots_created': len(slot_rows),
+                'total_appointments_available': sum(result['total_slots'] for result in results),
+                'results': results
             }
-        }), 200
+        }), 201
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation error',
+            'errors': e.messages
+        }), 422
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+def owned_availability(availability_id: str):
+    """The current provider's availability, or None if missing, cancelled or someone else's."""
+    availability = db.session.get(ProviderAvailability, availability_id)
+    if availability is None or availability.provider_id != request.provider.id or availability.status == 'cancelled':
+        return None
+    return availability
+
+availability_update_schema = AvailabilitySchema(partial=True)
+
+@app.route('/api/v1/provider/availability/<availability_id>', methods=['PUT'])
+@jwt_required
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Update an availability',
+    'description': 'Change availability rules; only slots whose time changed are rewritten and booked slots are kept',
+    'parameters': [
+        {
+            'name': 'availability_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True
+        },
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'description': 'Any fields of POST /api/v1/provider/availability'
+            }
+        }
+    ],
+    'responses': {
+        '200': {'description': 'Availability updated; bookings outside the new rules are listed in orphaned_bookings'},
+        '404': {'description': 'Availability not found'},
+        '409': {'description': 'The new rules overlap other availability'},
+        '422': {'description': 'Validation error'}
+    }
+})
+def update_availability(availability_id):
+    try:
+        availability = owned_availability(availability_id)
+        if availability is None:
+            return jsonify({
+                'success': False,
+                'message': 'Availability not found'
+            }), 404
+
+        data = load_payload(availability_update_schema, request.json)
+        previous_days = (availability.date, availability.last_date)
+        for field, value in data.items():
+            setattr(availability, field, value)
+        if not availability.is_recurring:
+            availability.recurrence_pattern = availability.recurrence_end_date = None
+        elif not availability.recurrence_pattern or not availability.recurrence_end_date:
+            raise ValidationError({'recurrence_pattern': ['recurrence_pattern and recurrence_end_date are required for recurring availability']})
+        elif availability.recurrence_end_date < availability.date:
+            raise ValidationError({'recurrence_end_date': ['Recurrence end date cannot be before the start date']})
+
+        conflicts, conflict_count = find_availability_conflicts(availability, MAX_REPORTED_CONFLICTS)
+        if conflict_count:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Availability overlaps existing availability on {conflict_count} occurrence(s)',
+                'conflict_count': conflict_count,
+                'conflicts': conflicts
+            }), 409
+
+        changes = sync_availability_slots(availability, min(slot_horizon_end(), availability.last_date))
+        refresh_daily_rollups(availability.provider_id, min(previous_days[0], availability.date),
+                              max(previous_days[1], availability.last_date))
+        bump_schedule_version(Provider, availability.provider_id)
+        bump_availability_patients(availability.id)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Availability updated successfully',
+            'data': {
+                'availability': availability.to_dict(),
+                'total_appointments_available': len(availability_slot_times(availability)[0]),
+                **changes
+            }
+        }), 200
+
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Validation error',
+            'errors': e.messages
+        }), 422
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/v1/provider/availability/<availability_id>', methods=['DELETE'])
+@jwt_required
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Delete an availability',
+    'description': 'Remove an availability and its unbooked slots; booked slots are kept and listed',
+    'parameters': [
+        {
+            'name': 'availability_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True
+        }
+    ],
+    'responses': {
+        '200': {'description': 'Availability deleted'},
+        '404': {'description': 'Availability not found'}
+    }
+})
+def delete_availability(availability_id):
+    try:
+        availability = owned_availability(availability_id)
+        if availability is None:
+            return jsonify({
+                'success': False,
+                'message': 'Availability not found'
+            }), 404
+
+        provider_id, first_day, last_day = availability.provider_id, availability.date, availability.last_date
+        changes = sync_availability_slots(availability)
+        if changes['orphaned_booking_count']:
+            # Booked slots still reference the rule, so it is cancelled rather than removed
+            availability.status = 'cancelled'
+        else:
+            db.session.delete(availability)
+        refresh_daily_rollups(provider_id, first_day, last_day)
+        bump_schedule_version(Provider, provider_id)
+        bump_availability_patients(availability_id)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Availability deleted successfully',
+            'data': {
+                'availability_id': availability_id,
+                **changes
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/v1/provider/availability/<availability_id>/progress', methods=['GET'])
+@jwt_required
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Get slot materialization progress',
+    'description': 'How far the slots of an availability have been stored; later slots are still bookable',
+    'parameters': [
+        {
+            'name': 'availability_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True
+        }
+    ],
+    'responses': {
+        '200': {'description': 'Materialization progress'},
+        '404': {'description': 'Availability not found'}
+    }
+})
+def get_availability_progress(availability_id):
+    availability = owned_availability(availability_id)
+    if availability is None:
+        return jsonify({
+            'success': False,
+            'message': 'Availability not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'availability_id': availability.id,
+            **materialization_progress(availability)
+        }
+    }), 200
+
+@app.route('/api/v1/provider/<provider_id>/availability', methods=['GET'])
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Get provider availability',
+    'description': 'Get availability slots for a provider',
+    'parameters': [
+        {
+            'name': 'start_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'end_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'status',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['available', 'booked', 'cancelled', 'blocked'],
+            'required': False
+        },
+        {
+            'name': 'appointment_type',
+            'in': 'query',
+            'type': 'string',
+            'required': False
+        },
+        {
+            'name': 'limit',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Slots per page (default 100, max 500)'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'next_cursor of the previous page'
+        }
+    ]
+})
+@schedule_cached(provider_schedule_validator)
+def get_provider_availability(provider_id):
+    try:
+        # Validate dates
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+        status = request.args.get('status')
+        appointment_type = request.args.get('appointment_type')
+        try:
+            limit, after = page_args()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+
+        # One page of the window's slots after the cursor, plus one to tell whether more follow
+        slots = list(itertools.islice(
+            provider_slots(provider_id, start_date, end_date, status, appointment_type, after, limit), limit + 1
+        ))
+        has_more = len(slots) > limit
+        slots = slots[:limit]
+
+        # Group slots by date
+        slots_by_date = {}
+        for slot in slots:
+            slots_by_date.setdefault(slot['local_start_time'][:10], []).append(slot)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'provider_id': provider_id,
+                'page': {
+                    'limit': limit,
+                    'count': len(slots),
+                    'has_more': has_more,
+                    'next_cursor': encode_cursor(
+                        datetime.fromisoformat(slots[-1]['slot_start_time']), slots[-1]['id']
+                    ) if has_more else None
+                },
+                'availability': [
+                    {
+                        'date': date,
+                        'slots': slots
+                    }
+                    for date, slots in slots_by_date.items()
+                ]
+            }
+        }), 200
 
     except ValueError as e:
         return jsonify({
@@ -2176,6 +4444,963 @@ def get_provider_availability(provider_id):
             'message': str(e)
         }), 500
 
+@app.route('/api/v1/provider/<provider_id>/availability/summary', methods=['GET'])
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Get provider availability counts',
+    'description': 'Slot counts by status for a date range, without listing the slots',
+    'parameters': [
+        {
+            'name': 'start_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'end_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'appointment_type',
+            'in': 'query',
+            'type': 'string',
+            'required': False
+        }
+    ]
+})
+@schedule_cached(provider_schedule_validator)
+def get_provider_availability_summary(provider_id):
+    try:
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+
+    try:
+        counts = provider_slot_counts(provider_id, start_date, end_date, request.args.get('appointment_type'))
+        return jsonify({
+            'success': True,
+            'data': {
+                'provider_id': provider_id,
+                'availability_summary': {
+                    'total_slots': sum(counts.values()),
+                    'available_slots': counts.get('available', 0),
+                    'booked_slots': counts.get('booked', 0),
+                    'cancelled_slots': counts.get('cancelled', 0)
+                },
+                'by_status': counts
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/v1/provider/<provider_id>/availability/calendar', methods=['GET'])
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Get a provider month view',
+    'description': 'Open, booked and cancelled slot counts for every day of a month, from the daily rollups',
+    'parameters': [
+        {
+            'name': 'month',
+            'in': 'query',
+            'type': 'string',
+            'required': True,
+            'description': 'Month as YYYY-MM'
+        }
+    ]
+})
+@schedule_cached(provider_schedule_validator)
+def get_provider_availability_calendar(provider_id):
+    try:
+        first_day = datetime.strptime(request.args.get('month'), '%Y-%m').date()
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'Invalid month format. Use YYYY-MM'
+        }), 400
+
+    try:
+        next_month = (first_day + timedelta(days=31)).replace(day=1)
+        rollups = {
+            rollup.day: rollup for rollup in ProviderDailyRollup.query.filter(
+                ProviderDailyRollup.provider_id == provider_id,
+                ProviderDailyRollup.day >= first_day,
+                ProviderDailyRollup.day < next_month
+            )
+        }
+
+        days = []
+        totals = {f'{status}_slots': 0 for status in ROLLUP_STATUSES}
+        for offset in range((next_month - first_day).days):
+            day = first_day + timedelta(days=offset)
+            rollup = rollups.get(day)
+            day_counts = rollup.to_dict() if rollup else {'date': day.isoformat(), **dict.fromkeys(totals, 0)}
+            for key in totals:
+                totals[key] += day_counts[key]
+            days.append(day_counts)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'provider_id': provider_id,
+                'month': first_day.strftime('%Y-%m'),
+                'totals': totals,
+                'days': days
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/v1/appointment/search', methods=['GET'])
+@swag_from({
+    'tags': ['Provider Availability'],
+    'summary': 'Search open slots across providers',
+    'description': 'The earliest open slots of any provider matching the filters, soonest first',
+    'parameters': [
+        {
+            'name': 'start_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'end_date',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': True
+        },
+        {
+            'name': 'timezone',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'IANA time zone the dates are in (default UTC)'
+        },
+        {
+            'name': 'specialization',
+            'in': 'query',
+            'type': 'string',
+            'required': False
+        },
+        {
+            'name': 'appointment_type',
+            'in': 'query',
+            'type': 'string',
+            'enum': APPOINTMENT_TYPES,
+            'required': False
+        },
+        {
+            'name': 'location_type',
+            'in': 'query',
+            'type': 'string',
+            'enum': LOCATION_TYPES,
+            'required': False
+        },
+        {
+            'name': 'limit',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Slots per page (default 100, max 500)'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'next_cursor of the previous page'
+        }
+    ]
+})
+def search_appointment_slots():
+    try:
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+
+    zone_name = request.args.get('timezone', 'UTC')
+    specialization = request.args.get('specialization')
+    appointment_type = request.args.get('appointment_type')
+    location_type = request.args.get('location_type')
+    if appointment_type and appointment_type not in APPOINTMENT_TYPES:
+        return jsonify({
+            'success': False,
+            'message': f"appointment_type must be one of: {', '.join(APPOINTMENT_TYPES)}"
+        }), 400
+    if location_type and location_type not in LOCATION_TYPES:
+        return jsonify({
+            'success': False,
+            'message': f"location_type must be one of: {', '.join(LOCATION_TYPES)}"
+        }), 400
+    try:
+        zone = load_zone_transitions(zone_name)
+    except (KeyError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': f'Unknown time zone: {zone_name}'
+        }), 400
+    try:
+        limit, after = page_args()
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    try:
+        # The searcher's local days as one UTC range, never reaching into the past
+        window_start, window_end = zone.to_utc(np.array(
+            [start_date, end_date + timedelta(days=1)], dtype='datetime64[m]'
+        )).astype('datetime64[us]').tolist()
+        window_start = max(window_start, datetime.utcnow())
+
+        rows = search_open_slots(window_start, window_end, specialization, appointment_type, location_type,
+                                 limit + 1, after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Provider and availability details for the page only
+        providers = {provider.id: provider for provider in Provider.query.filter(
+            Provider.id.in_({row.provider_id for row in rows})
+        )} if rows else {}
+        availabilities = {
+            availability_id: (availability_zone, location) for availability_id, availability_zone, location in db.session.query(
+                ProviderAvailability.id, ProviderAvailability.timezone, ProviderAvailability.location
+            ).filter(ProviderAvailability.id.in_({row.availability_id for row in rows}))
+        } if rows else {}
+
+        slots = []
+        for row in rows:
+            provider = providers.get(row.provider_id)
+            slot_zone, location = availabilities.get(row.availability_id, ('UTC', None))
+            slot_zone = slot_zone or 'UTC'
+            slots.append({
+                'id': row.id,
+                'availability_id': row.availability_id,
+                'provider': {
+                    'id': provider.id,
+                    'name': f"{provider.first_name} {provider.last_name}",
+                    'specialization': provider.specialization
+                } if provider else None,
+                'slot_start_time': row.slot_start_time.isoformat(),
+                'slot_end_time': row.slot_end_time.isoformat(),
+                'appointment_type': row.appointment_type,
+                'location': location,
+                'timezone': slot_zone,
+                'local_start_time': zone_transitions(slot_zone).isoformat(row.slot_start_time),
+                'local_end_time': zone_transitions(slot_zone).isoformat(row.slot_end_time)
+            })
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'filters_applied': {
+                    'start_date': start_date.isoformat(),
+                    'end_date': end_date.isoformat(),
+                    'timezone': zone_name,
+                    'specialization': specialization,
+                    'appointment_type': appointment_type,
+                    'location_type': location_type
+                },
+                'searchable_through': slot_horizon_end().isoformat(),
+                'page': {
+                    'limit': limit,
+                    'count': len(slots),
+                    'has_more': has_more,
+                    'next_cursor': encode_cursor(rows[-1].slot_start_time, rows[-1].id) if has_more else None
+                },
+                'slots': slots
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+def migrate_refresh_token_digests(batch_size: int = 500) -> int:
+    """Revoke refresh tokens and patient sessions still stored under a salted bcrypt hash.
+
+    A salted hash cannot be converted to the keyed digest without the plaintext token,
+    and the old lookup never matched it anyway, so these rows are unusable.
+    """
+    revoked = 0
+    for model, column in ((RefreshToken, RefreshToken.token_hash),
+                          (PatientSession, PatientSession.refresh_token_hash)):
+        while True:
+            ids = [row.id for row in db.session.query(model.id).filter(
+                column.like('$2%'),
+                model.is_revoked == False
+            ).limit(batch_size)]
+            if not ids:
+                break
+            model.query.filter(model.id.in_(ids)).update({'is_revoked': True}, synchronize_session=False)
+            db.session.commit()
+            revoked += len(ids)
+    return revoked
+
+def migrate_slot_times_to_utc(batch_size: int = 500) -> int:
+    """Convert appointment slot times written in local time (stored_utc IS NULL) to UTC.
+
+    Rows are converted with their availability's zone, one batch per transaction.
+    """
+    table = AppointmentSlot.__table__
+    converted = 0
+    while True:
+        rows = db.session.execute(
+            db.select(table.c.id, table.c.slot_start_time, table.c.slot_end_time, ProviderAvailability.timezone)
+            .select_from(table.outerjoin(ProviderAvailability.__table__,
+                                         table.c.availability_id == ProviderAvailability.__table__.c.id))
+            .where(table.c.stored_utc.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return converted
+        updates = []
+        for row in rows:
+            zone = zone_transitions(row.timezone or 'UTC')
+            start, end = zone.to_utc([np.datetime64(row.slot_start_time, 'm'),
+                                      np.datetime64(row.slot_end_time, 'm')]).astype('datetime64[us]').tolist()
+            updates.append({'_id': row.id, '_start': start, '_end': end})
+        db.session.execute(table.update().where(table.c.id == bindparam('_id')).values(
+            slot_start_time=bindparam('_start'), slot_end_time=bindparam('_end'), stored_utc=True
+        ), updates)
+        db.session.commit()
+        converted += len(updates)
+
+def migrate_slot_search_fields(batch_size: int = 500) -> int:
+    """Fill specialization and location_type on open slot rows stored before slots were searchable.
+
+    Walks the rows still missing them in id order, one batch per transaction.
+    Rows whose provider no longer exists stay unsearchable.
+    """
+    table = AppointmentSlot.__table__
+    availability = ProviderAvailability.__table__
+    filled, last_id = 0, ''
+    while True:
+        rows = db.session.execute(
+            db.select(table.c.id, Provider.specialization, availability.c.location)
+            .select_from(table.outerjoin(Provider.__table__, table.c.provider_id == Provider.__table__.c.id)
+                         .outerjoin(availability, table.c.availability_id == availability.c.id))
+            .where(table.c.status == 'available', table.c.specialization.is_(None), table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return filled
+        db.session.execute(table.update().where(table.c.id == bindparam('_id')).values(
+            specialization=bindparam('_specialization'), location_type=bindparam('_location_type')
+        ), [
+            {'_id': row.id, '_specialization': search_key(row.specialization),
+             '_location_type': (row.location or {}).get('type')}
+            for row in rows
+        ])
+        db.session.commit()
+        filled += sum(row.specialization is not None for row in rows)
+        last_id = rows[-1].id
+
+@app.cli.command('migrate-refresh-tokens')
+def migrate_refresh_tokens_command():
+    """Revoke refresh tokens stored under the legacy bcrypt hash."""
+    revoked = migrate_refresh_token_digests()
+    print(f"Revoked {revoked} legacy refresh token(s).")
+
+@app.cli.command('calibrate-bcrypt')
+@click.option('--budget-ms', type=float, default=None, help='Login hashing budget (defaults to BCRYPT_LOGIN_BUDGET_MS).')
+@click.option('--samples', type=int, default=5, help='Hashes measured per cost factor.')
+def calibrate_bcrypt_command(budget_ms, samples):
+    """Measure bcrypt on this host and print the BCRYPT_LOG_ROUNDS that fits the budget."""
+    budget_ms = budget_ms or app.config['BCRYPT_LOGIN_BUDGET_MS']
+    rounds, timings = calibrate_bcrypt_cost(budget_ms, samples=samples)
+    for cost, median_ms in timings.items():
+        print(f"cost {cost:>2}: {median_ms:8.1f} ms{'  (over budget)' if median_ms > budget_ms else ''}")
+    print(f"BCRYPT_LOG_ROUNDS={rounds}")
+
+@app.cli.group('signing-keys')
+def signing_keys_command():
+    """Manage the JWT signing keys published at /.well-known/jwks.json."""
+    if key_ring.symmetric:
+        raise click.ClickException('Tokens are HS256-signed; set JWT_ALGORITHM to EdDSA or RS256 and install cryptography.')
+
+@signing_keys_command.command('list')
+def list_signing_keys_command():
+    """List published signing keys."""
+    for kid, algorithm, active in key_ring.keys():
+        print(f"{kid}  {algorithm}{'  (active)' if active else ''}")
+
+@signing_keys_command.command('generate')
+@click.option('--activate', is_flag=True, help='Sign new tokens with the key immediately.')
+def generate_signing_key_command(activate):
+    """Publish a new signing key (activate it once JWKS caches have refreshed)."""
+    kid = key_ring.generate(activate=activate)
+    print(f"Published {kid}{' (active)' if activate else ''}.")
+
+@signing_keys_command.command('activate')
+@click.argument('kid')
+def activate_signing_key_command(kid):
+    """Sign new tokens with KID."""
+    try:
+        key_ring.activate(kid)
+    except KeyError:
+        raise click.ClickException(f'Unknown signing key {kid}')
+    print(f"Activated {kid}.")
+
+@signing_keys_command.command('retire')
+@click.argument('kid')
+def retire_signing_key_command(kid):
+    """Stop accepting tokens signed with KID and remove it from the JWKS."""
+    try:
+        key_ring.retire(kid)
+    except KeyError:
+        raise click.ClickException(f'Unknown signing key {kid}')
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Retired {kid}.")
+
+def delete_in_batches(model, condition, batch_size: int, pause: float, order_by=None) -> tuple:
+    """Delete rows matching condition in short transactions; returns (rows, batches)."""
+    deleted = batches = 0
+    while True:
+        query = db.session.query(model.id).filter(condition)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        ids = [row.id for row in query.limit(batch_size)]
+        if not ids:
+            return deleted, batches
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+        batches += 1
+        if len(ids) < batch_size:
+            return deleted, batches
+        time.sleep(pause)
+
+def compact_token_tables(batch_size: int = None, pause: float = None) -> dict:
+    """Delete expired, revoked and epoch-stale refresh tokens and patient sessions.
+
+    Expired rows are found through the expires_at index first; each batch is its
+    own transaction so the SQLite write lock is only held briefly.
+    """
+    batch_size = batch_size or app.config['SESSION_GC_BATCH_SIZE']
+    pause = app.config['SESSION_GC_BATCH_PAUSE'] if pause is None else pause
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    report = {'batches': 0}
+
+    for model, owner, owner_id in ((RefreshToken, Provider, RefreshToken.provider_id),
+                                   (PatientSession, Patient, PatientSession.patient_id)):
+        current_epoch = db.select(owner.token_epoch).where(owner.id == owner_id).scalar_subquery()
+        expired, expired_batches = delete_in_batches(
+            model, model.expires_at < now, batch_size, pause, order_by=model.expires_at
+        )
+        revoked, revoked_batches = delete_in_batches(
+            model, (model.is_revoked == True) | (model.token_epoch < current_epoch), batch_size, pause
+        )
+        report[model.__tablename__] = expired + revoked
+        report['batches'] += expired_batches + revoked_batches
+
+    report['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    report['finished_at'] = datetime.utcnow().isoformat()
+    return report
+
+class PeriodicJob:
+    """Daemon thread running fn() inside an app context every `interval` seconds.
+
+    With exclusive=True a non-blocking file lock keeps concurrent worker processes
+    on one host from running the same job at the same time.
+    """
+
+    def __init__(self, name: str, fn, interval: float, exclusive: bool = True):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.exclusive = exclusive
+        self.last_result = None
+        self.last_error = None
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._lock_path = os.path.join(app.instance_path, f'{name}.lock')
+
+    def run_once(self, raise_errors: bool = False):
+        """Run the job now; returns None only when another process holds the lock.
+
+        Failures are logged and recorded in last_error; with raise_errors=True
+        (one-off CLI runs) they are re-raised as well.
+        """
+        if not self.exclusive:
+            return self._run(raise_errors)
+        os.makedirs(app.instance_path, exist_ok=True)
+        with open(self._lock_path, 'w') as lock_file:
+            if fcntl and self.exclusive:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return None  # Another process is running this job
+            return self._run(raise_errors)
+
+    def _run(self, raise_errors: bool = False):
+        with app.app_context():
+            try:
+                self.last_result = self.fn()
+                self.last_error = None
+                self.runs += 1
+                app.logger.info('%s: %s', self.name, self.last_result)
+            except Exception as e:
+                db.session.rollback()
+                self.last_error = str(e)
+                app.logger.exception('%s failed', self.name)
+                if raise_errors:
+                    raise
+        return self.last_result
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            'interval_seconds': self.interval,
+            'runs': self.runs,
+            'last_result': self.last_result,
+            'last_error': self.last_error
+        }
+
+class LoginTelemetryBuffer:
+    """Coalesces last_login/login_count and refresh last_used_at writes into periodic batches.
+
+    Only the latest timestamp and the number of logins per account are kept, so a
+    flush is one executemany UPDATE per table in a single transaction, however many
+    logins happened since the last one. The flush job is started by the first
+    record in each process, so any server that buffers telemetry also flushes it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logins = {}      # (model, id) -> [last_login, count]
+        self._token_uses = {}  # (model, id) -> last_used_at
+        self.flush_job = None
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    def _buffered(self):
+        if not app.config['LOGIN_TELEMETRY_BUFFERED']:
+            self.flush()
+        elif self.flush_job is not None:
+            self.flush_job.start()
+
+    def record_login(self, model, account_id, when: datetime = None) -> datetime:
+        when = when or datetime.utcnow()
+        with self._lock:
+            entry = self._logins.setdefault((model, account_id), [when, 0])
+            entry[0] = max(entry[0], when)
+            entry[1] += 1
+        self._buffered()
+        return when
+
+    def record_token_use(self, model, token_id, when: datetime = None) -> datetime:
+        when = when or datetime.utcnow()
+        with self._lock:
+            self._token_uses[(model, token_id)] = max(self._token_uses.get((model, token_id), when), when)
+        self._buffered()
+        return when
+
+    def _requeue(self, logins, token_uses):
+        with self._lock:
+            for key, (when, count) in logins.items():
+                entry = self._logins.setdefault(key, [when, 0])
+                entry[0] = max(entry[0], when)
+                entry[1] += count
+            for key, when in token_uses.items():
+                self._token_uses[key] = max(self._token_uses.get(key, when), when)
+
+    def flush(self) -> int:
+        """Write all buffered telemetry in one transaction."""
+        with self._lock:
+            logins, self._logins = self._logins, {}
+            token_uses, self._token_uses = self._token_uses, {}
+        if not logins and not token_uses:
+            return 0
+
+        try:
+            for model in (Provider, Patient):
+                rows = [{'_id': account_id, '_last_login': when, '_count': count}
+                        for (row_model, account_id), (when, count) in logins.items() if row_model is model]
+                if rows:
+                    table = model.__table__
+                    db.session.execute(table.update().where(table.c.id == bindparam('_id')).values(
+                        last_login=bindparam('_last_login'),
+                        login_count=func.coalesce(table.c.login_count, 0) + bindparam('_count')
+                    ), rows)
+            for model in (RefreshToken, PatientSession):
+                rows = [{'_id': token_id, '_last_used_at': when}
+                        for (row_model, token_id), when in token_uses.items() if row_model is model]
+                if rows:
+                    table = model.__table__
+                    db.session.execute(table.update().where(table.c.id == bindparam('_id')).values(
+                        last_used_at=bindparam('_last_used_at')
+                    ), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self._requeue(logins, token_uses)
+            raise
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_flushed += len(logins) + len(token_uses)
+        return len(logins) + len(token_uses)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'buffered': app.config['LOGIN_TELEMETRY_BUFFERED'],
+                'pending_logins': len(self._logins),
+                'pending_token_uses': len(self._token_uses),
+                'flushes': self.flushes,
+                'rows_flushed': self.rows_flushed
+            }
+
+login_telemetry = LoginTelemetryBuffer()
+
+session_gc_job = PeriodicJob('session-gc', compact_token_tables, app.config['SESSION_GC_INTERVAL'])
+telemetry_flush_job = PeriodicJob(
+    'login-telemetry-flush', login_telemetry.flush, app.config['LOGIN_TELEMETRY_FLUSH_INTERVAL'], exclusive=False
+)
+login_telemetry.flush_job = telemetry_flush_job
+slot_horizon_job = PeriodicJob('slot-horizon', extend_slot_horizon, app.config['SLOT_HORIZON_INTERVAL'])
+BACKGROUND_JOBS = [session_gc_job, slot_horizon_job]
+METRICS_SOURCES['session_gc'] = session_gc_job.stats
+METRICS_SOURCES['slot_horizon'] = slot_horizon_job.stats
+METRICS_SOURCES['login_telemetry'] = login_telemetry.stats
+
+# Don't lose buffered telemetry on a clean shutdown
+atexit.register(telemetry_flush_job.run_once)
+
+def start_background_jobs():
+    for job in BACKGROUND_JOBS:
+        job.start()
+
+@app.cli.command('compact-sessions')
+def compact_sessions_command():
+    """Delete expired and revoked refresh tokens and patient sessions (for cron)."""
+    report = session_gc_job.run_once(raise_errors=True)
+    if report is None:
+        print("Compaction already running in another process.")
+    else:
+        print(f"Reclaimed {report['refresh_token']} refresh token(s) and "
+              f"{report['patient_sessions']} patient session(s) in {report['batches']} batch(es).")
+
+@app.cli.command('extend-slot-horizon')
+def extend_slot_horizon_command():
+    """Store appointment slot rows up to SLOT_HORIZON_DAYS ahead (for cron)."""
+    report = slot_horizon_job.run_once(raise_errors=True)
+    if report is None:
+        print("Slot horizon job already running in another process.")
+    else:
+        print(f"Stored {report['slots']} slot(s) for {report['availabilities']} availability rule(s) "
+              f"through {report['horizon_end']} in {report['batches']} batch(es).")
+
+@app.cli.command('rebuild-daily-rollups')
+def rebuild_daily_rollups_command():
+    """Recompute the month-view daily rollups and availability booking counts."""
+    report = rebuild_daily_rollups()
+    print(f"Rebuilt {report['days']} daily rollup(s) for {report['providers']} provider(s).")
+
+# Bulk account import
+
+def hash_import_password(password: str, rounds: int) -> str:
+    """bcrypt hash computed in a bulk-import worker process."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+IMPORT_KINDS = {
+    'provider': {
+        'model': Provider,
+        'schema': provider_schema,
+        'fields': provider_fields,
+        'unique': ('email', 'phone_number', 'license_number')
+    },
+    'patient': {
+        'model': Patient,
+        'schema': patient_schema,
+        'fields': patient_fields,
+        'unique': ('email', 'phone_number')
+    }
+}
+
+def iter_import_records(stream, fmt: str):
+    """Yield (row_number, record) from a CSV or NDJSON text stream, one row at a time.
+
+    CSV columns use dotted names for nested objects (clinic_address.city) and ';' to
+    separate list items (medical_history); empty cells are treated as absent.
+    Unparseable NDJSON lines yield an Exception in place of the record.
+    """
+    if fmt == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            record = {}
+            for column, value in row.items():
+                if column is None or value is None or value.strip() == '':
+                    continue
+                if column == 'medical_history':
+                    value = [item for item in value.split(';') if item.strip()]
+                parent, _, child = column.partition('.')
+                if child:
+                    record.setdefault(parent, {})[child] = value
+                else:
+                    record[column] = value
+            yield row_number, record
+    else:
+        row_number = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('Each line must be a JSON object')
+            except ValueError as e:
+                record = e
+            yield row_number, record
+
+class BulkImporter:
+    """Validate, de-duplicate, hash and insert accounts chunk by chunk.
+
+    Memory use is bounded by the chunk size: records are read lazily, each chunk
+    costs one duplicate-check query, one parallel hashing pass on a process pool
+    and one INSERT transaction, and results are yielded as soon as it commits.
+    """
+
+    def __init__(self, kind: str, chunk_size: int = None, processes: int = None):
+        self.kind = IMPORT_KINDS[kind]
+        self.chunk_size = chunk_size or app.config['BULK_IMPORT_CHUNK_SIZE']
+        self.processes = processes or app.config['BULK_IMPORT_PROCESSES']
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.summary = {'created': 0, 'invalid': 0, 'duplicate': 0, 'failed': 0}
+
+    def run(self, records):
+        """Yield one result dict per input row, in input order."""
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            chunk = []
+            for row in records:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    yield from self._import_chunk(chunk, executor)
+                    chunk = []
+            if chunk:
+                yield from self._import_chunk(chunk, executor)
+
+    def _import_chunk(self, chunk: list, executor):
+        model, schema, unique = self.kind['model'], self.kind['schema'], self.kind['unique']
+        results = {}
+        accepted = []
+
+        for row_number, record in chunk:
+            if isinstance(record, Exception):
+                results[row_number] = {'row': row_number, 'status': 'invalid', 'errors': {'_schema': [str(record)]}}
+                continue
+            # Import files carry one password column
+            record.setdefault('confirm_password', record.get('password'))
+            try:
+                data = load_payload(schema, record, endpoint='bulk_import')
+                values = self.kind['fields'](data, None)
+            except ValidationError as e:
+                results[row_number] = {'row': row_number, 'status': 'invalid', 'errors': e.messages}
+                continue
+            except Exception as e:
+                # One malformed row must not abort the rest of the stream
+                results[row_number] = {'row': row_number, 'status': 'invalid',
+                                       'errors': {'_schema': [f'{type(e).__name__}: {e}']}}
+                continue
+            accepted.append((row_number, data, values))
+
+        # One set-based query for every unique column in the chunk
+        taken = {field: set() for field in unique}
+        if accepted:
+            columns = [getattr(model, field) for field in unique]
+            condition = db.or_(*[
+                column.in_({values[column.key] for _, _, values in accepted}) for column in columns
+            ])
+            for existing in db.session.query(*columns).filter(condition):
+                for field, value in zip(unique, existing):
+                    taken[field].add(value)
+
+        to_insert = []
+        for row_number, data, values in accepted:
+            clashes = [field for field in unique if values[field] in taken[field]]
+            if clashes:
+                results[row_number] = {'row': row_number, 'status': 'duplicate', 'existing_fields': clashes}
+                continue
+            for field in unique:
+                # Later rows in the same chunk must not reuse these values either
+                taken[field].add(values[field])
+            to_insert.append((row_number, data, values))
+
+        hashes = executor.map(
+            hash_import_password,
+            [data['password'] for _, data, _ in to_insert],
+            [self.rounds] * len(to_insert),
+            chunksize=max(1, len(to_insert) // (self.processes * 4))
+        )
+        rows = []
+        for (row_number, _, values), password_hash in zip(to_insert, hashes):
+            values.update(id=str(uuid.uuid4()), password_hash=password_hash)
+            rows.append((row_number, values))
+
+        if rows:
+            try:
+                db.session.execute(db.insert(model), [values for _, values in rows])
+                db.session.commit()
+                for row_number, values in rows:
+                    results[row_number] = {'row': row_number, 'status': 'created', 'id': values['id']}
+            except IntegrityError:
+                # A concurrent registration won a unique value; retry row by row to find it
+                db.session.rollback()
+                for row_number, values in rows:
+                    results[row_number] = self._insert_one(model, row_number, values)
+
+        for row_number, _ in chunk:
+            result = results[row_number]
+            self.summary[result['status']] += 1
+            yield result
+
+    @staticmethod
+    def _insert_one(model, row_number: int, values: dict) -> dict:
+        try:
+            db.session.execute(db.insert(model), [values])
+            db.session.commit()
+            return {'row': row_number, 'status': 'created', 'id': values['id']}
+        except IntegrityError as e:
+            db.session.rollback()
+            return {'row': row_number, 'status': 'failed', 'errors': {'_schema': [str(e.orig)]}}
+
+def import_report_lines(importer: BulkImporter, records):
+    """NDJSON result lines followed by a summary line."""
+    for result in importer.run(records):
+        yield json.dumps(result) + '\n'
+    yield json.dumps({'summary': importer.summary}) + '\n'
+
+def admin_key_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = app.config['ADMIN_API_KEY']
+        supplied = request.headers.get('X-Admin-Key', '')
+        if not expected or not hmac.compare_digest(supplied.encode('utf-8'), expected.encode('utf-8')):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid or missing admin key',
+                'error_code': 'FORBIDDEN'
+            }), 403
+        return f(*args, **kwargs)
+
+    return decorated
+
+@app.route('/api/v1/admin/import/<kind>', methods=['POST'])
+@admin_key_required
+@swag_from({
+    'tags': ['Operations'],
+    'summary': 'Bulk import providers or patients',
+    'description': 'Stream a CSV (text/csv) or NDJSON (application/x-ndjson) body of registration records. '
+                   'Responds with one NDJSON result line per input row and a final summary line.',
+    'parameters': [
+        {'name': 'kind', 'in': 'path', 'type': 'string', 'enum': ['provider', 'patient'], 'required': True},
+        {'name': 'X-Admin-Key', 'in': 'header', 'type': 'string', 'required': True},
+        {'name': 'format', 'in': 'query', 'type': 'string', 'enum': ['csv', 'ndjson'],
+         'description': 'Overrides the format implied by Content-Type'}
+    ],
+    'responses': {
+        '200': {'description': 'NDJSON stream of per-row results'},
+        '403': {'description': 'Invalid or missing admin key'},
+        '404': {'description': 'Unknown import kind'}
+    }
+})
+def bulk_import(kind):
+    if kind not in IMPORT_KINDS:
+        return jsonify({'success': False, 'message': f'Unknown import kind: {kind}'}), 404
+
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+
+    # Spool the upload (to disk past 1 MB) so the body is fully received before results stream back
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    shutil.copyfileobj(request.stream, upload)
+    upload.seek(0)
+    stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+
+    def generate():
+        with stream:
+            yield from import_report_lines(BulkImporter(kind), iter_import_records(stream, fmt))
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.cli.command('import-accounts')
+@click.argument('kind', type=click.Choice(sorted(IMPORT_KINDS)))
+@click.argument('source', type=click.File('r', encoding='utf-8-sig', lazy=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Input format (default: from the file extension).')
+@click.option('--report', type=click.File('w'), default='-', help='NDJSON result report (default: stdout).')
+@click.option('--chunk-size', type=int, default=None, help='Rows per transaction (defaults to BULK_IMPORT_CHUNK_SIZE).')
+@click.option('--processes', type=int, default=None, help='Hashing processes (defaults to BULK_IMPORT_PROCESSES).')
+def import_accounts_command(kind, source, fmt, report, chunk_size, processes):
+    """Bulk-register providers or patients from a CSV or NDJSON file."""
+    fmt = fmt or ('csv' if source.name.endswith('.csv') else 'ndjson')
+    importer = BulkImporter(kind, chunk_size=chunk_size, processes=processes)
+    for line in import_report_lines(importer, iter_import_records(source, fmt)):
+        report.write(line)
+    click.echo(', '.join(f'{count} {status}' for status, count in importer.summary.items()), err=True)
+
+def upgrade_schema():
+    """Add columns and indexes introduced after an existing database was created.
+
+    db.create_all() only creates missing tables, so older SQLite files get new
+    columns added in place here.
+    """
+    inspector = sa_inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
 # Create tables and run app
 def init_db():
     """Initialize the database and create all tables."""
@@ -2188,6 +5413,19 @@ def init_db():
         with app.app_context():
             # Create all tables
             db.create_all()
+            upgrade_schema()
+            revoked = migrate_refresh_token_digests()
+            if revoked:
+                print(f"Revoked {revoked} legacy refresh token(s).")
+            converted = migrate_slot_times_to_utc()
+            if converted:
+                print(f"Converted {converted} appointment slot(s) to UTC.")
+            searchable = migrate_slot_search_fields()
+            if searchable:
+                print(f"Indexed {searchable} open appointment slot(s) for search.")
+            if ProviderDailyRollup.query.first() is None and ProviderAvailability.query.first() is not None:
+                report = rebuild_daily_rollups()
+                print(f"Built {report['days']} daily rollup(s) for {report['providers']} provider(s).")
             print("Database initialized successfully!")
             
             # List all created tables
@@ -2198,7 +5436,7 @@ def init_db():
             for table in tables:
                 print(f"- {table}")
                 
-            print(f"\nDatabase location: {os.path.join(basedir, 'health_first.db')}")
+            print(f"\nDatabase location: {db.engine.url.database}")
     except Exception as e:
         print(f"Error initializing database: {str(e)}")
         raise
@@ -2207,20 +5445,73 @@ def init_db():
 @app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-None-Match')
+    response.headers.add('Access-Control-Expose-Headers', 'ETag')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
+@app.route('/api/v1/metrics', methods=['GET'])
+@admin_key_required
+@swag_from({
+    'tags': ['Operations'],
+    'summary': 'Runtime metrics',
+    'description': 'Hit/miss counters and sizes of in-process caches and pools for this worker',
+    'parameters': [
+        {'name': 'X-Admin-Key', 'in': 'header', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        '200': {
+            'description': 'Metrics snapshot',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean'},
+                    'data': {'type': 'object'}
+                }
+            }
+        },
+        '403': {'description': 'Invalid or missing admin key'}
+    }
+})
+def get_metrics():
+    return jsonify({
+        'success': True,
+        'data': {name: source() for name, source in METRICS_SOURCES.items()}
+    }), 200
+
+@app.route('/.well-known/jwks.json', methods=['GET'])
+@swag_from({
+    'tags': ['Operations'],
+    'summary': 'Token signing keys',
+    'description': 'Public keys (JWK Set) for verifying access tokens offline; select a key by the token kid header',
+    'responses': {
+        '200': {
+            'description': 'JWK Set',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'keys': {'type': 'array', 'items': {'type': 'object'}}
+                }
+            }
+        },
+        '304': {'description': 'Key set unchanged since the ETag sent in If-None-Match'}
+    }
+})
+def get_jwks():
+    response = jsonify(key_ring.jwks())
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['JWKS_MAX_AGE']
+    response.add_etag()
+    return response.make_conditional(request)
+
 
 # Add appointment booking endpoint
 @app.route('/api/v1/appointment/book', methods=['POST'])
 @patient_jwt_required
 def book_appointment():
     try:
-        # Get patient ID from JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        patient_id = payload['patient_id']
+        # Patient resolved by patient_jwt_required
+        patient_id = request.patient.id
         
         # Validate request data
         data = request.get_json()
@@ -2234,8 +5525,8 @@ def book_appointment():
                 'error_code': 'MISSING_SLOT_ID'
             }), 400
         
-        # Find the appointment slot
-        slot = db.session.get(AppointmentSlot, slot_id)
+        # Find the appointment slot (writing its row if it is still virtual)
+        slot = get_or_materialize_slot(slot_id)
         if not slot:
             return jsonify({
                 'success': False,
@@ -2257,6 +5548,9 @@ def book_appointment():
         slot.patient_id = patient_id
         slot.booking_reference = booking_reference
         slot.updated_at = datetime.utcnow()
+        bump_daily_rollup(slot, available=-1, booked=1)
+        bump_schedule_version(Provider, slot.provider_id)
+        bump_schedule_version(Patient, patient_id)
         
         # Commit the changes
         db.session.commit()
@@ -2276,6 +5570,13 @@ def book_appointment():
             }
         }), 200
         
+    except IntegrityError:
+        # Another request booked the same virtual slot first
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Slot is not available (status: booked)'
+        }), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -2289,9 +5590,7 @@ def book_appointment():
 @patient_jwt_required
 def cancel_appointment():
     try:
-        token = request.headers.get('Authorization').split(' ')[1]
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        patient_id = payload['patient_id']
+        patient_id = request.patient.id
         data = request.get_json()
         slot_id = data.get('slot_id')
         cancellation_reason = data.get('cancellation_reason', '')
@@ -2308,6 +5607,9 @@ def cancel_appointment():
         slot.patient_id = None
         slot.booking_reference = None
         slot.updated_at = datetime.utcnow()
+        bump_daily_rollup(slot, booked=-1, cancelled=1)
+        bump_schedule_version(Provider, slot.provider_id)
+        bump_schedule_version(Patient, patient_id)
         db.session.commit()
         return jsonify({'success': True, 'message': 'Appointment cancelled successfully', 'data': {'appointment_id': slot.id, 'slot_id': slot_id, 'cancelled_time': slot.updated_at.isoformat(), 'cancellation_reason': cancellation_reason, 'original_appointment_time': slot.slot_start_time.isoformat()}}), 200
     except Exception as e:
@@ -2319,9 +5621,7 @@ def cancel_appointment():
 @patient_jwt_required
 def update_appointment():
     try:
-        token = request.headers.get('Authorization').split(' ')[1]
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        patient_id = payload['patient_id']
+        patient_id = request.patient.id
         data = request.get_json()
         current_slot_id = data.get('current_slot_id')
         new_slot_id = data.get('new_slot_id')
@@ -2333,7 +5633,7 @@ def update_appointment():
             return jsonify({'success': False, 'message': 'Current appointment slot not found'}), 404
         if current_slot.status != 'booked' or current_slot.patient_id != patient_id:
             return jsonify({'success': False, 'message': 'Current appointment not found or not booked by you'}), 404
-        new_slot = db.session.get(AppointmentSlot, new_slot_id)
+        new_slot = get_or_materialize_slot(new_slot_id)
         if not new_slot:
             return jsonify({'success': False, 'message': 'New appointment slot not found'}), 404
         if new_slot.status != 'available':
@@ -2349,64 +5649,110 @@ def update_appointment():
         new_slot.patient_id = patient_id
         new_slot.booking_reference = new_booking_reference
         new_slot.updated_at = datetime.utcnow()
+        bump_daily_rollup(current_slot, booked=-1, cancelled=1)
+        bump_daily_rollup(new_slot, available=-1, booked=1)
+        bump_schedule_version(Provider, current_slot.provider_id, new_slot.provider_id)
+        bump_schedule_version(Patient, patient_id)
         db.session.commit()
         return jsonify({'success': True, 'message': 'Appointment updated successfully', 'data': {'old_appointment_id': current_slot.id, 'new_appointment_id': new_slot.id, 'old_slot_id': current_slot_id, 'new_slot_id': new_slot_id, 'patient_id': patient_id, 'provider_id': new_slot.provider_id, 'new_appointment_time': new_slot.slot_start_time.isoformat(), 'new_appointment_type': new_slot.appointment_type, 'new_booking_reference': new_booking_reference, 'notes': notes, 'updated_at': new_slot.updated_at.isoformat()}}), 200
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'New slot is not available (status: booked)'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Error updating appointment: {str(e)}'}), 500
 
 
+def appointment_list_query(patient_id: str, *columns):
+    """Query for columns of a patient's appointments (with each slot's time zone last) under the list filters.
+
+    Returns (query, start_date, end_date). Dates are local to each appointment,
+    so the query only pads the UTC range; callers drop rows outside it with
+    local_date(). Raises ValueError with a client-facing message for bad dates.
+    """
+    query = db.session.query(*columns, ProviderAvailability.timezone).select_from(AppointmentSlot).outerjoin(
+        ProviderAvailability, AppointmentSlot.availability_id == ProviderAvailability.id
+    ).filter(AppointmentSlot.patient_id == patient_id)
+
+    status_filter = request.args.get('status', None)  # booked, cancelled, all
+    if status_filter and status_filter != 'all':
+        query = query.filter(AppointmentSlot.status == status_filter)
+
+    start_date = end_date = None
+    if request.args.get('start_date'):
+        try:
+            start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Invalid start_date format. Use YYYY-MM-DD')
+        query = query.filter(AppointmentSlot.slot_start_time >= datetime.combine(start_date, datetime.min.time()) - MAX_UTC_OFFSET)
+    if request.args.get('end_date'):
+        try:
+            end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Invalid end_date format. Use YYYY-MM-DD')
+        query = query.filter(AppointmentSlot.slot_start_time < datetime.combine(end_date + timedelta(days=1), datetime.min.time()) + MAX_UTC_OFFSET)
+
+    if request.args.get('provider_id'):
+        query = query.filter(AppointmentSlot.provider_id == request.args['provider_id'])
+    return query, start_date, end_date
+
+def in_local_range(zone_name: str, start: datetime, start_date, end_date) -> bool:
+    """Whether the UTC start falls on a local date within start_date..end_date (either may be None)."""
+    if start_date is None and end_date is None:
+        return True
+    day = local_date(zone_name, start)
+    return not ((start_date and day < start_date) or (end_date and day > end_date))
+
 # Add view appointment list endpoint
 @app.route('/api/v1/appointment/list', methods=['GET'])
 @patient_jwt_required
+@schedule_cached(patient_schedule_validator, private=True)
 def view_appointment_list():
     try:
-        # Get patient ID from JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        patient_id = payload['patient_id']
-        
-        # Initialize query for patient's appointments
-        query = AppointmentSlot.query.filter(AppointmentSlot.patient_id == patient_id)
-        
-        # Get query parameters for filtering
-        status_filter = request.args.get('status', None)  # booked, cancelled, all
-        start_date = request.args.get('start_date', None)
-        end_date = request.args.get('end_date', None)
-        provider_id = request.args.get('provider_id', None)
-        
-        # Apply filters
-        if status_filter and status_filter != 'all':
-            query = query.filter(AppointmentSlot.status == status_filter)
-        
-        if start_date:
-            try:
-                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                query = query.filter(AppointmentSlot.slot_start_time >= datetime.combine(start_date_obj, datetime.min.time()))
-            except ValueError:
-                return jsonify({'success': False, 'message': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
-        
-        if end_date:
-            try:
-                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                query = query.filter(AppointmentSlot.slot_end_time <= datetime.combine(end_date_obj, datetime.max.time()))
-            except ValueError:
-                return jsonify({'success': False, 'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
-        
-        if provider_id:
-            query = query.filter(AppointmentSlot.provider_id == provider_id)
+        # Patient resolved by patient_jwt_required
+        patient_id = request.patient.id
+        try:
+            query, start_date_obj, end_date_obj = appointment_list_query(patient_id, AppointmentSlot)
+            limit, after = page_args()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        # Order by appointment time (most recent first)
-        query = query.order_by(AppointmentSlot.slot_start_time.desc())
+        # Most recent first; the cursor seeks past the last appointment of the previous page
+        if after:
+            query = query.filter(db.or_(
+                AppointmentSlot.slot_start_time < after[0],
+                db.and_(AppointmentSlot.slot_start_time == after[0], AppointmentSlot.id < after[1])
+            ))
+        query = query.order_by(AppointmentSlot.slot_start_time.desc(), AppointmentSlot.id.desc())
         
-        # Execute query
-        appointments = query.all()
+        # Keep appointments whose local date is in the requested range, fetching
+        # further batches when edge rows of the padded UTC range are dropped
+        appointments = []
+        while len(appointments) <= limit:
+            batch = query.limit(limit + 1).all()
+            appointments.extend(
+                (appointment, zone_name or 'UTC') for appointment, zone_name in batch
+                if in_local_range(zone_name or 'UTC', appointment.slot_start_time, start_date_obj, end_date_obj)
+            )
+            if len(batch) <= limit:
+                break
+            last = batch[-1][0]
+            query = query.filter(db.or_(
+                AppointmentSlot.slot_start_time < last.slot_start_time,
+                db.and_(AppointmentSlot.slot_start_time == last.slot_start_time, AppointmentSlot.id < last.id)
+            ))
+        has_more = len(appointments) > limit
+        appointments = appointments[:limit]
         
         # Get provider information for each appointment
+        now = datetime.utcnow()
+        providers = {}
         appointment_list = []
-        for appointment in appointments:
+        for appointment, zone_name in appointments:
             # Get provider details
-            provider = db.session.get(Provider, appointment.provider_id)
+            if appointment.provider_id not in providers:
+                providers[appointment.provider_id] = db.session.get(Provider, appointment.provider_id)
+            provider = providers[appointment.provider_id]
             provider_info = {
                 'id': provider.id if provider else None,
                 'name': f"{provider.first_name} {provider.last_name}" if provider else 'Unknown Provider',
@@ -2414,48 +5760,47 @@ def view_appointment_list():
                 'email': provider.email if provider else None
             } if provider else None
             
+            zone = zone_transitions(zone_name)
+            local_start = zone.isoformat(appointment.slot_start_time)
+            local_end = zone.isoformat(appointment.slot_end_time)
             appointment_data = {
                 'appointment_id': appointment.id,
                 'slot_id': appointment.id,
                 'booking_reference': appointment.booking_reference,
                 'status': appointment.status,
-                'appointment_date': appointment.slot_start_time.date().isoformat(),
-                'appointment_time': appointment.slot_start_time.time().isoformat(),
-                'appointment_end_time': appointment.slot_end_time.time().isoformat(),
+                'appointment_date': local_start[:10],
+                'appointment_time': local_start[11:19],
+                'appointment_end_time': local_end[11:19],
+                'timezone': zone_name,
+                'local_start_time': local_start,
+                'slot_start_time': appointment.slot_start_time.isoformat(),
                 'appointment_type': appointment.appointment_type,
                 'provider': provider_info,
                 'created_at': appointment.created_at.isoformat(),
                 'updated_at': appointment.updated_at.isoformat(),
-                'is_past': appointment.slot_start_time < datetime.utcnow(),
-                'is_today': appointment.slot_start_time.date() == datetime.utcnow().date(),
-                'is_upcoming': appointment.slot_start_time > datetime.utcnow()
+                'is_past': appointment.slot_start_time < now,
+                'is_today': local_start[:10] == local_date(zone_name, now).isoformat(),
+                'is_upcoming': appointment.slot_start_time > now
             }
             appointment_list.append(appointment_data)
         
-        # Calculate summary statistics
-        total_appointments = len(appointments)
-        booked_appointments = sum(1 for apt in appointments if apt.status == 'booked')
-        cancelled_appointments = sum(1 for apt in appointments if apt.status == 'cancelled')
-        past_appointments = sum(1 for apt in appointments if apt.slot_start_time < datetime.utcnow())
-        upcoming_appointments = sum(1 for apt in appointments if apt.slot_start_time > datetime.utcnow())
-        
+        last = appointments[-1][0] if appointments else None
         return jsonify({
             'success': True,
             'message': 'Appointment list retrieved successfully',
             'data': {
                 'patient_id': patient_id,
-                'summary': {
-                    'total_appointments': total_appointments,
-                    'booked_appointments': booked_appointments,
-                    'cancelled_appointments': cancelled_appointments,
-                    'past_appointments': past_appointments,
-                    'upcoming_appointments': upcoming_appointments
-                },
                 'filters_applied': {
-                    'status': status_filter,
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'provider_id': provider_id
+                    'status': request.args.get('status'),
+                    'start_date': request.args.get('start_date'),
+                    'end_date': request.args.get('end_date'),
+                    'provider_id': request.args.get('provider_id')
+                },
+                'page': {
+                    'limit': limit,
+                    'count': len(appointment_list),
+                    'has_more': has_more,
+                    'next_cursor': encode_cursor(last.slot_start_time, last.id) if has_more else None
                 },
                 'appointments': appointment_list
             }
@@ -2467,8 +5812,61 @@ def view_appointment_list():
             'message': f'Error retrieving appointment list: {str(e)}'
         }), 500
 
+# Add appointment summary endpoint
+@app.route('/api/v1/appointment/summary', methods=['GET'])
+@patient_jwt_required
+@schedule_cached(patient_schedule_validator, private=True)
+def view_appointment_summary():
+    try:
+        patient_id = request.patient.id
+        try:
+            query, start_date_obj, end_date_obj = appointment_list_query(
+                patient_id, AppointmentSlot.slot_start_time, AppointmentSlot.status
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        # Count over bare columns; the same filters as the list, without loading or serialising slots
+        now = datetime.utcnow()
+        summary = {
+            'total_appointments': 0,
+            'booked_appointments': 0,
+            'cancelled_appointments': 0,
+            'past_appointments': 0,
+            'upcoming_appointments': 0
+        }
+        for start, status, zone_name in query:
+            if not in_local_range(zone_name or 'UTC', start, start_date_obj, end_date_obj):
+                continue
+            summary['total_appointments'] += 1
+            summary['booked_appointments'] += status == 'booked'
+            summary['cancelled_appointments'] += status == 'cancelled'
+            summary['past_appointments'] += start < now
+            summary['upcoming_appointments'] += start > now
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'patient_id': patient_id,
+                'summary': summary,
+                'filters_applied': {
+                    'status': request.args.get('status'),
+                    'start_date': request.args.get('start_date'),
+                    'end_date': request.args.get('end_date'),
+                    'provider_id': request.args.get('provider_id')
+                }
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error retrieving appointment summary: {str(e)}'
+        }), 500
+
 if __name__ == '__main__':
     # Initialize database
     init_db()
+    start_background_jobs()
     # Run the app - expose to all network interfaces
     app.run(host='0.0.0.0', port=5007, debug=True)
@@ -0,0 +1,55 @@
+"""Auth path cost: JWT verification per request vs the verified-token cache.
+
+Compares signature verification (key_ring.decode) against decode_access_token()
+with a warm cache, then measures GET /appointment/list with the cache cleared before every request (the
+old decode-per-check behaviour) against a warm cache.
+
+Usage: python benchmarks/bench_auth_path.py [--requests 2000]
+"""
+import argparse
+
+from common import load_app, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000, help='decodes / requests per run')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+    patient = {
+        'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench@example.com',
+        'phone_number': '+15550000001', 'password': 'Password123!', 'confirm_password': 'Password123!',
+        'date_of_birth': '1990-05-15', 'gender': 'female',
+        'address': {'street': '1 Main St', 'city': 'Boston', 'state': 'MA', 'zip': '02101'}
+    }
+    client.post('/api/v1/patient/register', json=patient)
+    login = client.post('/api/v1/patient/login', json={'identifier': patient['email'], 'password': patient['password']})
+    token = login.get_json()['data']['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def bare_decode():
+        server.key_ring.decode(token)
+
+    def cached_decode():
+        server.decode_access_token(token)
+
+    before = measure(f'key_ring.decode ({server.key_ring.algorithm})', bare_decode, args.requests)
+    after = measure('decode_access_token, warm cache', cached_decode, args.requests)
+    print(f"decode speedup: {after / before:.1f}x")
+
+    def cold_request():
+        server.verified_token_cache.clear()
+        client.get('/api/v1/appointment/list', headers=headers)
+
+    def warm_request():
+        client.get('/api/v1/appointment/list', headers=headers)
+
+    before = measure('GET /appointment/list, token verified', cold_request, args.requests)
+    after = measure('GET /appointment/list, cached payload', warm_request, args.requests)
+    print(f"end-to-end speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
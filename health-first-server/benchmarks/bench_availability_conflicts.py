@@ -0,0 +1,69 @@
+"""Availability conflict check: per-occurrence slot scans vs the interval index.
+
+A provider gets twelve back-to-back daily one-hour blocks (06:00-18:00) in
+5-minute slots, every slot stored as a row (105k slots over the default two
+years). A weekly series is then checked for overlaps by querying the slot table
+once per occurrence, and by AvailabilityIntervalIndex. Both must report the
+same conflicting occurrences before timing.
+
+Usage: python benchmarks/bench_availability_conflicts.py [--years 2] [--repeat 3]
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import load_app, measure
+
+
+def naive_conflicts(server, availability):
+    """Occurrences overlapping any of the provider's stored slots, one query each."""
+    slots = server.AppointmentSlot
+    starts, ends = server.availability_blocks(availability)
+    found = 0
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        overlap = server.db.session.query(slots.id).filter(
+            slots.provider_id == availability.provider_id,
+            slots.slot_start_time < end,
+            slots.slot_end_time > start
+        ).first()
+        found += overlap is not None
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, default=2, help='span of the existing schedule')
+    parser.add_argument('--repeat', type=int, default=3, help='checks per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    start = date.today() + timedelta(days=1)
+    end = start + timedelta(days=365 * args.years)
+
+    def rule(start_time, end_time, pattern, slot_duration=5):
+        return server.ProviderAvailability(
+            provider_id='bench', date=start, start_time=start_time, end_time=end_time,
+            timezone='UTC', is_recurring=True, recurrence_pattern=pattern, recurrence_end_date=end,
+            slot_duration=slot_duration, break_duration=0, appointment_type='consultation', location={}
+        )
+
+    with server.app.app_context():
+        for hour in range(6, 18):
+            availability = rule(f'{hour:02d}:00', f'{hour + 1:02d}:00', 'daily')
+            server.db.session.add(availability)
+            server.db.session.flush()
+            server.insert_appointment_slots(server.build_appointment_slot_rows(availability))
+        server.db.session.commit()
+        print(f"{server.AppointmentSlot.query.count()} stored slots")
+
+        for label, series in (('overlapping', rule('12:30', '13:30', 'weekly', 30)),
+                              ('free', rule('19:00', '20:00', 'weekly', 30))):
+            index_check = lambda: server.find_availability_conflicts(series)[1]
+            assert naive_conflicts(server, series) == index_check()
+            weeks = len(server.availability_days(series))
+            before = measure(f'{label} ({weeks} weeks): slot scans', lambda: naive_conflicts(server, series), args.repeat)
+            after = measure(f'{label} ({weeks} weeks): interval index', index_check, args.repeat)
+            print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
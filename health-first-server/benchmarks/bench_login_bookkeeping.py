@@ -0,0 +1,74 @@
+"""Provider logins per second: legacy per-step commits vs coalesced bookkeeping.
+
+Runs against a file-backed SQLite database so commit (fsync) cost is real.
+bcrypt runs at cost 4 to keep password hashing from dominating the numbers.
+
+Usage: python benchmarks/bench_login_bookkeeping.py [--logins 300]
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+
+from common import load_app, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=300, help='logins per run')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+    credentials = {'identifier': 'bench@example.com', 'password': 'Password123!'}
+
+    with server.app.app_context():
+        provider = server.Provider(
+            first_name='Bench', last_name='Mark', email=credentials['identifier'],
+            phone_number='+15550000000', password_hash=server.hash_password(credentials['password']),
+            specialization='Cardiology', license_number='BENCH1', years_of_experience=1,
+            clinic_address={}, verification_status='verified'
+        )
+        server.db.session.add(provider)
+        server.db.session.commit()
+        provider_id = provider.id
+
+    def legacy_bookkeeping():
+        # generate_tokens() commit, then reset_failed_attempts() commit, then the final commit
+        provider = server.db.session.get(server.Provider, provider_id)
+        server.db.session.add(server.RefreshToken(
+            provider_id=provider_id, token_hash=server.digest_refresh_token(str(uuid.uuid4())),
+            expires_at=datetime.utcnow() + timedelta(days=7)
+        ))
+        server.db.session.commit()
+        provider.last_login = datetime.utcnow()
+        provider.login_count += 1
+        provider.failed_login_attempts = 0
+        provider.locked_until = None
+        server.db.session.commit()
+        server.db.session.commit()
+
+    def coalesced_bookkeeping():
+        provider = server.db.session.get(server.Provider, provider_id)
+        server.generate_tokens(provider_id, False, provider.token_epoch)
+        provider.reset_failed_attempts(commit=False)
+        server.db.session.commit()
+        server.login_telemetry.record_login(server.Provider, provider_id)
+
+    def http_login():
+        client.post('/api/v1/provider/login', json=credentials)
+
+    with server.app.app_context():
+        before = measure('bookkeeping: legacy per-step commits', legacy_bookkeeping, args.logins)
+        after = measure('bookkeeping: one commit + buffered telemetry', coalesced_bookkeeping, args.logins)
+        server.login_telemetry.flush()
+    print(f"bookkeeping speedup: {after / before:.1f}x")
+
+    server.app.config['LOGIN_TELEMETRY_BUFFERED'] = False
+    before = measure('POST /provider/login, telemetry unbuffered', http_login, args.logins)
+    server.app.config['LOGIN_TELEMETRY_BUFFERED'] = True
+    after = measure('POST /provider/login, telemetry buffered', http_login, args.logins)
+    print(f"end-to-end speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
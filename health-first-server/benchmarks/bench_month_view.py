@@ -0,0 +1,74 @@
+"""Provider month view: grouping every slot by day vs reading the daily rollups.
+
+A provider gets twelve back-to-back daily one-hour rules (06:00-18:00) in
+5-minute slots, with every tenth slot booked through the booking endpoint so the
+rollups are maintained as in production. A month of per-day open/booked counts
+is then built by walking provider_slots() for the month, as a calendar had to
+before, and by GET /provider/<id>/availability/calendar. Both must agree before
+timing.
+
+Usage: python benchmarks/bench_month_view.py [--months 1 3] [--repeat 10]
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import load_app, measure
+
+
+def slot_month_view(server, provider_id, first_day, next_month):
+    """Per-day counts from every slot of the month."""
+    days = {}
+    for slot in server.provider_slots(provider_id, first_day, next_month - timedelta(days=1)):
+        counts = days.setdefault(slot['local_start_time'][:10], {'available_slots': 0, 'booked_slots': 0})
+        if slot['status'] in ('available', 'booked'):
+            counts[f"{slot['status']}_slots"] += 1
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--months', type=int, nargs='+', default=[1, 3], help='schedule lengths in months')
+    parser.add_argument('--repeat', type=int, default=10, help='month views per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+    today = date.today()
+    first_day = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    next_month = (first_day + timedelta(days=32)).replace(day=1)
+
+    with server.app.app_context():
+        for months in args.months:
+            provider_id = f'bench-{months}'
+            for hour in range(6, 18):
+                availability = server.ProviderAvailability(
+                    provider_id=provider_id, date=first_day, start_time=f'{hour:02d}:00', end_time=f'{hour + 1:02d}:00',
+                    timezone='America/New_York', is_recurring=True, recurrence_pattern='daily',
+                    recurrence_end_date=first_day + timedelta(days=31 * months - 1), slot_duration=5,
+                    break_duration=0, appointment_type='consultation', location={'type': 'clinic', 'address': 'x'}
+                )
+                server.db.session.add(availability)
+                server.db.session.flush()
+                server.materialize_availability(availability, server.slot_horizon_end())
+            server.refresh_daily_rollups(provider_id, first_day, first_day + timedelta(days=31 * months))
+            # Bookings go through the same counter updates as book_appointment
+            for slot in list(server.provider_slots(provider_id, first_day, next_month - timedelta(days=1)))[::10]:
+                row = server.get_or_materialize_slot(slot['id'])
+                row.status = 'booked'
+                server.bump_daily_rollup(row, available=-1, booked=1)
+            server.db.session.commit()
+
+            url = f'/api/v1/provider/{provider_id}/availability/calendar?month={first_day:%Y-%m}'
+            rollup_view = lambda: client.get(url).get_json()['data']['days']
+            expected = slot_month_view(server, provider_id, first_day, next_month)
+            assert {day['date']: {'available_slots': day['available_slots'], 'booked_slots': day['booked_slots']}
+                    for day in rollup_view() if day['available_slots'] or day['booked_slots']} == expected
+            label = f'{months}-month schedule'
+            before = measure(f'{label}: every slot', lambda: slot_month_view(server, provider_id, first_day, next_month),
+                             args.repeat)
+            after = measure(f'{label}: daily rollups', rollup_view, args.repeat)
+            print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
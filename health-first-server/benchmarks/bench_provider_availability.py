@@ -0,0 +1,79 @@
+"""Provider availability reads: whole-history scan vs the windowed, indexed query.
+
+A provider has one daily 09:00-17:00 rule for the coming weeks and a growing
+history of past booked slots. For each history size, a 7-day
+GET /provider/<id>/availability is timed against the old handler's approach,
+which loaded and serialised every slot the provider ever had. The windowed
+read should stay flat as history grows.
+
+Usage: python benchmarks/bench_provider_availability.py [--history 10000 100000 300000] [--requests 5]
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import load_app, measure
+
+
+def legacy_read(server, provider_id):
+    """What the handler did before: every slot of the provider, serialised and grouped in Python."""
+    slots_by_date = {}
+    for slot in server.AppointmentSlot.query.filter_by(provider_id=provider_id).all():
+        slot = slot.to_dict()
+        slots_by_date.setdefault(slot['slot_start_time'][:10], []).append(slot)
+    return slots_by_date
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, nargs='+', default=[10000, 100000, 300000],
+                        help='past slot rows per run (cumulative)')
+    parser.add_argument('--requests', type=int, default=5, help='requests per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+    provider_id = 'bench'
+    today = date.today()
+    start = today + timedelta(days=7)
+    url = f'/api/v1/provider/{provider_id}/availability?start_date={start}&end_date={start + timedelta(days=6)}'
+
+    with server.app.app_context():
+        server.db.session.add(server.ProviderAvailability(
+            provider_id=provider_id, date=today + timedelta(days=1), start_time='09:00', end_time='17:00',
+            timezone='UTC', is_recurring=True, recurrence_pattern='daily',
+            recurrence_end_date=today + timedelta(days=60), slot_duration=30, location={}
+        ))
+        server.db.session.commit()
+
+        plan = server.db.session.execute(server.text(
+            'EXPLAIN QUERY PLAN SELECT * FROM appointment_slots '
+            'WHERE provider_id = :p AND slot_start_time >= :a AND slot_start_time < :b ORDER BY slot_start_time, id'
+        ), {'p': provider_id, 'a': start, 'b': start + timedelta(days=7)}).all()
+        print('stored-slot query plan:', '; '.join(row[-1] for row in plan))
+
+        stored = 0
+        for history in args.history:
+            # Past rules' booked slots, 40 per day, ending yesterday
+            days = -(-(history - stored) // 40)
+            past = server.ProviderAvailability(
+                id=f'history-{history}', provider_id=provider_id, date=today - timedelta(days=stored // 40 + days),
+                start_time='08:00', end_time='18:00', timezone='UTC', is_recurring=True, recurrence_pattern='daily',
+                recurrence_end_date=today - timedelta(days=stored // 40 + 1), slot_duration=15, break_duration=0,
+                appointment_type='consultation'
+            )
+            rows = server.build_appointment_slot_rows(past)
+            for row in rows:
+                row['status'] = 'booked'
+            server.insert_appointment_slots(rows)
+            server.db.session.commit()
+            stored += len(rows)
+
+            assert client.get(url).status_code == 200
+            label = f'{stored} past slots'
+            before = measure(f'{label}: whole history', lambda: legacy_read(server, provider_id), args.requests)
+            after = measure(f'{label}: 7-day window', lambda: client.get(url), args.requests)
+            print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
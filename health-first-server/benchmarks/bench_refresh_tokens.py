@@ -0,0 +1,59 @@
+"""Refresh throughput with the legacy salted bcrypt lookup vs the keyed digest lookup.
+
+Usage: python benchmarks/bench_refresh_tokens.py [--tokens 5000] [--requests 200]
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+
+import bcrypt
+
+from common import load_app, measure
+
+
+def legacy_hash_token(token):
+    return bcrypt.hashpw(token.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tokens', type=int, default=5000, help='refresh token rows to seed')
+    parser.add_argument('--requests', type=int, default=200, help='refresh calls per run')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+
+    with server.app.app_context():
+        provider_id = str(uuid.uuid4())
+        server.db.session.add(server.Provider(
+            id=provider_id, first_name='Bench', last_name='Mark', email='bench@example.com',
+            phone_number='+15550000000', password_hash='x', specialization='Cardiology',
+            license_number='BENCH1', years_of_experience=1, clinic_address={},
+            verification_status='verified'
+        ))
+        expires_at = datetime.utcnow() + timedelta(days=7)
+        tokens = [str(uuid.uuid4()) for _ in range(args.tokens)]
+        server.db.session.execute(server.RefreshToken.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'provider_id': provider_id, 'token_hash': server.digest_refresh_token(t),
+             'expires_at': expires_at, 'is_revoked': False}
+            for t in tokens
+        ])
+        server.db.session.commit()
+
+    token = tokens[len(tokens) // 2]
+
+    def refresh():
+        client.post('/api/v1/provider/refresh', json={'refresh_token': token})
+
+    print(f"{args.tokens} refresh tokens seeded")
+    digest_hash_token = server.RefreshToken.hash_token
+    server.RefreshToken.hash_token = staticmethod(legacy_hash_token)
+    before = measure('refresh (salted bcrypt lookup, never matches)', refresh, args.requests)
+    server.RefreshToken.hash_token = digest_hash_token
+    after = measure('refresh (HMAC-SHA256 indexed lookup)', refresh, args.requests)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Schedule re-fetches: full responses vs If-None-Match revalidation.
+
+A provider has a daily 08:00-18:00 rule in 15-minute slots with every fifth
+slot booked by one patient. The front end's repeated views are timed as plain
+GETs and as GETs carrying the previous ETag, for a 7-day provider availability
+page and the patient's appointment list. Revalidations must come back 304.
+
+Usage: python benchmarks/bench_schedule_revalidation.py [--requests 200]
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import load_app, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200, help='requests per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    client = server.app.test_client()
+    start = date.today() + timedelta(days=1)
+    patient = {
+        'first_name': 'Bench', 'last_name': 'Patient', 'email': 'bench@example.com',
+        'phone_number': '+15550000001', 'password': 'Password123!', 'confirm_password': 'Password123!',
+        'date_of_birth': '1990-05-15', 'gender': 'female',
+        'address': {'street': '1 Main St', 'city': 'Boston', 'state': 'MA', 'zip': '02101'}
+    }
+    client.post('/api/v1/patient/register', json=patient)
+    login = client.post('/api/v1/patient/login', json={'identifier': patient['email'], 'password': patient['password']})
+    patient_headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+
+    with server.app.app_context():
+        provider = server.Provider(
+            first_name='Bench', last_name='Provider', email='provider@bench', phone_number='+10000000001',
+            password_hash='x', specialization='Cardiology', license_number='B1', years_of_experience=1,
+            clinic_address={}
+        )
+        server.db.session.add(provider)
+        server.db.session.flush()
+        patient_id = server.Patient.query.filter_by(email=patient['email']).one().id
+        availability = server.ProviderAvailability(
+            provider_id=provider.id, date=start, start_time='08:00', end_time='18:00', timezone='UTC',
+            is_recurring=True, recurrence_pattern='daily', recurrence_end_date=start + timedelta(days=59),
+            slot_duration=15, break_duration=0, appointment_type='consultation', location={'type': 'clinic', 'address': 'x'}
+        )
+        server.db.session.add(availability)
+        server.db.session.flush()
+        server.materialize_availability(availability, server.slot_horizon_end())
+        server.db.session.execute(
+            server.AppointmentSlot.__table__.update()
+            .where(server.AppointmentSlot.__table__.c.id.in_(
+                [row['id'] for row in server.build_appointment_slot_rows(availability)][::5]
+            ))
+            .values(status='booked', patient_id=patient_id)
+        )
+        server.db.session.commit()
+        provider_id = provider.id
+
+    reads = {
+        'provider availability': (f'/api/v1/provider/{provider_id}/availability'
+                                  f'?start_date={start}&end_date={start + timedelta(days=6)}', {}),
+        'appointment list': ('/api/v1/appointment/list', patient_headers)
+    }
+
+    for label, (url, headers) in reads.items():
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        revalidate = {**headers, 'If-None-Match': response.headers['ETag']}
+        assert client.get(url, headers=revalidate).status_code == 304
+        before = measure(f'{label}: full response', lambda: client.get(url, headers=headers), args.requests)
+        after = measure(f'{label}: 304 revalidation', lambda: client.get(url, headers=revalidate), args.requests)
+        print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Slot expansion for long recurring availability: per-day loop vs minute-offset grid.
+
+The legacy expansion walks the recurrence day by day, formats each slot to
+HH:MM strings and parses them back with strptime. The grid expansion builds every
+date x time-of-day start in one array operation. Both are checked to produce the
+same slot times before timing, for 09:00-18:00 availability in 15-minute slots.
+
+Usage: python benchmarks/bench_slot_generation.py [--years 1 3 5] [--repeat 3]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+
+from common import load_app, measure
+
+
+def legacy_slot_times(server, availability):
+    """The day-by-day expansion create_availability used before the grid version."""
+    times = []
+    current_date = availability.date
+    end_date = availability.recurrence_end_date
+    while current_date <= end_date:
+        day_slots = server.generate_time_slots(
+            availability.start_time, availability.end_time,
+            availability.slot_duration, availability.break_duration
+        )
+        for slot in day_slots:
+            times.append((
+                datetime.strptime(f"{current_date} {slot['start']}", '%Y-%m-%d %H:%M'),
+                datetime.strptime(f"{current_date} {slot['end']}", '%Y-%m-%d %H:%M')
+            ))
+        next_date = server.get_next_date(current_date, availability.recurrence_pattern)
+        current_date = next_date.date() if isinstance(next_date, datetime) else next_date
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 3, 5], help='recurrence spans in years')
+    parser.add_argument('--repeat', type=int, default=3, help='expansions per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    start = date.today() + timedelta(days=1)
+
+    for pattern in ('daily', 'weekly', 'monthly'):
+        for years in args.years:
+            availability = server.ProviderAvailability(
+                id='bench', provider_id='bench', date=start, start_time='09:00', end_time='18:00',
+                timezone='UTC', is_recurring=True, recurrence_pattern=pattern,
+                recurrence_end_date=start + timedelta(days=365 * years),
+                slot_duration=15, break_duration=0, appointment_type='consultation', location={}
+            )
+            rows = server.build_appointment_slot_rows(availability)
+            assert [(row['slot_start_time'], row['slot_end_time']) for row in rows] == \
+                legacy_slot_times(server, availability)
+
+            label = f'{pattern:<7} {years}y ({len(rows)} slots)'
+            before = measure(f'{label} legacy loop', lambda: legacy_slot_times(server, availability), args.repeat)
+            after = measure(f'{label} grid', lambda: server.build_appointment_slot_rows(availability), args.repeat)
+            print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
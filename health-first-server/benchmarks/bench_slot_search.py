@@ -0,0 +1,98 @@
+"""Cross-provider slot search: join on provider and availability vs the open-slot indexes.
+
+Each provider gets one specialization (of 20), one appointment type and one
+location type, and a daily 09:00-17:00 rule in 30-minute slots whose rows are
+stored, as the slot horizon would. "The first 20 open slots" searches are then
+timed as a join that filters on provider.specialization and the availability's
+location JSON, and with search_open_slots(). Both must return the same slots
+before timing.
+
+Usage: python benchmarks/bench_slot_search.py [--providers 10000] [--days 7] [--repeat 20]
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from common import load_app, measure
+
+SPECIALIZATIONS = [f'specialty {n:02d}' for n in range(20)]
+
+
+def join_search(server, window_start, window_end, specialization, appointment_type, location_type, limit):
+    """The search without denormalised columns: every open slot joined to its provider and availability."""
+    slots, providers, availabilities = server.AppointmentSlot, server.Provider, server.ProviderAvailability
+    query = server.db.session.query(slots.id).join(providers, slots.provider_id == providers.id).join(
+        availabilities, slots.availability_id == availabilities.id
+    ).filter(
+        slots.status == 'available',
+        slots.slot_start_time >= window_start,
+        slots.slot_start_time < window_end,
+        server.func.lower(providers.specialization) == specialization
+    )
+    if appointment_type:
+        query = query.filter(slots.appointment_type == appointment_type)
+    if location_type:
+        query = query.filter(server.func.json_extract(availabilities.location, '$.type') == location_type)
+    return [slot_id for (slot_id,) in query.order_by(slots.slot_start_time, slots.id).limit(limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--providers', type=int, default=10000, help='providers with one rule each')
+    parser.add_argument('--days', type=int, default=7, help='days of stored slots per rule')
+    parser.add_argument('--repeat', type=int, default=20, help='searches per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    rng = random.Random(7)
+    start = date.today() + timedelta(days=1)
+
+    with server.app.app_context():
+        for batch in range(0, args.providers, 1000):
+            providers, availabilities = [], []
+            for n in range(batch, min(batch + 1000, args.providers)):
+                provider_id = f'provider-{n}'
+                providers.append({
+                    'id': provider_id, 'first_name': 'Bench', 'last_name': str(n), 'email': f'{n}@bench',
+                    'phone_number': f'+1{n:010d}', 'password_hash': 'x', 'specialization': rng.choice(SPECIALIZATIONS).title(),
+                    'license_number': f'B{n}', 'years_of_experience': 1, 'clinic_address': {}
+                })
+                availability = server.ProviderAvailability(
+                    id=f'availability-{n}', provider_id=provider_id, date=start, start_time='09:00', end_time='17:00',
+                    timezone='UTC', is_recurring=True, recurrence_pattern='daily',
+                    recurrence_end_date=start + timedelta(days=args.days - 1), slot_duration=30, break_duration=0,
+                    appointment_type=rng.choice(server.APPOINTMENT_TYPES),
+                    location={'type': rng.choice(server.LOCATION_TYPES), 'address': 'x'}, status='available'
+                )
+                availabilities.append(availability)
+            server.db.session.execute(server.Provider.__table__.insert(), providers)
+            server.db.session.execute(server.ProviderAvailability.__table__.insert(), [
+                {column.name: getattr(availability, column.name) for column in server.ProviderAvailability.__table__.columns}
+                for availability in availabilities
+            ])
+            server.insert_appointment_slots([row for availability in availabilities
+                                             for row in server.build_appointment_slot_rows(availability)])
+            server.db.session.commit()
+        print(f"{server.AppointmentSlot.query.count()} stored open slots, {args.providers} providers")
+
+        window_start = datetime.combine(start + timedelta(days=2), datetime.min.time())
+        window_end = window_start + timedelta(days=3)
+        for specialization, appointment_type, location_type in (
+            (SPECIALIZATIONS[3], 'telemedicine', 'telemedicine'),
+            (SPECIALIZATIONS[3], None, None),
+        ):
+            def indexed():
+                return [row.id for row in server.search_open_slots(
+                    window_start, window_end, specialization, appointment_type, location_type, 20
+                )]
+            joined = lambda: join_search(server, window_start, window_end, specialization, appointment_type,
+                                         location_type, 20)
+            assert indexed() == joined()
+            label = ' + '.join(filter(None, (specialization, appointment_type, location_type)))
+            before = measure(f'{label}: join', joined, args.repeat)
+            after = measure(f'{label}: open-slot index', indexed, args.repeat)
+            print(f"{label} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
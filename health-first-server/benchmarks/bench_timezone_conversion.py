@@ -0,0 +1,51 @@
+"""Local-to-UTC slot time conversion: zoneinfo per datetime vs cached transition tables.
+
+Converts a year of 15-minute slot start times (local wall clock, including both
+DST changes) to naive UTC the way a per-slot loop would, with
+datetime.replace(tzinfo=ZoneInfo(...)).astimezone(), and with the
+ZoneTransitions table create_availability uses. Results are checked to match
+before timing. The first table build for a zone is timed separately.
+
+Usage: python benchmarks/bench_timezone_conversion.py [--zone America/New_York] [--slots 1000000]
+"""
+import argparse
+import time
+from datetime import timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from common import load_app, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--zone', default='America/New_York', help='IANA time zone')
+    parser.add_argument('--slots', type=int, default=1000000, help='slot times per conversion run')
+    parser.add_argument('--repeat', type=int, default=1, help='conversions per measurement')
+    args = parser.parse_args()
+
+    server = load_app()
+    zone = ZoneInfo(args.zone)
+    local = np.datetime64('2027-01-01T00:00', 'm') + np.arange(args.slots, dtype=np.int64).astype('timedelta64[m]') * 15
+    local_datetimes = local.astype('datetime64[us]').tolist()
+
+    started = time.perf_counter()
+    table = server.load_zone_transitions(args.zone)
+    print(f"transition table for {args.zone}: {len(table.transitions)} transitions, "
+          f"built in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def per_datetime():
+        return [value.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None) for value in local_datetimes]
+
+    def vectorised():
+        return table.to_utc(local)
+
+    assert vectorised().astype('datetime64[us]').tolist() == per_datetime()
+    before = measure(f'{args.slots} slots: zoneinfo per datetime', per_datetime, args.repeat)
+    after = measure(f'{args.slots} slots: transition table', vectorised, args.repeat)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
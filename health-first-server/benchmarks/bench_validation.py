@@ -0,0 +1,58 @@
+"""Request validation cost: marshmallow load() vs compiled schemas.
+
+Validates representative valid payloads for each write endpoint schema, which is
+the path the compiled validators accelerate (invalid input is re-run through
+marshmallow to produce identical errors).
+
+Usage: python benchmarks/bench_validation.py [--iterations 20000]
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import load_app, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000, help='loads per schema')
+    args = parser.parse_args()
+
+    server = load_app()
+    start_date = (date.today() + timedelta(days=7)).isoformat()
+    payloads = {
+        'ProviderSchema': (server.provider_schema, {
+            'first_name': 'Sarah', 'last_name': 'Johnson', 'email': 'sarah@example.com',
+            'phone_number': '+12025550123', 'password': 'Password123!', 'confirm_password': 'Password123!',
+            'specialization': 'Cardiology', 'license_number': 'MD123456', 'years_of_experience': 8,
+            'clinic_address': {'street': '1 Main St', 'city': 'Boston', 'state': 'MA', 'zip': '02101'}
+        }),
+        'PatientRegistrationSchema': (server.patient_schema, {
+            'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com',
+            'phone_number': '+12025550199', 'password': 'Password123!', 'confirm_password': 'Password123!',
+            'date_of_birth': '1990-05-15', 'gender': 'male',
+            'address': {'street': '2 Main St', 'city': 'Boston', 'state': 'MA', 'zip': '02101'},
+            'emergency_contact': {'name': 'Jane Doe', 'phone': '+12025550100', 'relationship': 'spouse'},
+            'medical_history': ['asthma'],
+            'insurance_info': {'provider': 'Acme', 'policy_number': 'P123'}
+        }),
+        'AvailabilitySchema': (server.availability_schema, {
+            'date': start_date, 'start_time': '09:00', 'end_time': '17:00', 'timezone': 'America/New_York',
+            'slot_duration': 30, 'break_duration': 5, 'is_recurring': True, 'recurrence_pattern': 'weekly',
+            'recurrence_end_date': start_date, 'appointment_type': 'consultation',
+            'location': {'type': 'clinic', 'address': '1 Main St', 'room_number': '12'},
+            'pricing': {'base_fee': 150.0, 'insurance_accepted': True},
+            'special_requirements': ['fasting'], 'notes': 'Bring records'
+        })
+    }
+
+    with server.app.app_context():
+        for name, (schema, payload) in payloads.items():
+            compiled = server.compiled_schema(schema)
+            assert compiled.load(payload) == schema.load(payload)
+            before = measure(f'{name}: marshmallow', lambda: schema.load(payload), args.iterations)
+            after = measure(f'{name}: compiled', lambda: compiled.load(payload), args.iterations)
+            print(f"{name} speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
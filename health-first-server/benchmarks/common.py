@@ -0,0 +1,31 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app():
+    """Import app.py bound to a throwaway SQLite database and create its tables."""
+    db_dir = tempfile.mkdtemp(prefix='health-first-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'bench.db')
+    os.environ.setdefault('JWT_KEYS_DIR', os.path.join(db_dir, 'jwt_keys'))
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    import app as server
+    with server.app.app_context():
+        server.db.create_all()
+    return server
+
+
+def measure(label, fn, iterations):
+    """Run fn() `iterations` times and print throughput."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<45} {iterations:>7} ops  {elapsed:8.3f}s  {iterations / elapsed:10.1f} ops/s")
+    return iterations / elapsed
@@ -20,6 +20,8 @@ limiter = Limiter(
 mongo_client = None
 
 def create_app(config_class=Config):
+    if hasattr(config_class, 'validate'):
+        config_class.validate()
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -42,4 +44,9 @@ def create_app(config_class=Config):
         with app.app_context():
             db.create_all()
 
+    # Deliver queued emails in the background
+    if app.config['OUTBOX_DISPATCHER_ENABLED']:
+        from src.services.outbox import outbox_dispatcher
+        outbox_dispatcher.start(app, app.config['OUTBOX_POLL_INTERVAL'])
+
     return app 
\ No newline at end of file
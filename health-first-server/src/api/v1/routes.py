@@ -4,6 +4,7 @@ from marshmallow import ValidationError
 from src import limiter
 from src.schemas.provider import ProviderRegistrationSchema, ProviderResponseSchema
 from src.services.provider import ProviderService
+from src.services.password import PasswordPoolSaturated
 from src.core.config import Config
 
 # Create blueprint
@@ -43,6 +44,14 @@ def register_provider():
             'errors': e.messages
         }), 422
     
+    except PasswordPoolSaturated:
+        response = jsonify({
+            'success': False,
+            'message': 'Server is busy, please retry shortly'
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
     except ValueError as e:
         if 'already exists' in str(e):
             return jsonify({
@@ -19,7 +19,11 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Security Settings
+    # Calibrate per host with `flask --app app calibrate-bcrypt`
     BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', str(os.cpu_count() or 2)))
+    PASSWORD_POOL_QUEUE_SIZE = int(os.getenv('PASSWORD_POOL_QUEUE_SIZE', '32'))
+    PHONE_CACHE_SIZE = int(os.getenv('PHONE_CACHE_SIZE', '4096'))
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY') or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
     
@@ -30,6 +34,15 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@healthfirst.com')
+
+    # Email Outbox Settings
+    OUTBOX_DISPATCHER_ENABLED = os.getenv('OUTBOX_DISPATCHER_ENABLED', 'true').lower() == 'true'
+    OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '2'))  # seconds
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '50'))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))
+    OUTBOX_BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE', '30'))  # seconds, doubled per attempt
+    OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', '3600'))
+    OUTBOX_LEASE_SECONDS = float(os.getenv('OUTBOX_LEASE_SECONDS', '300'))
     
     # Rate Limiting Settings
     RATELIMIT_DEFAULT = "200 per day"
@@ -64,6 +77,7 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     MAIL_SUPPRESS_SEND = True
+    OUTBOX_DISPATCHER_ENABLED = False
 
 class ProductionConfig(Config):
     """Production configuration."""
@@ -72,9 +86,12 @@ class ProductionConfig(Config):
     # Override these in production
     SECRET_KEY = os.getenv('SECRET_KEY')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
-    
-    if not all([SECRET_KEY, JWT_SECRET_KEY]):
-        raise ValueError("Secret keys must be set in production!")
+
+    @classmethod
+    def validate(cls):
+        """Checked when an app is created, so importing the package never requires secrets."""
+        if not all([cls.SECRET_KEY, cls.JWT_SECRET_KEY]):
+            raise ValueError("Secret keys must be set in production!")
 
 # Configuration dictionary
 config = {
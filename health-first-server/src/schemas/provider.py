@@ -1,8 +1,21 @@
 """Provider schema validation using Marshmallow."""
-from marshmallow import Schema, fields, validate, validates, ValidationError
+from functools import lru_cache
+from typing import Optional
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError
 import phonenumbers
 from src.core.config import Config
 
+@lru_cache(maxsize=Config.PHONE_CACHE_SIZE)
+def normalize_phone_number(value: str) -> Optional[str]:
+    """Return the E.164 form of a valid phone number, or None; parsed once per distinct input."""
+    try:
+        phone_number = phonenumbers.parse(value, None)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(phone_number):
+        return None
+    return phonenumbers.format_number(phone_number, phonenumbers.PhoneNumberFormat.E164)
+
 class ClinicAddressSchema(Schema):
     """Schema for clinic address validation."""
     street = fields.Str(
@@ -81,11 +94,7 @@ class ProviderRegistrationSchema(Schema):
     @validates('phone_number')
     def validate_phone_number(self, value):
         """Validate phone number format."""
-        try:
-            phone_number = phonenumbers.parse(value, None)
-            if not phonenumbers.is_valid_number(phone_number):
-                raise ValidationError("Invalid phone number format")
-        except phonenumbers.NumberParseException:
+        if normalize_phone_number(value) is None:
             raise ValidationError("Invalid phone number format")
 
     @validates('specialization')
@@ -96,11 +105,11 @@ class ProviderRegistrationSchema(Schema):
                 f"Invalid specialization. Must be one of: {', '.join(Config.VALID_SPECIALIZATIONS)}"
             )
 
-    @validates('confirm_password')
-    def validate_confirm_password(self, value, data):
+    @validates_schema
+    def validate_confirm_password(self, data, **kwargs):
         """Validate password confirmation matches."""
-        if value != data.get('password'):
-            raise ValidationError("Passwords do not match")
+        if data.get('confirm_password') != data.get('password'):
+            raise ValidationError("Passwords do not match", 'confirm_password')
 
 class ProviderResponseSchema(Schema):
     """Schema for provider registration response."""
@@ -1,13 +1,18 @@
 """Email service for sending verification emails."""
 from typing import Dict, Any
+from functools import lru_cache
 import jwt
 from datetime import datetime, timedelta
 from flask_mail import Message
 from jinja2 import Template
-from src import mail
+from src import db, mail
 from src.core.config import Config
+from src.models.email_outbox import EmailOutbox
 from flask import current_app
 
+VERIFICATION_TEMPLATE = 'provider_verification'
+VERIFICATION_SUBJECT = 'Verify Your Health First Provider Account'
+
 class EmailService:
     """Service for handling email operations."""
 
@@ -33,8 +38,9 @@ class EmailService:
             raise ValueError("Invalid verification token")
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_verification_email_template() -> Template:
-        """Get the email template for verification emails."""
+        """Get the email template for verification emails (compiled once per process)."""
         return Template("""
             <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2>Welcome to Health First!</h2>
@@ -68,21 +74,49 @@ class EmailService:
             </div>
         """)
 
-    def send_verification_email(self, provider: Dict[str, Any], verification_url: str) -> None:
-        """Send a verification email to the provider."""
-        template = self.get_verification_email_template()
-        html_content = template.render(
-            last_name=provider['last_name'],
-            verification_url=verification_url
-        )
+    @classmethod
+    def get_template(cls, name: str) -> Template:
+        """Look up a compiled template by the name stored on outbox rows."""
+        templates = {
+            VERIFICATION_TEMPLATE: cls.get_verification_email_template
+        }
+        return templates[name]()
 
-        msg = Message(
-            subject='Verify Your Health First Provider Account',
-            recipients=[provider['email']],
-            html=html_content,
+    def build_message(self, recipient: str, subject: str, template: str, context: Dict[str, Any]) -> Message:
+        """Render a template into a ready-to-send message."""
+        return Message(
+            subject=subject,
+            recipients=[recipient],
+            html=self.get_template(template).render(**context),
             sender=Config.MAIL_DEFAULT_SENDER
         )
 
+    def queue_verification_email(self, provider: Dict[str, Any], verification_url: str) -> EmailOutbox:
+        """Add a verification email to the outbox in the caller's transaction.
+
+        The row is committed with the provider and delivered by the outbox dispatcher.
+        """
+        entry = EmailOutbox(
+            recipient=provider['email'],
+            subject=VERIFICATION_SUBJECT,
+            template=VERIFICATION_TEMPLATE,
+            context={
+                'last_name': provider['last_name'],
+                'verification_url': verification_url
+            }
+        )
+        db.session.add(entry)
+        return entry
+
+    def send_verification_email(self, provider: Dict[str, Any], verification_url: str) -> None:
+        """Send a verification email to the provider immediately."""
+        msg = self.build_message(
+            provider['email'],
+            VERIFICATION_SUBJECT,
+            VERIFICATION_TEMPLATE,
+            {'last_name': provider['last_name'], 'verification_url': verification_url}
+        )
+
         try:
             mail.send(msg)
         except Exception as e:
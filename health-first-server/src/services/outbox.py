@@ -0,0 +1,139 @@
+"""Background delivery of queued outbox emails."""
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from flask import Flask
+from src import db, mail
+from src.core.config import Config
+from src.models.email_outbox import EmailOutbox
+from src.services.email import EmailService
+
+class OutboxDispatcher:
+    """Deliver pending outbox emails in batches over one SMTP connection.
+
+    Each batch is claimed with a lease (claimed_by + next_attempt_at), so several
+    workers can run a dispatcher against the same table without sending an email
+    twice; a batch abandoned by a crashed worker is picked up once its lease
+    expires. Failed sends are retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS, after which the row is marked 'failed'.
+    """
+
+    def __init__(self, batch_size: int = Config.OUTBOX_BATCH_SIZE,
+                 max_attempts: int = Config.OUTBOX_MAX_ATTEMPTS,
+                 backoff_base: float = Config.OUTBOX_BACKOFF_BASE,
+                 backoff_max: float = Config.OUTBOX_BACKOFF_MAX,
+                 lease_seconds: float = Config.OUTBOX_LEASE_SECONDS):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.email_service = EmailService()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+
+    def _claim_batch(self) -> list:
+        """Lease up to batch_size due rows for this dispatcher and return them."""
+        now = datetime.utcnow()
+        claim = uuid.uuid4().hex
+        due_ids = [
+            row.id for row in db.session.query(EmailOutbox.id)
+            .filter(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+        ]
+        if not due_ids:
+            return []
+        EmailOutbox.query.filter(
+            EmailOutbox.id.in_(due_ids),
+            EmailOutbox.status == 'pending',
+            EmailOutbox.next_attempt_at <= now
+        ).update({
+            'claimed_by': claim,
+            'next_attempt_at': now + timedelta(seconds=self.lease_seconds)
+        }, synchronize_session=False)
+        db.session.commit()
+        return EmailOutbox.query.filter_by(claimed_by=claim).order_by(EmailOutbox.id).all()
+
+    def _record_failure(self, entry: EmailOutbox, error: Exception, now: datetime) -> None:
+        entry.attempts += 1
+        entry.last_error = str(error)[:1000]
+        entry.claimed_by = None
+        if entry.attempts >= self.max_attempts:
+            entry.status = 'failed'
+        else:
+            entry.next_attempt_at = now + self._backoff(entry.attempts)
+
+    def dispatch_batch(self) -> Dict[str, int]:
+        """Send one batch; returns counts of sent, retried and failed emails."""
+        batch = self._claim_batch()
+        result = {'sent': 0, 'retried': 0, 'failed': 0}
+        if not batch:
+            return result
+
+        try:
+            with mail.connect() as connection:
+                for entry in batch:
+                    try:
+                        connection.send(self.email_service.build_message(
+                            entry.recipient, entry.subject, entry.template, entry.context
+                        ))
+                    except Exception as e:
+                        self._record_failure(entry, e, datetime.utcnow())
+                        result['failed' if entry.status == 'failed' else 'retried'] += 1
+                    else:
+                        entry.status = 'sent'
+                        entry.sent_at = datetime.utcnow()
+                        entry.claimed_by = None
+                        result['sent'] += 1
+        except Exception as e:
+            # Connecting (or the connection dropping) failed: retry the unsent rest of the batch
+            now = datetime.utcnow()
+            for entry in batch:
+                if entry.claimed_by is not None:
+                    self._record_failure(entry, e, now)
+                    result['failed' if entry.status == 'failed' else 'retried'] += 1
+
+        db.session.commit()
+        return result
+
+    def drain(self) -> Dict[str, int]:
+        """Dispatch batches until nothing is due."""
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            result = self.dispatch_batch()
+            for key in totals:
+                totals[key] += result[key]
+            if not any(result.values()):
+                return totals
+
+    def _run(self, app: Flask, interval: float) -> None:
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    self.drain()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Email outbox dispatch failed: {str(e)}")
+            self._stop.wait(interval)
+
+    def start(self, app: Flask, interval: float = Config.OUTBOX_POLL_INTERVAL) -> None:
+        """Start dispatching in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(app, interval), name='email-outbox', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,94 @@
+"""Bounded password hashing pool for provider registration."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+import bcrypt
+
+from src.core.config import Config
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the hashing queue is full and the request should be shed with a 503."""
+
+class PasswordHashingPool:
+    """Size-limited executor with a bounded queue for bcrypt operations."""
+
+    def __init__(self, workers: int, queue_size: int):
+        """Initialize the pool."""
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.rejected = 0
+        self._latency: Dict[str, list] = {}  # operation -> [count, total_seconds, max_seconds, total_wait_seconds]
+
+    def _execute(self, fn, args, submitted):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args), started - submitted
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def run(self, operation: str, fn, *args):
+        """Run fn(*args) on the pool or raise PasswordPoolSaturated if the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolSaturated("Password hashing queue is full")
+
+        submitted = time.perf_counter()
+        wait = 0.0
+        with self._lock:
+            self._in_flight += 1
+        try:
+            result, wait = self._executor.submit(self._execute, fn, args, submitted).result()
+            return result
+        finally:
+            elapsed = time.perf_counter() - submitted
+            with self._lock:
+                self._in_flight -= 1
+                stats = self._latency.setdefault(operation, [0, 0.0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+                stats[3] += wait
+            self._slots.release()
+
+    def hash(self, password: str, rounds: int = 12) -> str:
+        """Hash a password using bcrypt at the given cost."""
+        return self.run('hash', lambda: bcrypt.hashpw(
+            password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)
+        ).decode('utf-8'))
+
+    def check(self, password: str, password_hash: str) -> bool:
+        """Verify a password against a bcrypt hash."""
+        return self.run('check', bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and per-operation latency for tuning the pool size."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'queue_depth': self._in_flight - self._running,
+                'rejected': self.rejected,
+                'operations': {
+                    operation: {
+                        'count': count,
+                        'avg_ms': round(total / count * 1000, 2),
+                        'max_ms': round(longest * 1000, 2),
+                        'avg_wait_ms': round(wait / count * 1000, 2)
+                    }
+                    for operation, (count, total, longest, wait) in self._latency.items()
+                }
+            }
+
+password_pool = PasswordHashingPool(Config.PASSWORD_POOL_WORKERS, Config.PASSWORD_POOL_QUEUE_SIZE)
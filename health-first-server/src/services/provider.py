@@ -1,11 +1,11 @@
 """Provider service for handling registration and related operations."""
 from typing import Dict, Any, Optional
-import bcrypt
 from sqlalchemy import or_
 from flask import current_app, url_for
 from src import db
 from src.models.provider import Provider
 from src.services.email import EmailService
+from src.services.password import password_pool
 from src.core.config import Config
 
 class ProviderService:
@@ -16,9 +16,8 @@ class ProviderService:
         self.email_service = EmailService()
 
     def _hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt."""
-        salt = bcrypt.gensalt(rounds=Config.BCRYPT_LOG_ROUNDS)
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash a password using bcrypt on the bounded hashing pool."""
+        return password_pool.hash(password, Config.BCRYPT_LOG_ROUNDS)
 
     def _check_existing_provider(self, email: str, phone_number: str, license_number: str) -> Optional[str]:
         """Check if a provider with given details already exists."""
@@ -67,7 +66,7 @@ class ProviderService:
             )
             
             db.session.add(provider)
-            db.session.commit()
+            db.session.flush()
 
             # Generate verification URL
             verification_token = self.email_service.generate_verification_token(str(provider.id))
@@ -77,8 +76,9 @@ class ProviderService:
                 _external=True
             )
 
-            # Send verification email
-            self.email_service.send_verification_email(provider.to_dict(), verification_url)
+            # Queue the verification email in the same transaction as the provider
+            self.email_service.queue_verification_email(provider.to_dict(), verification_url)
+            db.session.commit()
 
             return {
                 'provider_id': str(provider.id),
@@ -0,0 +1,105 @@
+"""Shared fixtures: app.py bound to a throwaway database and instance directory."""
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix='health-first-tests-')
+
+# Must be set before app.py is first imported
+os.environ.update({
+    'DATABASE_URL': 'sqlite:///' + os.path.join(TEST_DIR, 'test.db'),
+    'JWT_KEYS_DIR': os.path.join(TEST_DIR, 'jwt_keys'),
+    'LOCKOUT_STORE_PATH': os.path.join(TEST_DIR, 'lockout.store'),
+    'REVOCATION_BUS_PATH': os.path.join(TEST_DIR, 'revocation.bus'),
+    'BCRYPT_LOG_ROUNDS': '4',
+    'LOGIN_TELEMETRY_BUFFERED': 'false',
+    'ADMIN_API_KEY': 'test-admin-key',
+})
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+PASSWORD = 'Password123!'
+ADMIN_HEADERS = {'X-Admin-Key': 'test-admin-key'}
+
+
+@pytest.fixture
+def server():
+    """The app.py module with empty tables."""
+    import app as server
+    with server.app.app_context():
+        server.db.drop_all()
+        server.db.create_all()
+    yield server
+    with server.app.app_context():
+        server.db.session.remove()
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+def bearer(response) -> dict:
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+
+def register_provider(client, n: int = 1) -> dict:
+    """Register, verify and log in a provider; returns its id and auth headers."""
+    response = client.post('/api/v1/provider/register', json={
+        'first_name': 'Sarah', 'last_name': 'Johnson', 'email': f'provider{n}@example.com',
+        'phone_number': f'+1202555{n:04d}', 'password': PASSWORD, 'confirm_password': PASSWORD,
+        'specialization': 'Cardiology', 'license_number': f'MD{n:05d}', 'years_of_experience': 8,
+        'clinic_address': {'street': '1 Main St', 'city': 'Boston', 'state': 'MA', 'zip': '02101'}
+    })
+    assert response.status_code == 201, response.get_json()
+    data = response.get_json()['data']
+    client.get(f"/api/v1/provider/verify/{data['verification_token']}")
+    headers = bearer(client.post('/api/v1/provider/login', json={
+        'identifier': f'provider{n}@example.com', 'password': PASSWORD
+    }))
+    return {'id': data['provider_id'], 'email': f'provider{n}@example.com', 'headers': headers}
+
+
+def register_patient(client, n: int = 1) -> dict:
+    """Register and log in a patient; returns its id and auth headers."""
+    response = client.post('/api/v1/patient/register', json={
+        'first_name': 'John', 'last_name': 'Doe', 'email': f'patient{n}@example.com',
+        'phone_number': f'+1303555{n:04d}', 'password': PASSWORD, 'confirm_password': PASSWORD,
+        'date_of_birth': '1990-05-15', 'gender': 'male',
+        'address': {'street': '2 Elm St', 'city': 'Denver', 'state': 'CO', 'zip': '80201'}
+    })
+    assert response.status_code == 201, response.get_json()
+    headers = bearer(client.post('/api/v1/patient/login', json={
+        'identifier': f'patient{n}@example.com', 'password': PASSWORD
+    }))
+    return {'id': response.get_json()['data']['patient_id'], 'email': f'patient{n}@example.com', 'headers': headers}
+
+
+@pytest.fixture
+def provider(client):
+    return register_provider(client)
+
+
+@pytest.fixture
+def patient(client):
+    return register_patient(client)
+
+
+def create_availability(client, provider: dict, **fields) -> str:
+    """POST an availability (daily 09:00-12:00 UTC in 30-minute slots by default); returns its id."""
+    start = date.today() + timedelta(days=1)
+    payload = {
+        'date': start.isoformat(), 'start_time': '09:00', 'end_time': '12:00', 'timezone': 'UTC',
+        'slot_duration': 30, 'is_recurring': True, 'recurrence_pattern': 'daily',
+        'recurrence_end_date': (start + timedelta(days=6)).isoformat(),
+        'location': {'type': 'clinic', 'address': '1 Main St'}
+    }
+    payload.update(fields)
+    response = client.post('/api/v1/provider/availability', json=payload, headers=provider['headers'])
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['data']['availability_id']
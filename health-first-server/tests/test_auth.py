@@ -0,0 +1,143 @@
+"""Login bookkeeping, token revocation and the shared lockout store."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import ADMIN_HEADERS, PASSWORD, create_availability, register_patient
+
+
+@pytest.fixture
+def buffered_telemetry(server, monkeypatch):
+    monkeypatch.setitem(server.app.config, 'LOGIN_TELEMETRY_BUFFERED', True)
+    monkeypatch.setattr(server.login_telemetry, 'flush_job', None)  # flushed by the test, not a thread
+    with server.app.app_context():
+        server.login_telemetry.flush()
+    return server.login_telemetry
+
+
+def login_count(server, patient_id):
+    with server.app.app_context():
+        server.login_telemetry.flush()
+        return server.db.session.get(server.Patient, patient_id).login_count or 0
+
+
+def test_patient_login_telemetry_is_recorded_after_commit(server, client, buffered_telemetry):
+    patient = register_patient(client)
+    before = login_count(server, patient['id'])
+
+    response = client.post('/api/v1/patient/login', json={'identifier': patient['email'], 'password': PASSWORD})
+
+    assert response.status_code == 200
+    assert buffered_telemetry.stats()['pending_logins'] == 1
+    assert login_count(server, patient['id']) == before + 1
+
+
+def test_failed_patient_login_commit_records_no_telemetry(server, client, buffered_telemetry, monkeypatch):
+    patient = register_patient(client)
+    before = login_count(server, patient['id'])
+
+    def failing_commit():
+        raise RuntimeError('database is locked')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server.db.session, 'commit', failing_commit)
+        response = client.post('/api/v1/patient/login', json={'identifier': patient['email'], 'password': PASSWORD})
+
+    assert response.status_code == 500
+    assert buffered_telemetry.stats()['pending_logins'] == 0
+    assert login_count(server, patient['id']) == before
+
+
+def test_metrics_require_the_admin_key(client):
+    assert client.get('/api/v1/metrics').status_code == 403
+    assert client.get('/api/v1/metrics', headers={'X-Admin-Key': 'wrong'}).status_code == 403
+
+    response = client.get('/api/v1/metrics', headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert 'password_pool' in response.get_json()['data']
+
+
+def provider_request(client, provider, availability_id):
+    return client.get(f'/api/v1/provider/availability/{availability_id}/progress', headers=provider['headers'])
+
+
+def test_provider_logout_all_revokes_a_cached_access_token(server, client, provider):
+    availability_id = create_availability(client, provider)
+    assert provider_request(client, provider, availability_id).status_code == 200  # principal and token now cached
+
+    assert client.post('/api/v1/provider/logout-all', headers=provider['headers']).status_code == 200
+
+    response = provider_request(client, provider, availability_id)
+    assert response.status_code == 401
+    assert response.get_json()['error_code'] == 'TOKEN_REVOKED'
+
+
+def test_patient_logout_all_revokes_a_cached_access_token(client, patient):
+    assert client.get('/api/v1/appointment/summary', headers=patient['headers']).status_code == 200
+
+    assert client.post('/api/v1/patient/logout-all', headers=patient['headers']).status_code == 200
+
+    response = client.get('/api/v1/appointment/summary', headers=patient['headers'])
+    assert response.status_code == 401
+    assert response.get_json()['error_code'] == 'TOKEN_REVOKED'
+
+
+def test_deactivation_is_seen_on_the_next_request(server, client, provider):
+    availability_id = create_availability(client, provider)
+    assert provider_request(client, provider, availability_id).status_code == 200
+
+    with server.app.app_context():
+        server.db.session.get(server.Provider, provider['id']).is_active = False
+        server.db.session.commit()
+
+    response = provider_request(client, provider, availability_id)
+    assert response.status_code == 403
+    assert response.get_json()['error_code'] == 'INACTIVE_ACCOUNT'
+
+
+def test_deactivation_by_another_worker_is_seen_through_the_revocation_bus(server, client, patient):
+    assert client.get('/api/v1/appointment/summary', headers=patient['headers']).status_code == 200
+
+    # Another worker process: its own connection and its own view of the bus file
+    table = server.Patient.__table__
+    with server.app.app_context(), server.db.engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == patient['id']).values(is_active=False))
+    other_worker_bus = server.RevocationBus(server.app.config['REVOCATION_BUS_PATH'],
+                                            server.app.config['REVOCATION_BUS_BUCKETS'])
+    key = (server.Patient.__tablename__, patient['id'])
+    stamp = server.revocation_bus.stamp(key)
+    other_worker_bus.bump(key)
+    assert server.revocation_bus.stamp(key) == stamp + 1
+
+    response = client.get('/api/v1/appointment/summary', headers=patient['headers'])
+    assert response.status_code == 403
+    assert response.get_json()['error_code'] == 'INACTIVE_ACCOUNT'
+
+
+def test_lockout_is_shared_by_stores_on_the_same_file(server, tmp_path):
+    path = str(tmp_path / 'lockout.store')
+    first = server.SharedMemoryLockoutStore(path, 64)
+    second = server.SharedMemoryLockoutStore(path, 64)
+    key = ('patient', 'patient-1')
+
+    assert first.record_failure(key, 60) == 1
+    assert second.record_failure(key, 60) == 2
+    assert second.locked_until(key) is None
+
+    until = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=30)
+    first.lock(key, until)
+    assert second.locked_until(key) == until
+    assert second.locked_until(('patient', 'patient-2')) is None
+
+    second.reset(key)
+    assert first.locked_until(key) is None
+    assert first.record_failure(key, 60) == 1
+
+
+def test_lockout_store_requires_every_method(server):
+    class Partial(server.LockoutStore):
+        def record_failure(self, key, window_seconds):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
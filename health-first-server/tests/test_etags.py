@@ -0,0 +1,81 @@
+"""Schedule reads carry version-based ETags and answer a matching If-None-Match with 304."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import create_availability
+
+
+def slot_id(availability_id: str, day: date, hours: float) -> str:
+    return f'{availability_id}.{datetime.combine(day, datetime.min.time()) + timedelta(hours=hours):%Y%m%d%H%M}'
+
+
+@pytest.fixture
+def schedule(client, provider):
+    """Daily 09:00-12:00 UTC availability in 30-minute slots from tomorrow for 7 days."""
+    return create_availability(client, provider), date.today() + timedelta(days=1)
+
+
+def schedule_urls(provider, first) -> list:
+    window = {'start_date': first.isoformat(), 'end_date': (first + timedelta(days=6)).isoformat()}
+    return [
+        (f"/api/v1/provider/{provider['id']}/availability", window),
+        (f"/api/v1/provider/{provider['id']}/availability/summary", window),
+        (f"/api/v1/provider/{provider['id']}/availability/calendar", {'month': first.strftime('%Y-%m')}),
+    ]
+
+
+def etags(client, provider, patient, first) -> list:
+    tags = []
+    for url, params in schedule_urls(provider, first):
+        response = client.get(url, query_string=params)
+        assert response.status_code == 200
+        tags.append(response.headers['ETag'])
+    response = client.get('/api/v1/appointment/list', headers=patient['headers'])
+    assert response.status_code == 200
+    return tags + [response.headers['ETag']]
+
+
+def test_matching_if_none_match_is_answered_with_304(client, provider, patient, schedule):
+    _, first = schedule
+    for url, params in schedule_urls(provider, first):
+        etag = client.get(url, query_string=params).headers['ETag']
+
+        response = client.get(url, query_string=params, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+        assert client.get(url, query_string=params, headers={'If-None-Match': '"other"'}).status_code == 200
+
+    etag = client.get('/api/v1/appointment/list', headers=patient['headers']).headers['ETag']
+    assert client.get('/api/v1/appointment/list',
+                      headers={**patient['headers'], 'If-None-Match': etag}).status_code == 304
+
+
+def test_etags_change_after_every_schedule_write(client, provider, patient, schedule):
+    availability_id, first = schedule
+    first_slot, second_slot = slot_id(availability_id, first, 9), slot_id(availability_id, first, 10)
+    writes = [
+        ('book', lambda: client.post('/api/v1/appointment/book', json={'slot_id': first_slot},
+                                     headers=patient['headers'])),
+        ('update', lambda: client.put('/api/v1/appointment/update', headers=patient['headers'], json={
+            'current_slot_id': first_slot, 'new_slot_id': second_slot
+        })),
+        ('cancel', lambda: client.post('/api/v1/appointment/cancel', json={'slot_id': second_slot},
+                                       headers=patient['headers'])),
+        ('create_availability', lambda: client.post('/api/v1/provider/availability', headers=provider['headers'], json={
+            'date': first.isoformat(), 'start_time': '14:00', 'end_time': '15:00', 'timezone': 'UTC',
+            'slot_duration': 30, 'location': {'type': 'clinic', 'address': '1 Main St'}
+        })),
+    ]
+
+    before = etags(client, provider, patient, first)
+    for name, write in writes:
+        assert write().status_code in (200, 201), name
+        after = etags(client, provider, patient, first)
+        assert all(old != new for old, new in zip(before[:-1], after[:-1])), name
+        if name != 'create_availability':  # a new rule has no bookings on the patient's list
+            assert before[-1] != after[-1], name
+        for (url, params), old in zip(schedule_urls(provider, first), before):
+            assert client.get(url, query_string=params, headers={'If-None-Match': old}).status_code == 200, name
+        before = after
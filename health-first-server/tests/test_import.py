@@ -0,0 +1,49 @@
+"""Patient registration and bulk import share one set of required fields."""
+import json
+
+from conftest import ADMIN_HEADERS, PASSWORD
+
+
+def patient_record(n: int, **overrides) -> dict:
+    record = {
+        'first_name': 'John', 'last_name': 'Doe', 'email': f'patient{n}@example.com',
+        'phone_number': f'+1303555{n:04d}', 'password': PASSWORD, 'date_of_birth': '1990-05-15',
+        'gender': 'male', 'address': {'street': '2 Elm St', 'city': 'Denver', 'state': 'CO', 'zip': '80201'}
+    }
+    record.update(overrides)
+    return record
+
+
+def import_patients(client, records) -> list:
+    body = ''.join(json.dumps(record) + '\n' for record in records)
+    response = client.post('/api/v1/admin/import/patient', data=body,
+                           content_type='application/x-ndjson', headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_register_without_an_address_is_a_validation_error(server, client):
+    record = patient_record(1, confirm_password=PASSWORD)
+    del record['address']
+
+    response = client.post('/api/v1/patient/register', json=record)
+
+    assert response.status_code == 422
+    body = response.get_json()
+    assert 'address' in body['errors']
+    assert 'IntegrityError' not in response.get_data(as_text=True)
+    with server.app.app_context():
+        assert server.Patient.query.count() == 0
+
+
+def test_import_reports_a_row_without_an_address_as_invalid(server, client):
+    missing_address = patient_record(2)
+    del missing_address['address']
+
+    lines = import_patients(client, [patient_record(1), missing_address, patient_record(3)])
+
+    assert [line['status'] for line in lines[:-1]] == ['created', 'invalid', 'created']
+    assert 'address' in lines[1]['errors']
+    assert lines[-1] == {'summary': {'created': 2, 'invalid': 1, 'duplicate': 0, 'failed': 0}}
+    with server.app.app_context():
+        assert server.Patient.query.count() == 2
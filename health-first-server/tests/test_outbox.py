@@ -0,0 +1,134 @@
+"""OutboxDispatcher delivery against a local aiosmtpd server."""
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from src import create_app, db
+from src.core.config import TestingConfig
+from src.models.email_outbox import EmailOutbox
+from src.services.outbox import OutboxDispatcher
+
+
+class RecordingHandler:
+    """Accepts every message, except that the next `fail_next` get a transient 451."""
+
+    def __init__(self):
+        self.received = []
+        self.fail_next = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_next:
+            self.fail_next -= 1
+            return '451 Requested action aborted: try again later'
+        self.received.extend(envelope.rcpt_tos)
+        return '250 Message accepted for delivery'
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_handler():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    handler.port = controller.port
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def app(smtp_handler):
+    class SMTPTestingConfig(TestingConfig):
+        MAIL_SUPPRESS_SEND = False
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = smtp_handler.port
+        MAIL_USE_TLS = False
+        MAIL_USE_SSL = False
+        MAIL_USERNAME = None
+        MAIL_PASSWORD = None
+
+    app = create_app(SMTPTestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def queue_email(recipient: str) -> EmailOutbox:
+    entry = EmailOutbox(
+        recipient=recipient,
+        subject='Verify Your Health First Provider Account',
+        template='provider_verification',
+        context={'last_name': 'Johnson', 'verification_url': 'http://localhost/verify'}
+    )
+    db.session.add(entry)
+    db.session.commit()
+    return entry
+
+
+def make_due(entry: EmailOutbox) -> None:
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_dispatch_batch_sends_due_emails(app, smtp_handler):
+    entries = [queue_email(f'provider{n}@example.com') for n in range(3)]
+
+    assert OutboxDispatcher(batch_size=10).dispatch_batch() == {'sent': 3, 'retried': 0, 'failed': 0}
+
+    assert smtp_handler.received == [entry.recipient for entry in entries]
+    for entry in entries:
+        assert entry.status == 'sent'
+        assert entry.sent_at is not None
+        assert entry.claimed_by is None
+        assert entry.attempts == 0
+
+
+def test_transient_failure_is_retried_with_exponential_backoff(app, smtp_handler):
+    dispatcher = OutboxDispatcher(max_attempts=5, backoff_base=30, backoff_max=100)
+    entry = queue_email('provider@example.com')
+
+    for attempts, delay in enumerate([30, 60, 100], start=1):
+        smtp_handler.fail_next = 1
+        before = datetime.utcnow()
+        assert dispatcher.dispatch_batch() == {'sent': 0, 'retried': 1, 'failed': 0}
+        after = datetime.utcnow()
+
+        assert entry.status == 'pending'
+        assert entry.attempts == attempts
+        assert entry.claimed_by is None
+        assert '451' in entry.last_error
+        assert before + timedelta(seconds=delay) <= entry.next_attempt_at <= after + timedelta(seconds=delay)
+        # Not due again until the backoff has passed
+        assert dispatcher.dispatch_batch() == {'sent': 0, 'retried': 0, 'failed': 0}
+        make_due(entry)
+
+    assert dispatcher.dispatch_batch() == {'sent': 1, 'retried': 0, 'failed': 0}
+    assert entry.status == 'sent'
+    assert entry.attempts == 3
+    assert smtp_handler.received == ['provider@example.com']
+
+
+def test_email_is_failed_after_max_attempts(app, smtp_handler):
+    dispatcher = OutboxDispatcher(max_attempts=2, backoff_base=30)
+    entry = queue_email('provider@example.com')
+    smtp_handler.fail_next = 2
+
+    assert dispatcher.dispatch_batch() == {'sent': 0, 'retried': 1, 'failed': 0}
+    make_due(entry)
+    assert dispatcher.dispatch_batch() == {'sent': 0, 'retried': 0, 'failed': 1}
+
+    assert entry.status == 'failed'
+    assert entry.attempts == 2
+    assert entry.claimed_by is None
+    # A failed email is never claimed again
+    make_due(entry)
+    assert dispatcher.dispatch_batch() == {'sent': 0, 'retried': 0, 'failed': 0}
+    assert smtp_handler.received == []
@@ -0,0 +1,161 @@
+"""Keyset pagination of provider availability and the patient appointment list."""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import create_availability, register_provider
+
+
+def slot_id(availability_id: str, start: datetime) -> str:
+    return f'{availability_id}.{start:%Y%m%d%H%M}'
+
+
+def utc(day: date, hours: int) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hours)
+
+
+def availability_page(client, provider, start_date, end_date, **params):
+    response = client.get(f"/api/v1/provider/{provider['id']}/availability", query_string={
+        'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(), **params
+    })
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()['data']
+    return [slot for day in data['availability'] for slot in day['slots']], data['page']
+
+
+def walk_availability(client, provider, start_date, end_date, limit, **params) -> list:
+    slots, cursor = [], None
+    while True:
+        page_params = dict(params, limit=limit, **({'cursor': cursor} if cursor else {}))
+        page_slots, page = availability_page(client, provider, start_date, end_date, **page_params)
+        assert page['count'] == len(page_slots) <= limit
+        slots.extend(page_slots)
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            return slots
+        assert len(page_slots) == limit
+        cursor = page['next_cursor']
+
+
+@pytest.fixture
+def long_availability(server, client, provider, patient):
+    """Two slots a day for 80 days: stored rows up to the slot horizon, computed slots after it."""
+    first = date.today() + timedelta(days=1)
+    last = first + timedelta(days=server.app.config['SLOT_HORIZON_DAYS'] + 20)
+    availability_id = create_availability(client, provider, date=first.isoformat(), end_time='10:00',
+                                          recurrence_end_date=last.isoformat())
+    for day in (first + timedelta(days=2), last - timedelta(days=1)):
+        booked = slot_id(availability_id, utc(day, 9) + timedelta(minutes=30))
+        assert client.post('/api/v1/appointment/book', json={'slot_id': booked},
+                           headers=patient['headers']).status_code == 200
+    return availability_id, first, last
+
+
+def test_provider_pages_cover_stored_and_computed_slots_without_overlap_or_gap(server, client, provider,
+                                                                                long_availability):
+    availability_id, first, last = long_availability
+    with server.app.app_context():
+        stored = server.AppointmentSlot.query.count()
+
+    whole, page = availability_page(client, provider, first, last, limit=500)
+    assert not page['has_more']
+    assert len(whole) == 2 * ((last - first).days + 1)
+    assert stored < len(whole)  # the tail is computed past the horizon
+    assert [slot['status'] for slot in whole].count('booked') == 2
+
+    for limit in (1, 7, 50):
+        slots = walk_availability(client, provider, first, last, limit)
+        assert [slot['id'] for slot in slots] == [slot['id'] for slot in whole]
+
+    keys = [(slot['slot_start_time'], slot['id']) for slot in whole]
+    assert keys == sorted(set(keys))
+
+
+def test_provider_pages_with_a_status_filter(client, provider, long_availability):
+    _, first, last = long_availability
+
+    whole, _ = availability_page(client, provider, first, last, limit=500, status='available')
+    assert len(whole) == 2 * ((last - first).days + 1) - 2
+    assert [slot['id'] for slot in walk_availability(client, provider, first, last, 3, status='available')] == \
+        [slot['id'] for slot in whole]
+    booked = walk_availability(client, provider, first, last, 1, status='booked')
+    assert [slot['status'] for slot in booked] == ['booked', 'booked']
+
+
+@pytest.mark.parametrize('prefix', ['00000000', 'ffffffff'])  # sorts before and after the deterministic id
+def test_a_row_under_a_legacy_id_replaces_its_computed_slot(server, client, provider, long_availability, prefix):
+    availability_id, first, last = long_availability
+    start = utc(first, 9)
+    legacy_id = prefix + str(uuid.uuid4())[8:]
+    with server.app.app_context():
+        row = server.db.session.get(server.AppointmentSlot, slot_id(availability_id, start))
+        row.id, row.status = legacy_id, 'blocked'
+        server.db.session.commit()
+
+    for limit in (1, 2, 500):
+        slots = walk_availability(client, provider, first, first, limit)
+        assert [(slot['id'], slot['status']) for slot in slots] == [
+            (legacy_id, 'blocked'), (slot_id(availability_id, start + timedelta(minutes=30)), 'available')
+        ]
+
+
+def test_next_cursor_and_has_more_at_the_page_boundary(client, provider):
+    create_availability(client, provider)  # 7 days x 6 slots
+    first = date.today() + timedelta(days=1)
+    last = first + timedelta(days=6)
+
+    slots, page = availability_page(client, provider, first, last, limit=42)
+    assert (len(slots), page['has_more'], page['next_cursor']) == (42, False, None)
+
+    slots, page = availability_page(client, provider, first, last, limit=41)
+    assert (len(slots), page['has_more']) == (41, True)
+    rest, page = availability_page(client, provider, first, last, limit=41, cursor=page['next_cursor'])
+    assert len(rest) == 1 and rest[0]['id'] not in {slot['id'] for slot in slots}
+    assert (page['has_more'], page['next_cursor']) == (False, None)
+
+
+@pytest.mark.parametrize('params', [{'cursor': 'not-a-cursor'}, {'cursor': 'bm9waXBl'}, {'limit': 0},
+                                    {'limit': 501}, {'limit': 'ten'}])
+def test_malformed_page_arguments_are_rejected(client, provider, patient, params):
+    today = date.today().isoformat()
+    response = client.get(f"/api/v1/provider/{provider['id']}/availability",
+                          query_string={'start_date': today, 'end_date': today, **params})
+    assert response.status_code == 400
+    assert client.get('/api/v1/appointment/list', query_string=params,
+                      headers=patient['headers']).status_code == 400
+
+
+def test_appointment_list_pages_drop_rows_outside_the_local_range(client, provider, patient):
+    day = date.today() + timedelta(days=3)
+    utc_id = create_availability(client, provider, date=(day - timedelta(days=1)).isoformat(),
+                                 recurrence_end_date=(day + timedelta(days=1)).isoformat(), slot_duration=60)
+    # Pacific/Kiritimati is UTC+14, so its local mornings are the previous UTC evening
+    kiritimati = register_provider(client, 2)
+    kiritimati_id = create_availability(client, kiritimati, date=day.isoformat(), timezone='Pacific/Kiritimati',
+                                        recurrence_end_date=(day + timedelta(days=1)).isoformat(), slot_duration=60)
+
+    in_range = [slot_id(utc_id, utc(day, 10)), slot_id(utc_id, utc(day, 9)),
+                slot_id(kiritimati_id, utc(day, -4)), slot_id(kiritimati_id, utc(day, -5))]  # newest first
+    outside = [slot_id(utc_id, utc(day, 33)), slot_id(kiritimati_id, utc(day, 19)), slot_id(utc_id, utc(day, -13))]
+    for booked in in_range + outside:
+        assert client.post('/api/v1/appointment/book', json={'slot_id': booked},
+                           headers=patient['headers']).status_code == 200, booked
+
+    for limit in (1, 2, 3, 4):
+        ids, cursor = [], None
+        while True:
+            params = {'start_date': day.isoformat(), 'end_date': day.isoformat(), 'limit': limit}
+            if cursor:
+                params['cursor'] = cursor
+            response = client.get('/api/v1/appointment/list', query_string=params, headers=patient['headers'])
+            assert response.status_code == 200
+            data = response.get_json()['data']
+            assert all(appointment['appointment_date'] == day.isoformat() for appointment in data['appointments'])
+            ids.extend(appointment['slot_id'] for appointment in data['appointments'])
+            if not data['page']['has_more']:
+                assert data['page']['next_cursor'] is None
+                break
+            assert data['page']['count'] == limit
+            cursor = data['page']['next_cursor']
+        assert ids == in_range
@@ -0,0 +1,108 @@
+"""Daily rollups behind the month calendar, kept in step with bookings and availability edits."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import create_availability
+
+
+def slot_id(availability_id: str, day: date, hours: float) -> str:
+    return f'{availability_id}.{datetime.combine(day, datetime.min.time()) + timedelta(hours=hours):%Y%m%d%H%M}'
+
+
+def rollup_state(server, provider_id: str) -> tuple:
+    """({day: (available, booked, cancelled)} without empty days, {availability_id: current_appointments})."""
+    with server.app.app_context():
+        days = {
+            rollup.day: (rollup.available_slots, rollup.booked_slots, rollup.cancelled_slots)
+            for rollup in server.ProviderDailyRollup.query.filter_by(provider_id=provider_id)
+            if rollup.available_slots or rollup.booked_slots or rollup.cancelled_slots
+        }
+        bookings = {
+            availability.id: availability.current_appointments or 0
+            for availability in server.ProviderAvailability.query.filter_by(provider_id=provider_id)
+        }
+    return days, bookings
+
+
+def assert_rollups_match_rebuild(server, provider_id: str) -> dict:
+    incremental = rollup_state(server, provider_id)
+    with server.app.app_context():
+        server.rebuild_daily_rollups()
+    assert incremental == rollup_state(server, provider_id)
+    return incremental[0]
+
+
+@pytest.fixture
+def schedule(client, provider):
+    """Daily 09:00-12:00 UTC availability in 30-minute slots from tomorrow for 7 days."""
+    return create_availability(client, provider), date.today() + timedelta(days=1)
+
+
+def book(client, patient, slot):
+    response = client.post('/api/v1/appointment/book', json={'slot_id': slot}, headers=patient['headers'])
+    assert response.status_code == 200, response.get_json()
+
+
+def test_rollups_follow_book_update_and_cancel(server, client, provider, patient, schedule):
+    availability_id, first = schedule
+    second = first + timedelta(days=1)
+    assert assert_rollups_match_rebuild(server, provider['id'])[first] == (6, 0, 0)
+
+    book(client, patient, slot_id(availability_id, first, 9))
+    assert assert_rollups_match_rebuild(server, provider['id'])[first] == (5, 1, 0)
+
+    response = client.put('/api/v1/appointment/update', headers=patient['headers'], json={
+        'current_slot_id': slot_id(availability_id, first, 9), 'new_slot_id': slot_id(availability_id, second, 10)
+    })
+    assert response.status_code == 200, response.get_json()
+    days = assert_rollups_match_rebuild(server, provider['id'])
+    assert days[second][1] == 1 and days[first][1] == 0
+
+    response = client.post('/api/v1/appointment/cancel', json={'slot_id': slot_id(availability_id, second, 10)},
+                           headers=patient['headers'])
+    assert response.status_code == 200, response.get_json()
+    days = assert_rollups_match_rebuild(server, provider['id'])
+    assert sum(booked for _, booked, _ in days.values()) == 0
+
+
+def test_rollups_follow_availability_edit_and_delete(server, client, provider, patient, schedule):
+    availability_id, first = schedule
+    book(client, patient, slot_id(availability_id, first + timedelta(days=2), 9.5))
+
+    response = client.put(f'/api/v1/provider/availability/{availability_id}', json={'end_time': '11:00'},
+                          headers=provider['headers'])
+    assert response.status_code == 200, response.get_json()
+    days = assert_rollups_match_rebuild(server, provider['id'])
+    assert days[first] == (4, 0, 0)
+    assert days[first + timedelta(days=2)] == (3, 1, 0)
+
+    create_availability(client, provider, start_time='14:00', end_time='15:00', is_recurring=False)
+    assert assert_rollups_match_rebuild(server, provider['id'])[first] == (6, 0, 0)
+
+    response = client.delete(f'/api/v1/provider/availability/{availability_id}', headers=provider['headers'])
+    assert response.status_code == 200, response.get_json()
+    days = assert_rollups_match_rebuild(server, provider['id'])
+    assert days[first] == (2, 0, 0)
+
+
+def test_calendar_totals_match_its_days_and_the_summary(server, client, provider, patient, schedule):
+    availability_id, first = schedule
+    last = first + timedelta(days=6)
+    for day in (first, last):
+        book(client, patient, slot_id(availability_id, day, 11))
+
+    totals = {'available_slots': 0, 'booked_slots': 0, 'cancelled_slots': 0}
+    for month in sorted({first.strftime('%Y-%m'), last.strftime('%Y-%m')}):
+        response = client.get(f"/api/v1/provider/{provider['id']}/availability/calendar", query_string={'month': month})
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        for key in totals:
+            assert data['totals'][key] == sum(day[key] for day in data['days'])
+            totals[key] += data['totals'][key]
+
+    assert totals == {'available_slots': 40, 'booked_slots': 2, 'cancelled_slots': 0}
+    response = client.get(f"/api/v1/provider/{provider['id']}/availability/summary",
+                          query_string={'start_date': first.isoformat(), 'end_date': last.isoformat()})
+    summary = response.get_json()['data']['availability_summary']
+    assert (summary['available_slots'], summary['booked_slots']) == (40, 2)
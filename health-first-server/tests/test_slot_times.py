@@ -0,0 +1,59 @@
+"""availability_slot_times across daylight saving transitions."""
+from datetime import date, datetime
+
+import numpy as np
+
+import app as server
+
+
+def make_availability(day, start_time, end_time, timezone='America/New_York', slot_duration=30, end_date=None):
+    return server.ProviderAvailability(
+        id='availability', provider_id='provider', date=day, start_time=start_time, end_time=end_time,
+        timezone=timezone, slot_duration=slot_duration, break_duration=0,
+        is_recurring=end_date is not None, recurrence_pattern='daily' if end_date else None,
+        recurrence_end_date=end_date, appointment_type='consultation', location={'type': 'clinic'}
+    )
+
+
+def utc_times(values) -> list:
+    return values.astype('datetime64[us]').tolist()
+
+
+def test_spring_forward_drops_starts_in_the_gap():
+    # 2026-03-08: New York clocks jump from 02:00 EST to 03:00 EDT
+    starts, ends = server.availability_slot_times(make_availability(date(2026, 3, 8), '01:00', '04:00'))
+
+    assert utc_times(starts) == [
+        datetime(2026, 3, 8, 6, 0),   # 01:00 EST
+        datetime(2026, 3, 8, 6, 30),  # 01:30 EST
+        datetime(2026, 3, 8, 7, 0),   # 03:00 EDT
+        datetime(2026, 3, 8, 7, 30),  # 03:30 EDT
+    ]
+    assert (ends - starts == np.timedelta64(30, 'm')).all()
+    assert server.zone_transitions('America/New_York').local_isoformats(starts) == [
+        '2026-03-08T01:00:00-05:00', '2026-03-08T01:30:00-05:00',
+        '2026-03-08T03:00:00-04:00', '2026-03-08T03:30:00-04:00'
+    ]
+
+
+def test_fall_back_offers_the_repeated_hour_once():
+    # 2026-11-01: New York clocks fall back from 02:00 EDT to 01:00 EST
+    starts, _ = server.availability_slot_times(make_availability(date(2026, 11, 1), '00:00', '03:00'))
+
+    assert utc_times(starts) == [
+        datetime(2026, 11, 1, 4, 0),   # 00:00 EDT
+        datetime(2026, 11, 1, 4, 30),  # 00:30 EDT
+        datetime(2026, 11, 1, 5, 0),   # 01:00 EDT
+        datetime(2026, 11, 1, 5, 30),  # 01:30 EDT
+        datetime(2026, 11, 1, 7, 0),   # 02:00 EST
+        datetime(2026, 11, 1, 7, 30),  # 02:30 EST
+    ]
+
+
+def test_recurring_starts_are_strictly_increasing_across_transitions():
+    for first, last in ((date(2026, 3, 7), date(2026, 3, 9)), (date(2026, 10, 31), date(2026, 11, 2))):
+        availability = make_availability(first, '00:00', '04:00', slot_duration=15, end_date=last)
+        starts, _ = server.availability_slot_times(availability)
+
+        assert (np.diff(starts) > np.timedelta64(0, 'm')).all()
+        assert len(set(utc_times(starts))) == len(starts)